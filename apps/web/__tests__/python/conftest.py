@@ -0,0 +1,90 @@
+"""
+Shared fixtures for the ML inference function tests
+
+api/ml-inference.py is a Vercel function, not an importable package, so it is
+loaded from its path once per session as the module ml_inference.
+"""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+API_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'api', 'ml-inference.py')
+
+# Start from the documented defaults whatever the developer's shell exports
+for name in [name for name in os.environ if name.startswith('ML_')]:
+    del os.environ[name]
+
+
+def _load_module():
+    spec = importlib.util.spec_from_file_location('ml_inference', os.path.abspath(API_PATH))
+    module = importlib.util.module_from_spec(spec)
+    # Registered before executing, as an import would be, so its functions pickle by name
+    sys.modules['ml_inference'] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+_module = _load_module()
+
+
+@pytest.fixture
+def ml():
+    """The module, with the optional process-wide features switched off around each test"""
+    yield _module
+    _module.configure_result_cache(0)
+    _module.configure_micro_batcher(0)
+    _module.configure_feature_store(None)
+    _module.configure_model_experiment()
+    _module.model_registry.invalidate()
+    _module.MODEL_ARTIFACT_DIR = ''
+
+
+@pytest.fixture
+def model(ml):
+    """The default model version"""
+    return ml.model_registry.get()
+
+
+@pytest.fixture
+def rng():
+    import numpy as np
+    return np.random.default_rng(20261016)
+
+
+@pytest.fixture
+def yield_columns(rng):
+    """Columnar predict_yield_batch features with a few missing values per column"""
+    n = 500
+    columns = {
+        'weather_temp': rng.uniform(10, 32, n),
+        'weather_rainfall': rng.uniform(200, 900, n),
+        'soil_ph': rng.uniform(5, 8, n),
+        'soil_n': rng.uniform(0, 80, n),
+        'satellite_ndvi': rng.uniform(0.2, 0.9, n),
+        'planting_doy': rng.integers(80, 160, n).astype(float)
+    }
+    features = {}
+    for name, values in columns.items():
+        values = [round(float(value), 3) for value in values]
+        for i in rng.choice(n, 25, replace=False).tolist():
+            values[i] = None
+        features[name] = values
+    return features
+
+
+@pytest.fixture
+def field_data():
+    """One optimize_irrigation field with a week of forecast"""
+    return {
+        'soil_moisture': 0.22,
+        'field_capacity': 0.38,
+        'wilting_point': 0.12,
+        'crop_stage': 'flowering',
+        'weather_forecast': [
+            {'temperature': t, 'humidity': h, 'precipitation': p}
+            for t, h, p in [(28, 55, 0), (31, 50, 2), (33, 45, 0), (29, 60, 5), (27, 70, 0), (26, 65, 1), (30, 50, 0)]
+        ]
+    }
@@ -0,0 +1,93 @@
+"""The binary columnar request and response format"""
+
+import base64
+import types
+
+import pytest
+
+
+def _request_body(ml, features, **metadata):
+    import numpy as np
+    
+    arrays = {f"features.{name}": np.asarray(values, dtype=np.float64) for name, values in features.items()}
+    return ml.encode_array_container(dict(metadata, action='predict_yield_batch'), arrays, ml.COLUMNAR_MAGIC)
+
+
+def _replace_header(body, old, new):
+    assert len(old) == len(new) and body.count(old) == 1
+    return body.replace(old, new)
+
+
+def test_columnar_request_decodes_to_feature_columns(ml, model, yield_columns):
+    import numpy as np
+    
+    features = {name: [np.nan if value is None else value for value in values]
+                for name, values in yield_columns.items()}
+    
+    request_data, columnar = ml.parse_request_body(_request_body(ml, features, crop_type='soybean'),
+                                                   ml.COLUMNAR_CONTENT_TYPE)
+    
+    assert columnar
+    assert request_data['crop_type'] == 'soybean'
+    assert request_data['output'] == 'columnar'
+    np.testing.assert_array_equal(request_data['features']['soil_ph'], features['soil_ph'])
+    assert ml.run_action(request_data)['columns']['predicted_yield'].tolist() == \
+        [row['predicted_yield'] for row in model.predict_yield_batch(yield_columns, 'soybean')['predictions']]
+
+
+def test_columnar_response_round_trips(ml, yield_columns):
+    import numpy as np
+    
+    body = ml.encode_columnar_response(ml.run_action({'action': 'predict_yield_batch', 'features': yield_columns,
+                                                      'output': 'columnar'}))
+    metadata, arrays = ml.decode_array_container(body, ml.COLUMNAR_MAGIC)
+    
+    expected = ml.model_registry.get().predict_yield_batch(yield_columns, output='columnar')['columns']
+    np.testing.assert_array_equal(arrays['predicted_yield'], expected['predicted_yield'])
+    assert metadata['success'] == 'true'
+
+
+def test_handler_decodes_base64_bodies(ml, model):
+    body = base64.b64encode(_request_body(ml, {'soil_ph': [6.5, 7.0, 5.5]})).decode('ascii')
+    request = types.SimpleNamespace(method='POST', body=body, headers={'Content-Type': ml.COLUMNAR_CONTENT_TYPE})
+    
+    response = ml.handler(request, None)
+    
+    assert response['statusCode'] == 200
+    assert response['isBase64Encoded'] is True
+    assert response['headers']['Content-Type'] == ml.COLUMNAR_CONTENT_TYPE
+    _, arrays = ml.decode_array_container(base64.b64decode(response['body']), ml.COLUMNAR_MAGIC)
+    expected = model.predict_yield_batch({'soil_ph': [6.5, 7.0, 5.5]}, output='columnar')['columns']
+    assert arrays['predicted_yield'].tolist() == expected['predicted_yield'].tolist()
+
+
+def _corrupt_checksum(body):
+    return body[:-1] + bytes([body[-1] ^ 1])
+
+
+def _bad_offset(body):
+    return _replace_header(body, b';0;24', b';9;24')
+
+
+@pytest.mark.parametrize('corrupt, message', [
+    (_corrupt_checksum, 'checksum mismatch'),
+    (lambda body: body[:12], 'truncated'),
+    (lambda body: body[:-8], 'past the end'),
+    (_bad_offset, 'past the end'),
+    (lambda body: _replace_header(body, b';0;24', b';x;24'), 'malformed header'),
+    (lambda body: _replace_header(body, b'=<f8;', b'=<q9;'), 'malformed header'),
+    (lambda body: _replace_header(body, b'=<f8;', b'=|O8;'), 'unsupported dtype'),
+    (lambda body: b'CROPSML1' + body[8:], 'magic number'),
+])
+def test_malformed_containers_are_400(ml, corrupt, message):
+    body = corrupt(_request_body(ml, {'soil_ph': [6.5, 7.0, 5.5]}))
+    
+    with pytest.raises(ml.ValidationError, match=message) as raised:
+        ml.parse_request_body(body, ml.COLUMNAR_CONTENT_TYPE)
+    assert raised.value.status == 400
+
+
+def test_columnar_output_is_limited_to_batch_actions(ml):
+    with pytest.raises(ml.ValidationError) as raised:
+        ml.parse_request_body(b'{"action": "predict_yield"}', 'application/json', ml.COLUMNAR_CONTENT_TYPE)
+    assert raised.value.status == 400
@@ -0,0 +1,72 @@
+"""Season aggregates of the SQLite feature store and the requests resolved from it"""
+
+import pytest
+
+
+@pytest.fixture
+def store(ml):
+    return ml.configure_feature_store(':memory:')
+
+
+def test_missing_readings_do_not_count_as_zero(store):
+    store.ingest('north', weather=[
+        {'date': '2026-05-01', 'temperature': 20, 'precipitation': 3},
+        {'date': '2026-05-02', 'precipitation': 1},
+        {'date': '2026-05-03', 'temperature': 30}
+    ])
+    
+    summary = store.season_summary('north', '2026-05-03')
+    assert summary['weather_days'] == 3
+    assert summary['mean_temperature'] == 25.0
+    assert summary['mean_humidity'] is None
+    assert summary['rainfall_mm'] == 4.0
+    assert 'weather_humidity' not in store.yield_features('north', '2026-05-03')
+
+
+def test_backfilled_days_update_later_totals(store):
+    store.ingest('north', weather=[{'date': '2026-05-02', 'temperature': 20, 'precipitation': 2, 'humidity': 60},
+                                   {'date': '2026-05-03', 'temperature': 24, 'precipitation': 4, 'humidity': 40}])
+    store.ingest('north', weather=[{'date': '2026-05-01', 'temp_min': 10, 'temp_max': 20, 'humidity': 50,
+                                    'precipitation': 0}])
+    
+    summary = store.season_summary('north', '2026-05-03')
+    assert summary['gdd'] == pytest.approx(5 + 10 + 14)
+    assert summary['mean_temperature'] == pytest.approx((15 + 20 + 24) / 3)
+    assert summary['mean_humidity'] == 50.0
+    assert store.season_summary('north', '2026-05-03', '2026-05-02')['rainfall_mm'] == 6.0
+
+
+def test_ndvi_statistics(store):
+    store.ingest('north', satellite=[{'date': '2026-06-01', 'ndvi': 0.5}, {'date': '2026-06-11', 'ndvi': 0.7},
+                                     {'date': '2026-06-21', 'evi': 0.4}])
+    
+    summary = store.season_summary('north', '2026-06-30')
+    assert summary['ndvi_observations'] == 2
+    assert summary['ndvi_mean'] == pytest.approx(0.6)
+    assert summary['ndvi_std'] == pytest.approx(0.1)
+    assert summary['evi_mean'] == pytest.approx(0.4)
+
+
+def test_invalid_observations_are_skipped(store):
+    result = store.ingest('north', weather=[{'date': '2026-05-01', 'humidity': 140}, {'date': '2026-05-02'}])
+    
+    assert result['weather_days'] == 1
+    assert result['rejected'] == 1
+    assert result['errors'][0]['field'] == 'weather[0].humidity'
+
+
+def test_requests_naming_a_field_use_stored_inputs(ml, model, store):
+    store.ingest('north', weather=[{'date': '2026-05-01', 'temperature': 22, 'precipitation': 30, 'humidity': 60}],
+                 satellite=[{'date': '2026-05-01', 'ndvi': 0.7}])
+    
+    result = ml.run_action({'action': 'predict_yield', 'field_id': 'north', 'date': '2026-05-01',
+                            'features': {'soil_ph': 6.5}})
+    expected = model.predict_yield({'weather_temp': 22.0, 'weather_rainfall': 30.0, 'weather_humidity': 60.0,
+                                    'weather_gdd': 12.0, 'satellite_ndvi': 0.7, 'soil_ph': 6.5})
+    assert result == expected
+
+
+def test_ingesting_without_a_store_is_503(ml):
+    with pytest.raises(ml.ValidationError, match='feature store is disabled') as raised:
+        ml.run_action({'action': 'ingest_observations', 'field_id': 'north', 'weather': []})
+    assert raised.value.status == 503
@@ -0,0 +1,101 @@
+"""The pooled keep-alive InferenceServer on an ephemeral port"""
+
+import http.client
+import json
+import socket
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def start_server(ml):
+    servers = []
+    
+    def start(**options):
+        server = ml.InferenceServer(('127.0.0.1', 0), **options)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        servers.append(server)
+        return server
+    
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _connect(server):
+    return http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=10)
+
+
+def _post(connection, body):
+    connection.request('POST', '/', body=json.dumps(body), headers={'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_keep_alive_connections_are_reused(start_server, model):
+    server = start_server(threads=2)
+    connection = _connect(server)
+    
+    statuses, sockets = [], []
+    for ph in (5.5, 6.5, 7.5, 15):
+        status, response = _post(connection, {'action': 'predict_yield', 'features': {'soil_ph': ph}})
+        statuses.append(status)
+        # http.client only opens a new socket when the server closed the last one
+        sockets.append(connection.sock)
+        if status == 200:
+            assert response['data'] == model.predict_yield({'soil_ph': ph})
+    connection.close()
+    
+    assert statuses == [200, 200, 200, 422]
+    assert all(sock is sockets[0] for sock in sockets)
+
+
+def test_full_queue_is_answered_with_503(start_server):
+    server = start_server(threads=1, max_queue=0, keepalive_timeout=5)
+    busy = _connect(server)
+    assert _post(busy, {'action': 'predict_yield', 'features': {'soil_ph': 6.5}})[0] == 200
+    
+    # The idle keep-alive connection still holds the only thread
+    with socket.create_connection(server.server_address, timeout=10) as sock:
+        reply = sock.makefile('rb').read()
+    
+    assert reply.startswith(b'HTTP/1.1 503 ')
+    assert b'Retry-After: 1' in reply
+    assert json.loads(reply.split(b'\r\n\r\n', 1)[1])['success'] is False
+    busy.close()
+
+
+def test_batch_actions_run_in_the_worker_pool(start_server, model, yield_columns):
+    server = start_server(threads=2, batch_workers=1)
+    submitted = []
+    submit = server.batch_executor.submit
+    server.batch_executor.submit = lambda *args: submitted.append(args[0].__name__) or submit(*args)
+    
+    connection = _connect(server)
+    status, response = _post(connection, {'action': 'predict_yield_batch', 'features': yield_columns})
+    single_status, _ = _post(connection, {'action': 'predict_yield', 'features': {'soil_ph': 6.5}})
+    connection.close()
+    
+    assert (status, single_status) == (200, 200)
+    assert response['data']['predictions'] == model.predict_yield_batch(yield_columns)['predictions']
+    assert submitted == ['_run_parallel_chunk']
+
+
+def test_batches_that_cannot_be_chunked_run_whole_in_the_pool(start_server, model, field_data):
+    server = start_server(threads=2, batch_workers=1)
+    submitted = []
+    submit = server.batch_executor.submit
+    server.batch_executor.submit = lambda *args: submitted.append(args[0].__name__) or submit(*args)
+    
+    forecast = field_data.pop('weather_forecast')
+    connection = _connect(server)
+    status, response = _post(connection, {'action': 'schedule_irrigation', 'fields': [field_data],
+                                          'weather_forecast': forecast})
+    connection.close()
+    
+    assert status == 200
+    assert response['data'] == model.schedule_irrigation([field_data], forecast)
+    assert submitted == ['run_action']
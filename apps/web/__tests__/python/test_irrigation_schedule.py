@@ -0,0 +1,33 @@
+"""Season-scale irrigation schedules under a shared pump capacity"""
+
+
+def _forecast(field_data):
+    return [dict(day, date=f"2026-07-{i + 1:02d}") for i, day in enumerate(field_data['weather_forecast'])]
+
+
+def test_pump_capacity_is_never_exceeded(model, field_data):
+    fields = [dict(field_data, field_id='dry', soil_moisture=0.14, area=4),
+              dict(field_data, field_id='wet', soil_moisture=0.36, area=4)]
+    
+    unlimited = model.schedule_irrigation(fields, _forecast(field_data))
+    schedule = model.schedule_irrigation(fields, _forecast(field_data), pump_capacity=50)
+    plans = {plan['field_id']: plan for plan in schedule['fields']}
+    
+    assert max(day['irrigation_volume_m3'] for day in unlimited['daily_totals']) > 50
+    assert all(day['irrigation_volume_m3'] <= 50.05 for day in schedule['daily_totals'])
+    assert plans['dry']['deferred_days'] > 0
+    assert plans['wet']['total_irrigation_mm'] <= plans['dry']['total_irrigation_mm']
+
+
+def test_zero_area_fields_are_scheduled_under_a_pump_capacity(model, field_data):
+    fields = [dict(field_data, field_id='dry', soil_moisture=0.14, area=4),
+              dict(field_data, field_id='plot', soil_moisture=0.14, area=0),
+              dict(field_data, field_id='wet', soil_moisture=0.36, area=4)]
+    
+    schedule = model.schedule_irrigation(fields, _forecast(field_data), pump_capacity=50)
+    plans = {plan['field_id']: plan for plan in schedule['fields']}
+    
+    assert plans['plot']['deferred_days'] == 0
+    assert plans['plot']['total_irrigation_mm'] > 0
+    assert plans['dry']['deferred_days'] > 0
+    assert all(day['irrigation_volume_m3'] <= 50.05 for day in schedule['daily_totals'])
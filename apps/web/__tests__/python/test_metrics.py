@@ -0,0 +1,143 @@
+"""Per-stage timings: the Prometheus text output, Server-Timing headers and the /metrics route"""
+
+import http.client
+import http.server
+import json
+import threading
+import time
+import types
+
+import pytest
+
+
+@pytest.fixture
+def metrics(ml, monkeypatch):
+    monkeypatch.setattr(ml.metrics, 'enabled', True)
+    ml.metrics.reset()
+    yield ml.metrics
+    ml.metrics.reset()
+
+
+def _post(ml, body):
+    request = types.SimpleNamespace(method='POST', body=json.dumps(body), headers={'Content-Type': 'application/json'})
+    return ml.handler(request, None)
+
+
+def _samples(text):
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            name, _, value = line.rpartition(' ')
+            samples[name] = float(value)
+    return samples
+
+
+def test_requests_are_counted_by_action_and_status(ml, metrics):
+    _post(ml, {'action': 'predict_yield', 'features': {'soil_ph': 6.5}})
+    _post(ml, {'action': 'predict_yield', 'features': {'soil_ph': 6.5}})
+    _post(ml, {'action': 'predict_yield', 'features': {'soil_ph': 15}})
+    _post(ml, {'action': 'no_such_action'})
+    
+    samples = _samples(metrics.render_prometheus())
+    
+    assert samples['ml_inference_requests_total{action="predict_yield",status="200"}'] == 2
+    assert samples['ml_inference_requests_total{action="predict_yield",status="422"}'] == 1
+    assert samples['ml_inference_requests_total{action="unknown",status="400"}'] == 1
+
+
+def test_histograms_render_cumulative_buckets(ml, metrics):
+    for _ in range(3):
+        _post(ml, {'action': 'predict_yield', 'features': {'soil_ph': 6.5}})
+    
+    text = metrics.render_prometheus()
+    samples = _samples(text)
+    prefix = 'ml_inference_request_seconds_bucket{action="predict_yield",le='
+    buckets = [value for name, value in samples.items() if name.startswith(prefix)]
+    
+    assert '# TYPE ml_inference_request_seconds histogram' in text
+    assert '# TYPE ml_inference_requests_total counter' in text
+    assert buckets == sorted(buckets)
+    assert samples[prefix + '"+Inf"}'] == samples['ml_inference_request_seconds_count{action="predict_yield"}'] == 3
+    assert samples['ml_inference_stage_seconds_count{action="predict_yield",stage="compute"}'] == 3
+
+
+def test_responses_carry_server_timing(ml, metrics):
+    response = _post(ml, {'action': 'predict_yield', 'features': {'soil_ph': 6.5}})
+    
+    stages = dict(entry.split(';dur=') for entry in response['headers']['Server-Timing'].split(', '))
+    assert {'parse', 'model', 'compute', 'serialize'} <= set(stages)
+    assert all(float(duration) >= 0 for duration in stages.values())
+
+
+def test_ndjson_bodies_are_timed(ml, metrics):
+    line = json.dumps({'field_id': 'north', 'satellite_data': [{'date': f"2026-06-0{day}", 'ndvi': 0.6}
+                                                               for day in range(1, 4)]})
+    request = types.SimpleNamespace(method='POST', body=line, headers={'Content-Type': ml.NDJSON_CONTENT_TYPE})
+    response = ml.handler(request, None)
+    
+    assert response['headers']['Content-Type'] == ml.NDJSON_CONTENT_TYPE
+    assert 'stream;dur=' in response['headers']['Server-Timing']
+    samples = _samples(metrics.render_prometheus())
+    assert samples['ml_inference_requests_total{action="analyze_stress_stream",status="200"}'] == 1
+    assert samples['ml_inference_stage_seconds_count{action="analyze_stress_stream",stage="stream"}'] == 1
+
+
+def test_no_timing_work_while_disabled(ml):
+    response = _post(ml, {'action': 'predict_yield', 'features': {'soil_ph': 6.5}})
+    
+    assert 'Server-Timing' not in response['headers']
+    assert ml.start_stage_timer() is ml.start_stage_timer()
+    assert _post(ml, {'action': 'metrics'})['statusCode'] == 500
+
+
+def test_metrics_action_returns_prometheus_text(ml, metrics):
+    _post(ml, {'action': 'predict_yield', 'features': {'soil_ph': 6.5}})
+    
+    response = _post(ml, {'action': 'metrics'})
+    
+    assert response['statusCode'] == 200
+    assert response['headers']['Content-Type'] == ml.PROMETHEUS_CONTENT_TYPE
+    assert 'ml_inference_requests_total{action="predict_yield",status="200"} 1' in response['body']
+
+
+@pytest.fixture
+def server(ml):
+    handler_class = type('QuietHandler', (ml.Handler,), {'log_message': lambda self, *args: None})
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler_class)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _request(server, method, path, body=None):
+    connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=10)
+    connection.request(method, path, body=body, headers={'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    result = response.status, dict(response.getheaders()), response.read()
+    connection.close()
+    return result
+
+
+def test_metrics_route_serves_the_registry(ml, metrics, server):
+    status, headers, _ = _request(server, 'POST', '/', json.dumps({'action': 'predict_yield',
+                                                                  'features': {'soil_ph': 6.5}}))
+    assert status == 200
+    assert 'compute;dur=' in headers['Server-Timing']
+    
+    # The request is recorded after its response is written, so give the handler thread a moment
+    for _ in range(100):
+        status, headers, body = _request(server, 'GET', '/metrics')
+        samples = _samples(body.decode())
+        if 'ml_inference_requests_total{action="predict_yield",status="200"}' in samples:
+            break
+        time.sleep(0.01)
+    
+    assert status == 200
+    assert headers['Content-Type'] == ml.PROMETHEUS_CONTENT_TYPE
+    assert samples['ml_inference_requests_total{action="predict_yield",status="200"}'] == 1
+
+
+def test_metrics_route_is_hidden_while_disabled(ml, server):
+    assert _request(server, 'GET', '/metrics')[0] == 404
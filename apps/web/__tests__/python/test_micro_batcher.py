@@ -0,0 +1,61 @@
+"""Micro-batched predict_yield calls return exactly what direct calls return"""
+
+import threading
+import time
+
+
+def test_micro_batched_predictions_match_direct(ml, model, yield_columns):
+    batcher = ml.MicroBatcher(0.005)
+    n = len(yield_columns['soil_ph'])
+    rows = [{name: values[i] for name, values in yield_columns.items() if values[i] is not None} for i in range(n)]
+    results = [None] * 64
+    
+    def predict(i):
+        results[i] = batcher.predict_yield(model, rows[i], 'wheat')
+    
+    threads = [threading.Thread(target=predict, args=(i,)) for i in range(len(results))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert results == [model.predict_yield(rows[i], 'wheat') for i in range(len(results))]
+
+
+def test_run_action_goes_through_the_batcher(ml, model):
+    batcher = ml.configure_micro_batcher(5)
+    
+    result = ml.run_action({'action': 'predict_yield', 'features': {'soil_ph': 6.5}, 'crop_type': 'rice'})
+    
+    assert ml.micro_batcher is batcher
+    assert result == model.predict_yield({'soil_ph': 6.5}, 'rice')
+
+
+def test_micro_batcher_falls_back_when_the_collector_is_stuck(ml, model, monkeypatch):
+    batcher = ml.MicroBatcher(0.005)
+    monkeypatch.setattr(batcher, 'SCORE_GRACE', 0.1)
+    monkeypatch.setattr(batcher, '_score_groups', lambda batch: time.sleep(2))
+    
+    started = time.perf_counter()
+    result = batcher.predict_yield(model, {'soil_ph': 6.5})
+    
+    assert result == model.predict_yield({'soil_ph': 6.5})
+    assert time.perf_counter() - started < 1
+
+
+def test_timed_out_requests_are_not_scored_again(ml, model, monkeypatch):
+    batcher = ml.MicroBatcher(0.005)
+    monkeypatch.setattr(batcher, 'SCORE_GRACE', 0.05)
+    # No collector, so the request times out still queued
+    monkeypatch.setattr(batcher, '_ensure_collector', lambda: None)
+    
+    assert batcher.predict_yield(model, {'soil_ph': 6.5}) == model.predict_yield({'soil_ph': 6.5})
+    assert [pending.cancelled for pending in batcher._queue.queue] == [True]
+    
+    monkeypatch.undo()
+    scored = []
+    score = batcher._score
+    monkeypatch.setattr(batcher, '_score', lambda batch: scored.append(batch) or score(batch))
+    
+    assert batcher.predict_yield(model, {'soil_ph': 7.0}) == model.predict_yield({'soil_ph': 7.0})
+    assert [[pending.features for pending in batch] for batch in scored] == [[{'soil_ph': 7.0}]]
@@ -0,0 +1,53 @@
+"""Compiled, memory-mapped model artifacts"""
+
+import pytest
+
+
+def test_artifact_scores_like_the_builtin_model(ml, model, yield_columns, tmp_path):
+    path = str(tmp_path / 'yield-v2.cropsmodel')
+    ml.export_model_artifact(path, 'yield-v2')
+    
+    compiled = ml.MLInference(model_version='yield-v2', model_path=path)
+    assert compiled.predict_yield_batch(yield_columns) == model.predict_yield_batch(yield_columns)
+
+
+def test_registry_loads_versions_from_the_model_directory(ml, model, tmp_path):
+    ml.export_model_artifact(str(tmp_path / 'yield-v2.cropsmodel'), 'yield-v2')
+    ml.MODEL_ARTIFACT_DIR = str(tmp_path)
+    
+    compiled = ml.model_registry.get('yield-v2')
+    assert compiled.model_path == str(tmp_path / 'yield-v2.cropsmodel')
+    assert compiled.predict_yield({'soil_ph': 6.5}) == model.predict_yield({'soil_ph': 6.5})
+
+
+def test_artifact_for_another_version_is_refused(ml, tmp_path):
+    path = str(tmp_path / 'yield-v2.cropsmodel')
+    ml.export_model_artifact(path, 'yield-v2')
+    
+    with pytest.raises(ValueError, match='holds version yield-v2'):
+        ml.MLInference(model_version='yield-v3', model_path=path)
+
+
+def test_corrupted_artifact_is_refused(ml, tmp_path):
+    path = tmp_path / 'yield-v2.cropsmodel'
+    ml.export_model_artifact(str(path), 'yield-v2')
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 1
+    path.write_bytes(bytes(data))
+    
+    with pytest.raises(ValueError, match='checksum mismatch'):
+        ml.MLInference(model_version='yield-v2', model_path=str(path))
+
+
+def test_missing_version_does_not_fall_back_to_builtin(ml):
+    with pytest.raises(ml.ModelNotFoundError) as raised:
+        ml.model_registry.get('yield-v2-typo')
+    
+    assert raised.value.status == 404
+    assert 'yield-v2-typo' not in ml.model_registry.loaded_versions()
+
+
+def test_experiment_with_missing_candidate_is_refused(ml):
+    with pytest.raises(ml.ModelNotFoundError):
+        ml.configure_model_experiment('yield-v2-typo', 0.3)
+    assert ml.model_experiment is None
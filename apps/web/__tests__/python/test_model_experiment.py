@@ -0,0 +1,48 @@
+"""A/B routing and shadow scoring of yield traffic"""
+
+import pytest
+
+
+@pytest.fixture
+def candidate(ml, tmp_path):
+    """A yield-v2 artifact in the model directory, scoring like the builtin model"""
+    ml.export_model_artifact(str(tmp_path / f"yield-v2{ml.MODEL_ARTIFACT_SUFFIX}"), 'yield-v2')
+    ml.MODEL_ARTIFACT_DIR = str(tmp_path)
+    return 'yield-v2'
+
+
+def test_field_ids_stay_in_one_arm(ml, candidate):
+    ml.configure_model_experiment(candidate, 0.3)
+    
+    arms = {}
+    for field_id in range(400):
+        request = {'action': 'predict_yield', 'field_id': field_id, 'features': {'soil_ph': 6.5}}
+        experiment = ml.run_action(dict(request))['experiment']
+        assert ml.run_action(dict(request))['experiment'] == experiment
+        arms[field_id] = experiment
+    
+    candidates = [arm for arm in arms.values() if arm['arm'] == 'candidate']
+    assert 0.2 < len(candidates) / len(arms) < 0.4
+    assert {arm['model_version'] for arm in candidates} == {candidate}
+
+
+def test_no_experiment_leaves_results_untagged(ml, model):
+    result = ml.run_action({'action': 'predict_yield', 'features': {'soil_ph': 6.5}})
+    
+    assert result == model.predict_yield({'soil_ph': 6.5})
+    assert 'experiment' not in result
+
+
+def test_shadow_of_the_serving_version_logs_no_difference(ml, tmp_path, rng):
+    log = str(tmp_path / 'shadow.cropsab')
+    experiment = ml.configure_model_experiment(shadow_version=ml.DEFAULT_MODEL_VERSION, shadow_log=log)
+    
+    for i in range(200):
+        features = {'soil_ph': float(rng.uniform(5, 8)), 'satellite_ndvi': float(rng.uniform(0.2, 0.9))}
+        ml.run_action({'action': 'predict_yield', 'field_id': i, 'features': features})
+    assert experiment.flush(10)
+    
+    control = ml.summarize_shadow_log(log)['arms']['control']
+    assert control['requests'] == 200
+    assert control['max_absolute_difference'] == 0.0
+    assert experiment.shadow_failures == 0
@@ -0,0 +1,10 @@
+"""One shared MLInference per model version"""
+
+
+def test_registry_shares_one_instance_per_version(ml):
+    assert ml.model_registry.get() is ml.model_registry.get()
+    assert ml.model_registry.loaded_versions() == [ml.DEFAULT_MODEL_VERSION]
+    
+    before = ml.model_registry.get()
+    assert ml.model_registry.reload() is not before
+    assert ml.model_registry.get() is not before
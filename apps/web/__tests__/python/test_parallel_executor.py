@@ -0,0 +1,76 @@
+"""ParallelExecutor and the batch irrigation path reproduce serial results"""
+
+import multiprocessing
+
+import pytest
+
+
+@pytest.fixture
+def fork_context():
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        pytest.skip('ParallelExecutor workers need the fork start method to share the loaded module')
+    return multiprocessing.get_context('fork')
+
+
+@pytest.fixture
+def executor(ml, fork_context):
+    with ml.ParallelExecutor(workers=2, chunk_size=64, mp_context=fork_context) as parallel:
+        yield parallel
+
+
+def test_parallel_yield_batch_matches_serial(model, executor, yield_columns):
+    features = dict(yield_columns, soil_ph=[15 if i == 100 else v for i, v in enumerate(yield_columns['soil_ph'])])
+    
+    serial = model.predict_yield_batch(features)
+    parallel = executor.predict_yield_batch(features)
+    
+    assert parallel['predictions'] == serial['predictions']
+    assert parallel['batch_info']['rows'] == serial['batch_info']['rows']
+    assert parallel['batch_info']['rejected'] == serial['batch_info']['rejected'] == 1
+
+
+def test_parallel_stress_batch_matches_serial(model, executor, rng):
+    ndvi = rng.uniform(0.2, 0.9, (300, 6)).round(3).tolist()
+    
+    assert executor.analyze_stress_batch(ndvi)['fields'] == model.analyze_stress_batch(ndvi)['fields']
+
+
+def test_optimize_irrigation_batch_matches_optimize_irrigation(model, field_data):
+    fields = [dict(field_data, soil_moisture=moisture) for moisture in (0.13, 0.18, 0.22, 0.3, 0.37)]
+    
+    batch = model.optimize_irrigation_batch(fields)['fields']
+    for field, entry in zip(fields, batch):
+        assert entry['data'] == model.optimize_irrigation(field)
+
+
+def test_parallel_irrigation_batch_matches_serial(model, executor, field_data):
+    fields = [dict(field_data, soil_moisture=0.13 + i * 0.002) for i in range(150)]
+    
+    assert executor.optimize_irrigation_batch(fields)['fields'] == model.optimize_irrigation_batch(fields)['fields']
+
+
+def test_run_action_chunks_batches_and_runs_other_actions_whole(ml, executor, yield_columns, field_data):
+    submitted = []
+    submit = executor.submit
+    executor.submit = lambda *args: submitted.append(args[0].__name__) or submit(*args)
+    
+    batch = {'action': 'predict_yield_batch', 'features': yield_columns, 'crop_type': 'wheat'}
+    assert executor.run_action(batch) == ml.run_action(batch)
+    assert submitted == ['_run_parallel_chunk'] * 8
+    
+    submitted.clear()
+    single = {'action': 'optimize_irrigation', 'field_data': field_data}
+    assert executor.run_action(single) == ml.run_action(single)
+    assert submitted == ['run_action']
+
+
+def test_offloading_executor_never_scores_in_process(ml, fork_context, yield_columns):
+    with ml.ParallelExecutor(workers=1, chunk_size=8192, mp_context=fork_context, offload=True) as executor:
+        submitted = []
+        submit = executor.submit
+        executor.submit = lambda *args: submitted.append(args[0].__name__) or submit(*args)
+        
+        batch = {'action': 'predict_yield_batch', 'features': yield_columns}
+        assert executor.run_action(batch) == ml.run_action(batch)
+    
+    assert submitted == ['_run_parallel_chunk']
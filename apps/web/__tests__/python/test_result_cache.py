@@ -0,0 +1,78 @@
+"""Memoized single-field results: LRU eviction, TTL expiry, counters and invalidation on reload"""
+
+import time
+
+REQUEST = {'action': 'predict_yield', 'features': {'soil_ph': 6.5, 'satellite_ndvi': 0.7}, 'crop_type': 'wheat'}
+
+
+def test_keys_ignore_key_order_but_not_the_model_version(ml):
+    reordered = {'crop_type': 'wheat', 'features': {'satellite_ndvi': 0.7, 'soil_ph': 6.5}, 'action': 'predict_yield'}
+    
+    assert ml.ResultCache.make_key(REQUEST, 'v1') == ml.ResultCache.make_key(reordered, 'v1')
+    assert ml.ResultCache.make_key(REQUEST, 'v1') != ml.ResultCache.make_key(REQUEST, 'v2')
+
+
+def test_least_recently_used_entry_is_evicted(ml):
+    cache = ml.ResultCache(max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == (True, 1)
+    
+    cache.put('c', 3)
+    
+    assert cache.get('b') == (False, None)
+    assert cache.get('a') == (True, 1)
+    assert cache.get('c') == (True, 3)
+    assert cache.stats()['evictions'] == 1
+
+
+def test_entries_expire_after_their_ttl(ml):
+    cache = ml.ResultCache(max_entries=8, ttl_seconds=0.05)
+    cache.put('a', 1)
+    assert cache.get('a') == (True, 1)
+    
+    time.sleep(0.1)
+    
+    assert cache.get('a') == (False, None)
+    assert cache.stats()['entries'] == 0
+
+
+def test_hits_and_misses_are_counted(ml):
+    cache = ml.ResultCache(max_entries=8)
+    cache.get('a')
+    cache.put('a', 1)
+    cache.get('a')
+    cache.get('a')
+    
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (2, 1, 1)
+    assert stats['hit_rate'] == round(2 / 3, 4)
+
+
+def test_repeated_requests_are_served_from_the_cache(ml, model):
+    cache = ml.configure_result_cache(16)
+    
+    first = ml.run_action(dict(REQUEST))
+    second = ml.run_action(dict(REQUEST))
+    
+    assert second is first
+    assert first == model.predict_yield(REQUEST['features'], 'wheat')
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_batch_actions_are_not_cached(ml):
+    cache = ml.configure_result_cache(16)
+    
+    ml.run_action({'action': 'predict_yield_batch', 'features': {'soil_ph': [6.5, 7.0]}})
+    
+    assert cache.stats()['entries'] == 0
+
+
+def test_model_reload_empties_the_cache(ml):
+    cache = ml.configure_result_cache(16)
+    first = ml.run_action(dict(REQUEST))
+    
+    ml.model_registry.reload()
+    
+    assert cache.stats()['entries'] == 0
+    assert ml.run_action(dict(REQUEST)) is not first
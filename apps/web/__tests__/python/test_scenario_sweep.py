@@ -0,0 +1,93 @@
+"""Scenario sweeps agree point by point with predict_yield and optimize_irrigation"""
+
+import itertools
+
+import pytest
+
+BASE_FEATURES = {'weather_temp': 22, 'weather_rainfall': 480, 'soil_ph': 6.5, 'satellite_ndvi': 0.72, 'soil_n': 30}
+
+
+def _grid(perturbations):
+    axes = [(name, mode, levels) for name, spec in perturbations.items() for mode, levels in spec.items()]
+    for index in itertools.product(*[range(len(levels)) for _, _, levels in axes]):
+        yield index, {name: (mode, levels[i]) for (name, mode, levels), i in zip(axes, index)}
+
+
+def test_yield_sweep_matches_predict_yield(ml, model):
+    perturbations = {
+        'weather_rainfall': {'scale': [0.8, 0.9, 1.0, 1.1]},
+        'soil_n': {'offset': [-10, -2.5, 0, 10]},
+        'satellite_ndvi': {'values': [0.31, 0.5, 0.72, 0.9]},
+        'irrigation_mm': {'values': [0, 10, 25]}
+    }
+    result = ml.run_action({'action': 'scenario_sweep', 'features': BASE_FEATURES, 'crop_type': 'soybean',
+                            'perturbations': perturbations})
+    outputs = result['outputs']
+    
+    assert result['sweep_info']['shape'] == [4, 4, 4, 3]
+    for index, levels in _grid(perturbations):
+        features = dict(BASE_FEATURES,
+                        weather_rainfall=BASE_FEATURES['weather_rainfall'] * levels['weather_rainfall'][1]
+                        + levels['irrigation_mm'][1],
+                        soil_n=BASE_FEATURES['soil_n'] + levels['soil_n'][1],
+                        satellite_ndvi=levels['satellite_ndvi'][1])
+        expected = model.predict_yield(features, 'soybean')
+        assert outputs['predicted_yield'][index] == expected['predicted_yield']
+        assert outputs['lower_bound'][index] == expected['uncertainty']['lower_bound']
+        assert outputs['upper_bound'][index] == expected['uncertainty']['upper_bound']
+        assert outputs['confidence'][index] == expected['confidence']
+
+
+def test_irrigation_sweep_matches_optimize_irrigation(ml, model, field_data):
+    perturbations = {
+        'precipitation': {'scale': [0, 1, 3]},
+        'temperature': {'offset': [-10, 0, 6]},
+        'humidity': {'values': [30, 90]},
+        'soil_moisture': {'values': [0.13, 0.2, 0.3]},
+        'irrigation_mm': {'values': [0, 20, 50]}
+    }
+    result = ml.run_action({'action': 'scenario_sweep', 'target': 'irrigation', 'field_data': field_data,
+                            'perturbations': perturbations})
+    outputs = result['outputs']
+    
+    for index, levels in _grid(perturbations):
+        forecast = [dict(day, precipitation=day['precipitation'] * levels['precipitation'][1],
+                         temperature=day['temperature'] + levels['temperature'][1], humidity=levels['humidity'][1])
+                    for day in field_data['weather_forecast']]
+        soil_moisture = min(levels['soil_moisture'][1] + levels['irrigation_mm'][1] / 1000,
+                            field_data['field_capacity'])
+        expected = model.optimize_irrigation(dict(field_data, weather_forecast=forecast, soil_moisture=soil_moisture))
+        
+        assert outputs['recommended_amount'][index] == expected['recommended_amount']
+        assert outputs['water_stress_level'][index] == expected['water_stress_level']
+        assert ml.MLInference.URGENCY_LEVELS[outputs['urgency_code'][index]] == expected['urgency']
+        assert ml.MLInference.IRRIGATION_TIMINGS[outputs['timing_code'][index]] == expected['timing']
+
+
+def test_sweep_reports_sensitivity_at_the_base(ml):
+    perturbations = {'soil_n': {'offset': [-10, 0, 10]}, 'satellite_ndvi': {'values': [0.5, 0.72, 0.9]}}
+    result = ml.run_action({'action': 'scenario_sweep', 'features': BASE_FEATURES, 'perturbations': perturbations})
+    
+    assert [axis['base_index'] for axis in result['axes']] == [1, 1]
+    assert result['sweep_info']['ranking'][0] == 'satellite_ndvi'
+
+
+@pytest.mark.parametrize('perturbations, field', [
+    ({'weather_rainfall': {'offset': [-1000]}}, 'perturbations.weather_rainfall.offset[0]'),
+    ({'no_such_input': {'scale': [1]}}, 'perturbations.no_such_input'),
+    ({'soil_ph': {'multiply': [1]}}, 'perturbations.soil_ph'),
+    ({'irrigation_mm': {'values': [-5]}}, 'perturbations.irrigation_mm.values'),
+])
+def test_invalid_perturbations_are_422(ml, perturbations, field):
+    with pytest.raises(ml.ValidationError) as raised:
+        ml.run_action({'action': 'scenario_sweep', 'features': BASE_FEATURES, 'perturbations': perturbations})
+    
+    assert raised.value.status == 422
+    assert [error['field'] for error in raised.value.errors] == [field]
+
+
+def test_oversized_sweep_is_refused(ml):
+    perturbations = {name: {'values': list(range(1, 101))} for name in ('soil_n', 'soil_p', 'weather_gdd', 'soil_om')}
+    
+    with pytest.raises(ml.ValidationError, match='at most'):
+        ml.run_action({'action': 'scenario_sweep', 'features': BASE_FEATURES, 'perturbations': perturbations})
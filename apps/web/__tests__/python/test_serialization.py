@@ -0,0 +1,35 @@
+"""NumPy-aware JSON encoding and columnar batch output"""
+
+import json
+
+
+def test_serializers_encode_numpy_values_like_python_values(ml):
+    import numpy as np
+    
+    payload = {'yield': np.float64(8.25), 'count': np.int64(3), 'ok': np.bool_(True),
+               'column': np.array([1.5, np.nan, 2.0]), 'codes': np.arange(3, dtype=np.int8)}
+    expected = {'yield': 8.25, 'count': 3, 'ok': True, 'column': [1.5, None, 2.0], 'codes': [0, 1, 2]}
+    
+    assert json.loads(ml.make_json_serializer('json').dumps(payload)) == expected
+    if ml.orjson is not None:
+        assert json.loads(ml.make_json_serializer('orjson').dumps(payload)) == expected
+
+
+def test_columnar_output_matches_rows(model, yield_columns):
+    rows = model.predict_yield_batch(yield_columns)['predictions']
+    columns = model.predict_yield_batch(yield_columns, output='columnar')['columns']
+    
+    assert columns['predicted_yield'].tolist() == [row['predicted_yield'] for row in rows]
+    assert columns['lower_bound'].tolist() == [row['uncertainty']['lower_bound'] for row in rows]
+    assert columns['confidence'].tolist() == [row['confidence'] for row in rows]
+
+
+def test_round_array_matches_round(ml, rng):
+    import numpy as np
+    
+    ties = np.round(rng.uniform(0, 20, 2000), 2) + 0.005
+    values = np.concatenate([rng.uniform(-50, 50, 20000), ties, [8.525, 2.675, 0.125, np.nan]])
+    
+    for decimals in (1, 2, 3):
+        expected = [round(value, decimals) for value in values.tolist()]
+        np.testing.assert_array_equal(ml.round_array(values, decimals), expected)
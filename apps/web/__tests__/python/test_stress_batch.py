@@ -0,0 +1,35 @@
+"""The vectorized multi-field stress engine agrees with analyze_stress_patterns"""
+
+import pytest
+
+
+def test_analyze_stress_batch_matches_analyze_stress_patterns(model, rng):
+    dates = [f"2026-06-{day:02d}" for day in range(1, 9)]
+    ndvi = rng.uniform(0.2, 0.9, (40, len(dates))).round(3)
+    
+    batch = model.analyze_stress_batch(ndvi.tolist(), dates)['fields']
+    for row, entry in zip(ndvi.tolist(), batch):
+        single = model.analyze_stress_patterns([{'date': d, 'ndvi': v} for d, v in zip(dates, row)])
+        assert entry['data'] == single
+
+
+def test_fields_with_fewer_than_3_observations_fail_alone(model):
+    ndvi = [[0.5, 0.6, 0.7, 0.65], [0.5, None, None, 0.6], [0.4, 0.45, None, 0.5]]
+    
+    fields = model.analyze_stress_batch(ndvi)['fields']
+    
+    assert [field['success'] for field in fields] == [True, False, True]
+    assert 'At least 3 observations' in fields[1]['error']
+
+
+def test_missing_readings_do_not_count_as_observations(ml, model):
+    series = [{'date': '2026-06-01', 'ndvi': 0.5}, {'date': '2026-06-02', 'ndvi': None},
+              {'date': '2026-06-03', 'ndvi': 0.6}]
+    
+    with pytest.raises(ml.ValidationError) as raised:
+        model.analyze_stress_patterns(series)
+    assert raised.value.status == 422
+    
+    series.append({'date': '2026-06-04', 'ndvi': 0.7})
+    batch = model.analyze_stress_batch([[0.5, None, 0.6, 0.7]], [obs['date'] for obs in series])
+    assert model.analyze_stress_patterns(series) == batch['fields'][0]['data']
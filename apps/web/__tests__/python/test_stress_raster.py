@@ -0,0 +1,128 @@
+"""Tiled per-pixel raster stress maps agree with the per-field batch engine"""
+
+import json
+import types
+
+import pytest
+
+
+@pytest.fixture
+def stack(rng):
+    """8 dates over a 9 x 7 raster with gaps, including pixels left with fewer than 3 observations"""
+    import numpy as np
+    
+    ndvi = rng.uniform(0.2, 0.9, (8, 9, 7)).round(3)
+    ndvi[rng.uniform(size=ndvi.shape) < 0.2] = np.nan
+    ndvi[2:, 0, 0] = np.nan
+    return ndvi
+
+
+@pytest.fixture
+def zones(rng):
+    return rng.integers(0, 3, (9, 7))
+
+
+def _batch_columns(model, stack):
+    n_dates = stack.shape[0]
+    return model.analyze_stress_batch(stack.reshape(n_dates, -1).T, output='columnar')['columns']
+
+
+def test_tiles_match_per_pixel_batch_analysis(model, stack):
+    import numpy as np
+    
+    result = model.analyze_stress_raster(stack, tile_rows=2)
+    columns = _batch_columns(model, stack)
+    grids = {name: grid.reshape(-1) for name, grid in result['grids'].items()}
+    
+    assert result['raster_info']['tile_rows'] == 2
+    assert result['raster_info']['analyzed_pixels'] == int(columns['success'].sum()) < stack[0].size
+    levels = [model.STRESS_LEVELS[code] if code >= 0 else None for code in grids['stress_code'].tolist()]
+    assert levels == columns['stress_level']
+    trends = [model.TREND_DIRECTIONS[code] if code >= 0 else None for code in grids['trend_code'].tolist()]
+    assert trends == columns['trend_direction']
+    np.testing.assert_allclose(grids['mean_ndvi'], columns['mean_ndvi'], atol=5e-4)
+    np.testing.assert_allclose(grids['trend_slope'], columns['trend_slope'], atol=5e-5)
+    anomaly_count = np.bincount(columns['anomalies']['field_index'], minlength=stack[0].size)
+    np.testing.assert_array_equal(grids['anomaly_count'], anomaly_count)
+
+
+def test_tile_size_does_not_change_the_result(model, stack, zones):
+    import numpy as np
+    
+    whole = model.analyze_stress_raster(stack, zones=zones, tile_rows=stack.shape[1])
+    
+    for tile_rows in (1, 4):
+        tiled = model.analyze_stress_raster(stack, zones=zones, tile_rows=tile_rows)
+        for name, grid in whole['grids'].items():
+            np.testing.assert_array_equal(tiled['grids'][name], grid)
+        assert tiled['zones'] == whole['zones']
+
+
+def test_zone_summaries(model, stack, zones):
+    import numpy as np
+    
+    result = model.analyze_stress_raster(stack, zones=zones, tile_rows=3)
+    columns = _batch_columns(model, stack)
+    labels = zones.reshape(-1)
+    
+    assert [summary['zone'] for summary in result['zones']] == [0, 1, 2]
+    for summary in result['zones']:
+        in_zone = labels == summary['zone']
+        analyzed = in_zone & columns['success']
+        levels = [level for level, ok in zip(columns['stress_level'], analyzed.tolist()) if ok]
+        
+        assert summary['pixels'] == int(in_zone.sum())
+        assert summary['analyzed_pixels'] == len(levels)
+        for level, share in summary['stress_distribution'].items():
+            assert share == round(levels.count(level) / len(levels), 4)
+        assert summary['mean_ndvi'] == pytest.approx(float(np.mean(columns['mean_ndvi'][analyzed])), abs=1e-3)
+
+
+def test_grids_are_written_as_memory_mapped_files(model, stack, tmp_path):
+    import numpy as np
+    
+    in_memory = model.analyze_stress_raster(stack, tile_rows=2)
+    result = model.analyze_stress_raster(stack, tile_rows=2, output_dir=str(tmp_path))
+    
+    for name, grid in in_memory['grids'].items():
+        assert isinstance(result['grids'][name], np.memmap)
+        np.testing.assert_array_equal(np.load(tmp_path / f"{name}.npy", mmap_mode='r'), grid)
+
+
+def test_raster_action_over_a_request(ml, stack):
+    import numpy as np
+    
+    stack = np.where(np.isnan(stack), None, stack).tolist()
+    result = ml.run_action({'action': 'analyze_stress_raster', 'ndvi_stack': stack,
+                            'dates': [f"2026-06-{day:02d}" for day in range(1, 9)]})
+    
+    assert result['grids']['stress_code'].shape == (9, 7)
+    assert result['raster_info']['date_range'] == '2026-06-01 to 2026-06-08'
+
+
+# One 2 x 2 time step
+_FRAME = [[0.5, 0.6], [0.55, 0.65]]
+
+
+@pytest.mark.parametrize('body, status, field', [
+    ({'ndvi_stack': [[0.5, 0.6], [0.55, 0.65]]}, 400, 'ndvi_stack'),
+    ({'ndvi_stack': [_FRAME, [[0.5, 0.6]]]}, 400, 'ndvi_stack'),
+    ({'ndvi_stack': [_FRAME, _FRAME, [[0.5, 'dry'], [0.55, 0.65]]]}, 400, 'ndvi_stack'),
+    ({'ndvi_stack': [_FRAME, _FRAME, _FRAME], 'dates': ['2026-06-01']}, 400, 'dates'),
+    ({'ndvi_stack': [_FRAME, _FRAME, _FRAME], 'zones': [[0, 1]]}, 400, 'zones'),
+    ({'ndvi_stack': [_FRAME, _FRAME, _FRAME], 'zones': [[0, 1], [0.5, 1]]}, 400, 'zones'),
+    ({'ndvi_stack': [_FRAME, _FRAME, _FRAME], 'zones': [[0, 1], [-1, 1]]}, 422, 'zones'),
+    ({'ndvi_stack': [_FRAME, _FRAME, _FRAME], 'output': 'tiles'}, 400, 'output'),
+])
+def test_malformed_raster_requests_are_4xx(ml, body, status, field):
+    request = types.SimpleNamespace(method='POST', body=json.dumps(dict(body, action='analyze_stress_raster')),
+                                    headers={'Content-Type': 'application/json'})
+    response = ml.handler(request, None)
+    
+    assert response['statusCode'] == status
+    assert [error['field'] for error in json.loads(response['body'])['errors']] == [field]
+
+
+def test_tile_rows_must_be_positive(ml, model, stack):
+    with pytest.raises(ml.ValidationError, match='tile_rows'):
+        model.analyze_stress_raster(stack, tile_rows=0)
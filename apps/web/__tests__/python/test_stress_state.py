@@ -0,0 +1,38 @@
+"""Incremental per-field stress state agrees with a full recompute"""
+
+import pytest
+
+
+def test_incremental_stress_matches_full_recompute(model, rng):
+    observations = [{'date': f"2026-{month:02d}-{day:02d}", 'ndvi': round(float(value), 3)}
+                    for (month, day), value in zip([(m, d) for m in (5, 6, 7) for d in (1, 11, 21)],
+                                                   rng.uniform(0.3, 0.85, 9))]
+    
+    state = None
+    for start in range(0, len(observations), 2):
+        update = model.update_stress_state(state, observations[start:start + 2])
+        state = update['state']
+    
+    full = model.analyze_stress_patterns(observations)
+    incremental = update['result']
+    assert incremental['stress_level'] == full['stress_level']
+    assert incremental['trend'] == full['trend']
+    for key, value in full['statistics'].items():
+        assert incremental['statistics'][key] == pytest.approx(value, abs=1e-3)
+
+
+def test_state_round_trips_through_bytes(ml, model):
+    update = model.update_stress_state(None, [{'date': '2026-06-01', 'ndvi': 0.6},
+                                              {'date': '2026-06-11', 'ndvi': 0.7}])
+    state = ml.StressState.from_dict(update['state'])
+    
+    assert ml.StressState.from_bytes(state.to_bytes()).to_dict() == state.to_dict()
+
+
+def test_incremental_stress_skips_passes_without_ndvi(model):
+    observations = [{'date': '2026-06-01', 'ndvi': 0.6}, {'date': '2026-06-02', 'ndvi': None},
+                    {'date': '2026-06-03', 'ndvi': 0.7}, {'date': '2026-06-04', 'ndvi': 0.65}]
+    
+    update = model.update_stress_state(None, observations)
+    assert update['state']['count'] == 3
+    assert update['result'] is not None
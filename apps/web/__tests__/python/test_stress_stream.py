@@ -0,0 +1,105 @@
+"""NDJSON stress streaming: line splitting, per-line error records and the chunked HTTP path"""
+
+import http.client
+import http.server
+import json
+import threading
+import types
+
+import pytest
+
+
+def _series(ndvi):
+    return [{'date': f"2026-06-{day:02d}", 'ndvi': value} for day, value in enumerate(ndvi, start=1)]
+
+
+def test_lines_are_split_across_blocks(ml):
+    blocks = [b'{"a": 1}\n{"b"', b': 2}\n\n{"c', b'": 3}']
+    
+    assert list(ml.split_stream_lines(blocks)) == [b'{"a": 1}', b'{"b": 2}', b'', b'{"c": 3}']
+
+
+def test_oversized_lines_are_dropped_without_buffering_them(ml):
+    blocks = [b'{"a": 1}\n', b'x' * 6, b'x' * 6, b'xx\n{"b": 2}\n', b'y' * 20]
+    
+    assert list(ml.split_stream_lines(blocks, max_line_bytes=10)) == [b'{"a": 1}', None, b'{"b": 2}', None]
+
+
+def test_each_bad_line_gets_its_own_error_record(model):
+    lines = [json.dumps({'field_id': 'north', 'satellite_data': _series([0.6, 0.65, 0.7])}).encode(), b'',
+             b'{"field_id": ', b'[1, 2]', None, json.dumps({'field_id': 'south'}).encode()]
+    
+    records = list(model.analyze_stress_stream(lines))
+    
+    assert [record['line'] for record in records] == [1, 3, 4, 5, 6]
+    assert [record['success'] for record in records] == [True, False, False, False, False]
+    assert records[0]['data'] == model.analyze_stress_patterns(_series([0.6, 0.65, 0.7]))
+    assert 'exceeds' in records[3]['error']
+    assert records[4]['field_id'] == 'south'
+
+
+def test_invalid_series_get_an_error_record(model):
+    lines = [json.dumps({'field_id': 'north', 'satellite_data': _series([0.5, None, 0.6])}).encode(),
+             json.dumps({'field_id': 'south', 'satellite_data': _series([0.5, 3, 0.6])}).encode()]
+    
+    records = list(model.analyze_stress_stream(lines))
+    
+    assert [record['success'] for record in records] == [False, False]
+    assert 'data' not in records[0]
+    assert [error['field'] for error in records[0]['errors']] == ['satellite_data']
+    assert [error['field'] for error in records[1]['errors']] == ['satellite_data[1].ndvi']
+
+
+def test_handler_answers_an_ndjson_body(ml, model):
+    body = '\n'.join(json.dumps({'field_id': i, 'satellite_data': _series([0.5 + i / 10, 0.6, 0.55])})
+                     for i in range(3))
+    request = types.SimpleNamespace(method='POST', body=body, headers={'Content-Type': ml.NDJSON_CONTENT_TYPE})
+    
+    response = ml.handler(request, None)
+    
+    assert response['statusCode'] == 200
+    assert response['headers']['Content-Type'] == ml.NDJSON_CONTENT_TYPE
+    records = [json.loads(line) for line in response['body'].splitlines()]
+    assert [record['field_id'] for record in records] == [0, 1, 2]
+    assert all(record['success'] for record in records)
+
+
+@pytest.fixture
+def stream_server(ml):
+    handler_class = type('StreamHandler', (ml.Handler,), {'protocol_version': 'HTTP/1.1',
+                                                          'log_message': lambda self, *args: None})
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler_class)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_chunked_upload_streams_one_record_per_line(ml, model, stream_server):
+    good = json.dumps({'field_id': 'north', 'satellite_data': _series([0.7, 0.6, 0.5, 0.45])}).encode()
+    oversized = b'{"field_id": "' + b'x' * ml.MAX_STREAM_LINE_BYTES + b'"}'
+    sparse = json.dumps({'field_id': 'south', 'satellite_data': _series([0.7, None, 0.5])}).encode()
+    
+    def body():
+        # Split inside lines, as a client flushing fixed-size buffers would
+        data = good + b'\n' + oversized + b'\nnot json\n' + sparse + b'\n' + good
+        for start in range(0, len(data), 65536):
+            yield data[start:start + 65536]
+    
+    connection = http.client.HTTPConnection('127.0.0.1', stream_server.server_address[1], timeout=30)
+    connection.request('POST', '/', body=body(), headers={'Content-Type': ml.NDJSON_CONTENT_TYPE},
+                       encode_chunked=True)
+    response = connection.getresponse()
+    
+    assert response.status == 200
+    assert response.getheader('Transfer-Encoding') == 'chunked'
+    records = [json.loads(line) for line in response.read().splitlines()]
+    connection.close()
+    
+    assert [(record['line'], record['success']) for record in records] == \
+        [(1, True), (2, False), (3, False), (4, False), (5, True)]
+    assert records[3]['field_id'] == 'south'
+    assert [error['field'] for error in records[3]['errors']] == ['satellite_data']
+    assert records[0]['data'] == records[4]['data'] == model.analyze_stress_patterns(
+        _series([0.7, 0.6, 0.5, 0.45]))
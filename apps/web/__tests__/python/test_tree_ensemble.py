@@ -0,0 +1,33 @@
+"""Scikit-learn forests exported to the array-backed tree ensemble"""
+
+import pickle
+import warnings
+
+import pytest
+
+
+def test_forest_export_matches_sklearn(ml, rng, tmp_path):
+    import numpy as np
+    ensemble = pytest.importorskip('sklearn.ensemble')
+    
+    names = ['weather_temp', 'weather_rainfall', 'soil_ph', 'soil_n', 'satellite_ndvi']
+    X = rng.uniform([10, 200, 5, 0, 0.2], [32, 900, 8, 80, 0.9], (400, len(names)))
+    y = 3 + 6 * X[:, 4] + X[:, 1] / 300 + rng.normal(0, 0.3, len(X))
+    forest = ensemble.RandomForestRegressor(n_estimators=20, max_depth=8, random_state=0)
+    forest.fit(X, y)
+    # As if fitted on a DataFrame, without needing pandas here
+    forest.feature_names_in_ = np.array(names, dtype=object)
+    
+    sklearn_path = tmp_path / 'forest.pkl'
+    sklearn_path.write_bytes(pickle.dumps(forest))
+    artifact = str(tmp_path / 'yield-rf.cropsmodel')
+    ml.export_model_artifact(artifact, 'yield-rf', str(sklearn_path))
+    
+    exported = ml.MLInference(model_version='yield-rf', model_path=artifact)
+    X_test = rng.uniform([10, 200, 5, 0, 0.2], [32, 900, 8, 80, 0.9], (200, len(names)))
+    scores = exported.yield_model.score(X_test, ['corn'] * len(X_test))
+    
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)
+        expected = forest.predict(X_test)
+    assert scores['predicted_yield'].tolist() == pytest.approx(expected.tolist(), rel=1e-12)
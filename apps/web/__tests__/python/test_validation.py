@@ -0,0 +1,90 @@
+"""Invalid input is answered with 4xx and field errors, before any model is loaded"""
+
+import json
+import types
+
+import pytest
+
+
+def _call(ml, body):
+    request = types.SimpleNamespace(method='POST', body=json.dumps(body),
+                                    headers={'Content-Type': 'application/json'})
+    response = ml.handler(request, None)
+    return response['statusCode'], json.loads(response['body'])
+
+
+@pytest.mark.parametrize('body, status, field', [
+    ({'action': 'no_such_action'}, 400, 'action'),
+    ({'action': 'predict_yield'}, 400, 'features'),
+    ({'action': 'predict_yield', 'features': {'soil_ph': 15}}, 422, 'features.soil_ph'),
+    ({'action': 'predict_yield', 'features': {'soil_ph': 'acidic'}}, 422, 'features.soil_ph'),
+    ({'action': 'predict_yield_batch', 'features': 5}, 400, 'features'),
+    ({'action': 'predict_yield_batch', 'features': {'soil_ph': 6.5}}, 400, 'features.soil_ph'),
+    ({'action': 'predict_yield_batch', 'features': [{'soil_ph': 6.5}, [6.5]]}, 400, 'features'),
+    ({'action': 'analyze_stress', 'satellite_data': [{'date': '2026-06-01', 'ndvi': 3}]}, 422,
+     'satellite_data[0].ndvi'),
+    ({'action': 'analyze_stress', 'satellite_data': [{'date': '2026-06-01', 'ndvi': 0.5},
+                                                     {'date': '2026-06-02', 'ndvi': None},
+                                                     {'date': '2026-06-03', 'ndvi': 0.6}]}, 422, 'satellite_data'),
+    ({'action': 'analyze_stress_incremental', 'satellite_data': [{'date': '2026-06-01', 'ndvi': 0.5}],
+      'state': {'count': 'x'}}, 400, 'state.count'),
+    ({'action': 'analyze_stress_incremental', 'satellite_data': [{'date': '2026-06-01', 'ndvi': 0.5}],
+      'state': [1, 2]}, 400, 'state'),
+    ({'action': 'optimize_irrigation', 'field_data': {'soil_moisture': 1.5}}, 422, 'field_data.soil_moisture'),
+    ({'action': 'schedule_irrigation', 'fields': [{'soil_moisture': 0.2}]}, 400, 'weather_forecast'),
+    ({'action': 'scenario_sweep', 'features': {'soil_ph': 6.5}}, 400, 'perturbations'),
+])
+def test_invalid_requests_skip_numpy_and_model_loading(ml, body, status, field):
+    ml.model_registry.invalidate()
+    
+    code, response = _call(ml, body)
+    
+    assert code == status
+    assert response['success'] is False
+    assert field in [error['field'] for error in response['errors']]
+    assert 'traceback' not in response
+    assert ml.model_registry.loaded_versions() == []
+
+
+@pytest.mark.parametrize('body, status, field', [
+    ({'action': 'schedule_irrigation', 'fields': [{'soil_moisture': 0.2}], 'weather_forecast': []}, 400,
+     'weather_forecast'),
+    ({'action': 'scenario_sweep', 'features': {'soil_ph': 6.5}, 'perturbations': {'soil_om': {'scale': [1, 2]}}},
+     422, 'perturbations.soil_om'),
+])
+def test_input_errors_found_while_scoring_are_4xx(ml, body, status, field):
+    code, response = _call(ml, body)
+    
+    assert code == status
+    assert [error['field'] for error in response['errors']] == [field]
+    assert 'traceback' not in response
+
+
+def test_batch_rows_are_rejected_individually(ml):
+    features = {'soil_ph': [6.5, 15, None, 7.0], 'soil_n': [20, 30, 'lots', 40]}
+    result = ml.run_action({'action': 'predict_yield_batch', 'features': features})
+    
+    statuses = [row.get('status', 200) for row in result['predictions']]
+    assert statuses == [200, 422, 422, 200]
+    assert result['batch_info']['rejected'] == 2
+    assert result['predictions'][2]['errors'] == [{'field': 'soil_n', 'message': 'must be a number'}]
+
+
+def test_columnar_batch_lists_rejected_rows(ml):
+    features = {'soil_ph': [6.5, 15, 7.0]}
+    result = ml.run_action({'action': 'predict_yield_batch', 'features': features, 'output': 'columnar'})
+    
+    assert [error['row'] for error in result['errors']] == [1]
+    assert result['columns']['predicted_yield'][1] != result['columns']['predicted_yield'][1]
+
+
+def test_batch_features_as_list_of_mappings(ml, model):
+    rows = [{'soil_ph': 6.5, 'soil_n': 20}, {'soil_ph': 7.1}, {'satellite_ndvi': 0.4, 'soil_n': 55}]
+    result = ml.run_action({'action': 'predict_yield_batch', 'features': rows})
+    
+    assert result['predictions'] == [model.predict_yield(row) for row in rows]
+
+
+def test_malformed_body_is_400(ml):
+    request = types.SimpleNamespace(method='POST', body='{"action": ', headers={'Content-Type': 'application/json'})
+    assert ml.handler(request, None)['statusCode'] == 400
@@ -0,0 +1,21 @@
+"""Vectorized predict_yield_batch agrees with predict_yield row by row"""
+
+
+def _rows(features):
+    n = len(next(iter(features.values())))
+    return [{name: values[i] for name, values in features.items() if values[i] is not None} for i in range(n)]
+
+
+def test_predict_yield_batch_matches_predict_yield(model, yield_columns):
+    batch = model.predict_yield_batch(yield_columns, 'soybean')['predictions']
+    
+    for row, predicted in zip(_rows(yield_columns), batch):
+        assert predicted == model.predict_yield(row, 'soybean')
+
+
+def test_per_row_crop_types(model, yield_columns):
+    crop_types = ['corn', 'wheat', 'soybean', 'rice'] * 125
+    batch = model.predict_yield_batch(yield_columns, crop_types)['predictions']
+    
+    for row, crop_type, predicted in zip(_rows(yield_columns), crop_types, batch):
+        assert predicted == model.predict_yield(row, crop_type)
@@ -4,396 +4,4332 @@ Provides serverless ML model inference capabilities using scikit-learn and numpy
 for agricultural data analysis that requires advanced statistical processing.
 """
 
+from __future__ import annotations
+
+import base64
+import hashlib
+import importlib
 import json
-import numpy as np
-from typing import Dict, List, Any, Optional, Tuple
-from http.server import BaseHTTPRequestHandler
+import math
+import numbers
+import os
+import queue
+import random
+import struct
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Dict, List, Any, Optional, Tuple, Callable, Iterable, Iterator
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import urlparse, parse_qs
 import traceback
 
+try:
+    import orjson
+except ImportError:  # optional, responses fall back to the stdlib encoder
+    orjson = None
 
-class MLInference:
+
+class _LazyModule:
     """
-    Machine Learning inference handler for agricultural predictions
+    Stand-in for a heavy module that is imported on first attribute access
+    
+    Cold starts that only answer a preflight or an error never pay for the
+    import. The first access rebinds the module global to the real module, so
+    later lookups cost nothing extra.
     """
     
-    def __init__(self):
-        self.models = {}
-        self.feature_scalers = {}
-        self.crop_encoders = {}
-        self.load_models()
+    def __init__(self, module_name: str, global_name: str):
+        self._module_name = module_name
+        self._global_name = global_name
     
-    def load_models(self):
-        """Load pre-trained models and scalers"""
-        # Simulate loading pre-trained models
-        # In production, these would be loaded from cloud storage
+    def __getattr__(self, attr: str):
+        module = importlib.import_module(self._module_name)
+        globals()[self._global_name] = module
+        return getattr(module, attr)
+
+
+np = _LazyModule('numpy', 'np')
+
+
+# Model version served when a caller does not ask for a specific one. Only this
+# version and the in-code one may be served without a compiled artifact
+BUILTIN_MODEL_VERSION = 'builtin-1.0'
+DEFAULT_MODEL_VERSION = os.environ.get('ML_MODEL_VERSION', BUILTIN_MODEL_VERSION)
+
+# Directory holding compiled model artifacts named <model_version>.cropsmodel
+MODEL_ARTIFACT_DIR = os.environ.get('ML_MODEL_DIR', '')
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Newline-delimited JSON bodies are processed one record at a time
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+MAX_STREAM_LINE_BYTES = int(os.environ.get('ML_MAX_STREAM_LINE_BYTES', 4 * 1024 * 1024))
+_STREAM_READ_SIZE = 64 * 1024
+
+# Opt-in memoization of repeated single-field requests (0 disables the cache)
+RESULT_CACHE_SIZE = int(os.environ.get('ML_RESULT_CACHE_SIZE', 0))
+RESULT_CACHE_TTL = float(os.environ.get('ML_RESULT_CACHE_TTL', 60))
+
+# JSON encoder for responses: 'auto' prefers orjson when it is installed
+JSON_ENCODER = os.environ.get('ML_JSON_ENCODER', 'auto').lower()
+
+# Default row chunk size and worker count for ParallelExecutor (0 workers means one per CPU)
+PARALLEL_CHUNK_SIZE = int(os.environ.get('ML_PARALLEL_CHUNK_SIZE', 8192))
+PARALLEL_WORKERS = int(os.environ.get('ML_PARALLEL_WORKERS', 0))
+
+# Pixels per tile when analyzing NDVI raster stacks, bounding memory per tile
+RASTER_TILE_PIXELS = int(os.environ.get('ML_RASTER_TILE_PIXELS', 16384))
+
+# Scenario sweeps: largest grid per request and scenarios scored per block
+SWEEP_MAX_SCENARIOS = int(os.environ.get('ML_SWEEP_MAX_SCENARIOS', 1000000))
+SWEEP_BLOCK_ROWS = int(os.environ.get('ML_SWEEP_BLOCK_ROWS', 65536))
+
+# Load NumPy and the default model while the module is imported instead of on the first request
+WARM_UP_ON_IMPORT = os.environ.get('ML_WARM_UP', '').lower() in ('1', 'true', 'yes')
+
+# SQLite feature store of per-field observations, disabled when unset
+FEATURE_STORE_PATH = os.environ.get('ML_FEATURE_STORE', '')
+
+# A/B routing of a fraction of yield traffic to a candidate model version
+AB_CANDIDATE_VERSION = os.environ.get('ML_AB_CANDIDATE', '')
+AB_TRAFFIC_FRACTION = float(os.environ.get('ML_AB_FRACTION', 0.0))
+
+# Shadow scoring of predict_yield with another model version, logged off the request path
+SHADOW_MODEL_VERSION = os.environ.get('ML_SHADOW_VERSION', '')
+SHADOW_LOG_PATH = os.environ.get('ML_SHADOW_LOG', 'shadow.cropsab')
+SHADOW_SAMPLE_FRACTION = float(os.environ.get('ML_SHADOW_FRACTION', 1.0))
+SHADOW_QUEUE_SIZE = int(os.environ.get('ML_SHADOW_QUEUE_SIZE', 10000))
+SHADOW_LOG_MAGIC = b'CROPSAB1'
+
+# Micro-batching of concurrent predict_yield calls (a 0 ms window disables it)
+MICROBATCH_WINDOW_MS = float(os.environ.get('ML_MICROBATCH_WINDOW_MS', 0))
+MICROBATCH_MAX_SIZE = int(os.environ.get('ML_MICROBATCH_MAX_SIZE', 64))
+
+# Per-stage request timing histograms and Server-Timing headers
+METRICS_ENABLED = os.environ.get('ML_METRICS', '').lower() in ('1', 'true', 'yes')
+
+# Binary columnar bodies: the model artifact container with its own magic number
+COLUMNAR_CONTENT_TYPE = 'application/vnd.crops.columnar'
+COLUMNAR_MAGIC = b'CROPSCOL'
+
+MODEL_ARTIFACT_MAGIC = b'CROPSML1'
+MODEL_ARTIFACT_SUFFIX = '.cropsmodel'
+_ARRAY_ALIGNMENT = 64
+_CONTAINER_PREFIX = struct.Struct('<8sII')
+
+
+def split_stream_lines(blocks: Iterable[bytes], max_line_bytes: int = MAX_STREAM_LINE_BYTES) -> Iterator[Optional[bytes]]:
+    """
+    Split a stream of byte blocks into lines while holding at most one line
+    
+    Lines longer than max_line_bytes are discarded as they arrive and reported
+    as None, so memory stays bounded no matter what the client sends.
+    """
+    buffer = bytearray()
+    oversized = False
+    
+    for block in blocks:
+        buffer += block
+        start = 0
+        while True:
+            newline = buffer.find(b'\n', start)
+            if newline < 0:
+                break
+            yield None if oversized or newline - start > max_line_bytes else bytes(buffer[start:newline])
+            oversized = False
+            start = newline + 1
+        del buffer[:start]
         
-        # Yield prediction model weights (Random Forest simulation)
-        self.models['yield_rf'] = {
-            'n_estimators': 100,
-            'feature_weights': {
-                'weather_temp': 0.15,
-                'weather_rainfall': 0.25, 
-                'weather_humidity': 0.08,
-                'weather_gdd': 0.20,
-                'soil_ph': 0.10,
-                'soil_om': 0.12,
-                'soil_n': 0.18,
-                'soil_p': 0.08,
-                'satellite_ndvi': 0.30,
-                'satellite_evi': 0.15,
-                'field_area': 0.05,
-                'planting_doy': 0.08
-            },
-            'base_yield': 8.5,
-            'crop_factors': {
-                'corn': 1.0,
-                'soybean': 0.7,
-                'wheat': 0.9,
-                'rice': 1.1
-            }
-        }
+        if len(buffer) > max_line_bytes:
+            oversized = True
+            buffer.clear()
+    
+    if oversized:
+        yield None
+    elif buffer:
+        yield bytes(buffer)
+
+
+def _align(offset: int) -> int:
+    return (offset + _ARRAY_ALIGNMENT - 1) // _ARRAY_ALIGNMENT * _ARRAY_ALIGNMENT
+
+
+def encode_array_container(metadata: Dict[str, str], arrays: Dict[str, np.ndarray],
+                           magic: bytes = MODEL_ARTIFACT_MAGIC) -> bytes:
+    """
+    Pack named NumPy arrays and string metadata into one contiguous buffer
+    
+    Layout: magic, header length, format version, a UTF-8 ``key=value`` header
+    and then every array's raw little-endian bytes aligned to 64 bytes, so the
+    buffer can be memory-mapped and viewed without copying. The header carries
+    a SHA-256 checksum of the array payload.
+    """
+    payload = bytearray()
+    entries = []
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        array = array.astype(array.dtype.newbyteorder('<'), copy=False)
+        if array.dtype.hasobject:
+            raise ValueError(f"Array '{name}' has an object dtype and cannot be stored")
         
-        # Feature scalers (mean and std for normalization)
-        self.feature_scalers = {
-            'weather_temp': {'mean': 20.0, 'std': 8.0},
-            'weather_rainfall': {'mean': 500.0, 'std': 200.0},
-            'weather_humidity': {'mean': 65.0, 'std': 15.0},
-            'weather_gdd': {'mean': 1500.0, 'std': 400.0},
-            'soil_ph': {'mean': 6.8, 'std': 0.8},
-            'soil_om': {'mean': 3.0, 'std': 1.5},
-            'soil_n': {'mean': 30.0, 'std': 15.0},
-            'soil_p': {'mean': 25.0, 'std': 10.0},
-            'satellite_ndvi': {'mean': 0.7, 'std': 0.2},
-            'satellite_evi': {'mean': 0.5, 'std': 0.15},
-            'field_area': {'mean': 100.0, 'std': 50.0},
-            'planting_doy': {'mean': 120.0, 'std': 30.0}
-        }
+        payload.extend(b'\0' * (_align(len(payload)) - len(payload)))
+        shape = ','.join(str(dim) for dim in array.shape)
+        entries.append(f"array.{name}={array.dtype.str};{shape};{len(payload)};{array.nbytes}")
+        payload.extend(array.tobytes())
     
-    def predict_yield(self, features: Dict[str, float], crop_type: str = 'corn') -> Dict[str, Any]:
+    lines = ['format=1', f"checksum=sha256:{hashlib.sha256(payload).hexdigest()}"]
+    for key, value in metadata.items():
+        value = str(value)
+        if '\n' in value or '\n' in key or '=' in key:
+            raise ValueError(f"Invalid metadata entry: {key}")
+        lines.append(f"meta.{key}={value}")
+    lines.extend(entries)
+    
+    header = '\n'.join(lines).encode('utf-8')
+    prefix = _CONTAINER_PREFIX.pack(magic, len(header), 1)
+    padding = _align(len(prefix) + len(header)) - len(prefix) - len(header)
+    return prefix + header + b'\0' * padding + bytes(payload)
+
+
+def decode_array_container(buffer, magic: bytes = MODEL_ARTIFACT_MAGIC,
+                           verify_checksum: bool = True) -> Tuple[Dict[str, str], Dict[str, np.ndarray]]:
+    """
+    Unpack a buffer written by encode_array_container
+    
+    Arrays are returned as read-only views into the buffer (no copy), so a
+    memory-mapped buffer stays shared with every other process mapping it.
+    """
+    view = memoryview(buffer).cast('B')
+    if len(view) < _CONTAINER_PREFIX.size:
+        raise ValueError("Array container is truncated")
+    
+    found_magic, header_length, format_version = _CONTAINER_PREFIX.unpack_from(view, 0)
+    if found_magic != magic:
+        raise ValueError("Array container has an unexpected magic number")
+    if format_version != 1:
+        raise ValueError(f"Unsupported array container format: {format_version}")
+    
+    header_end = _CONTAINER_PREFIX.size + header_length
+    header = bytes(view[_CONTAINER_PREFIX.size:header_end]).decode('utf-8')
+    payload_start = _align(header_end)
+    payload = view[payload_start:]
+    
+    metadata = {}
+    arrays = {}
+    checksum = None
+    for line in header.split('\n'):
+        key, _, value = line.partition('=')
+        if key == 'checksum':
+            checksum = value
+        elif key.startswith('meta.'):
+            metadata[key[5:]] = value
+        elif key.startswith('array.'):
+            try:
+                dtype, shape, offset, nbytes = value.split(';')
+                offset, nbytes = int(offset), int(nbytes)
+                shape = tuple(int(dim) for dim in shape.split(',')) if shape else ()
+                # np.dtype raises TypeError for names it does not know
+                dtype = np.dtype(dtype)
+            except (TypeError, ValueError):
+                raise ValueError(f"Array '{key[6:]}' has a malformed header entry")
+            if dtype.hasobject:
+                raise ValueError(f"Array '{key[6:]}' has an unsupported dtype: {dtype}")
+            if offset < 0 or nbytes < 0 or offset + nbytes > len(payload):
+                raise ValueError(f"Array '{key[6:]}' extends past the end of the container")
+            array = np.frombuffer(payload, dtype=dtype, count=nbytes // dtype.itemsize if dtype.itemsize else 0,
+                                  offset=offset)
+            arrays[key[6:]] = array.reshape(shape)
+    
+    if verify_checksum:
+        if checksum is None or not checksum.startswith('sha256:'):
+            raise ValueError("Array container is missing its checksum")
+        if hashlib.sha256(payload).hexdigest() != checksum[7:]:
+            raise ValueError("Array container checksum mismatch")
+    
+    return metadata, arrays
+
+
+def read_model_artifact(path: str, verify_checksum: bool = True) -> Tuple[Dict[str, str], Dict[str, np.ndarray]]:
+    """Memory-map a model artifact and return its metadata and array views"""
+    buffer = np.memmap(path, dtype=np.uint8, mode='r')
+    return decode_array_container(buffer, MODEL_ARTIFACT_MAGIC, verify_checksum)
+
+
+def write_model_artifact(path: str, metadata: Dict[str, str], arrays: Dict[str, np.ndarray]):
+    """Atomically write a model artifact so concurrent readers never see a partial file"""
+    data = encode_array_container(metadata, arrays, MODEL_ARTIFACT_MAGIC)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class ValidationError(ValueError):
+    """
+    Invalid request input, answered with a 4xx status and no traceback
+    
+    errors holds one {'field', 'message'} dict per problem, plus a 'row' index
+    when the problem is confined to one row of a batch. 400 marks a malformed
+    request (missing or misshapen input), 422 well-formed input with invalid
+    values.
+    """
+    
+    def __init__(self, errors: List[Dict[str, Any]], status: int = 422, message: Optional[str] = None):
+        self.errors = errors
+        self.status = status
+        if message is None:
+            message = '; '.join(f"{error['field']} {error['message']}" for error in errors[:3])
+            if len(errors) > 3:
+                message += f" (and {len(errors) - 3} more)"
+        super().__init__(message)
+    
+    @classmethod
+    def for_field(cls, field: str, message: str, status: int = 400) -> 'ValidationError':
+        """A single request-level problem, reported with message as the error text"""
+        return cls([{'field': field, 'message': message}], status, message)
+
+
+class ModelNotFoundError(ValidationError):
+    """A model version with no compiled artifact, answered with 404"""
+    
+    def __init__(self, model_version: str):
+        self.model_version = model_version
+        message = f"No model artifact for version {model_version}"
+        super().__init__([{'field': 'model_version', 'message': message}], 404, message)
+
+
+class Number:
+    """Schema spec: a finite number in [minimum, maximum], None/NaN allowed only when nullable"""
+    
+    __slots__ = ('minimum', 'maximum', 'required', 'nullable', 'message')
+    
+    def __init__(self, minimum: float = -math.inf, maximum: float = math.inf,
+                 required: bool = False, nullable: bool = False):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.required = required
+        self.nullable = nullable
+        if math.isinf(minimum) and math.isinf(maximum):
+            self.message = 'must be a finite number'
+        elif math.isinf(maximum):
+            self.message = f"must be a number of at least {minimum:g}"
+        else:
+            self.message = f"must be a number between {minimum:g} and {maximum:g}"
+    
+    def check(self, value) -> Optional[str]:
+        # Plain floats and ints take the fast path; bools are ints but not numbers here
+        if type(value) is not float and type(value) is not int:
+            if value is None:
+                return None if self.nullable else self.message
+            if isinstance(value, bool) or not isinstance(value, numbers.Real):
+                return self.message
+        if value != value:
+            return None if self.nullable else self.message
+        if not self.minimum <= value <= self.maximum or math.isinf(value):
+            return self.message
+        return None
+    
+    def out_of_range(self, values: np.ndarray) -> np.ndarray:
+        """Vectorized check of a float array, True where a value fails (NaN passes)"""
+        with np.errstate(invalid='ignore'):
+            return (values < self.minimum) | (values > self.maximum) | np.isinf(values)
+
+
+class Text:
+    """Schema spec: a string, optionally one of a fixed set of choices, None allowed only when nullable"""
+    
+    __slots__ = ('choices', 'required', 'nullable')
+    
+    def __init__(self, choices: Optional[Iterable[str]] = None, required: bool = False, nullable: bool = False):
+        self.choices = frozenset(choices) if choices is not None else None
+        self.required = required
+        self.nullable = nullable
+    
+    def check(self, value) -> Optional[str]:
+        if value is None and self.nullable:
+            return None
+        if not isinstance(value, str):
+            return 'must be a string'
+        if self.choices is not None and value not in self.choices:
+            return f"must be one of {', '.join(sorted(self.choices))}"
+        return None
+
+
+class IsoDate(Text):
+    """Schema spec: a YYYY-MM-DD date, optionally followed by a time"""
+    
+    __slots__ = ()
+    
+    def check(self, value) -> Optional[str]:
+        try:
+            date.fromisoformat(value[:10])
+        except (TypeError, ValueError):
+            return 'must be a YYYY-MM-DD date'
+        return None
+
+
+class Records:
+    """Schema spec: a list of records that each match a Schema"""
+    
+    __slots__ = ('schema', 'required')
+    
+    def __init__(self, schema: 'Schema', required: bool = False):
+        self.schema = schema
+        self.required = required
+    
+    def errors(self, value, field: str) -> List[Dict[str, Any]]:
+        if not isinstance(value, (list, tuple)):
+            return [{'field': field, 'message': 'must be a list'}]
+        errors = []
+        for i, record in enumerate(value):
+            errors.extend(self.schema.errors(record, f"{field}[{i}]."))
+        return errors
+
+
+class Schema:
+    """
+    Precompiled type and range checks for one kind of request record
+    
+    The specs are resolved once at import, so validating a record is a single
+    pass over its keys plus a set difference for required fields. A spec is a
+    Number, Text, Records (a list of records) or another Schema (a nested
+    record). Keys without a spec are checked against extra, or accepted as
+    they are when extra is None. check_matrix applies the same numeric bounds
+    to a whole batch with a few vectorized comparisons.
+    """
+    
+    # Nested records are optional, required inputs are checked by the action
+    required = False
+    
+    def __init__(self, fields: Dict[str, Any], extra=None):
+        self.fields = fields
+        self.extra = extra
+        self.required_fields = frozenset(name for name, spec in fields.items() if spec.required)
+        self._bounds: Dict[Tuple[str, ...], Tuple[np.ndarray, np.ndarray, List[str]]] = {}
+    
+    def errors(self, record, prefix: str = '') -> List[Dict[str, Any]]:
+        """Every problem with one record, field names prefixed with prefix"""
+        if not isinstance(record, dict):
+            return [{'field': prefix.rstrip('.') or 'record', 'message': 'must be an object'}]
+        
+        errors = []
+        fields = self.fields
+        extra = self.extra
+        for name, value in record.items():
+            spec = fields.get(name, extra)
+            if spec is None:
+                continue
+            if type(spec) is Records:
+                errors.extend(spec.errors(value, prefix + name))
+            elif type(spec) is Schema:
+                errors.extend(spec.errors(value, f"{prefix}{name}."))
+            else:
+                message = spec.check(value)
+                if message is not None:
+                    errors.append({'field': prefix + name, 'message': message})
+        
+        if self.required_fields:
+            for name in sorted(self.required_fields.difference(record)):
+                errors.append({'field': prefix + name, 'message': 'is required'})
+        return errors
+    
+    def validate(self, record, field: str = '', status: int = 422):
+        """Raise a ValidationError (422 by default) listing every problem with the record"""
+        errors = self.errors(record, f"{field}." if field else '')
+        if errors:
+            raise ValidationError(errors, status)
+    
+    def check_matrix(self, X: np.ndarray, names: List[str]) -> Dict[int, List[Dict[str, Any]]]:
         """
-        Predict crop yield using Random Forest simulation
+        Range-check the numeric columns of a batch matrix in one vectorized pass
         
         Args:
-            features: Dictionary of feature values
-            crop_type: Type of crop being predicted
+            X: rows x len(names) float matrix, NaN marking missing values
+            names: Field name of each column
             
         Returns:
-            Dictionary containing prediction results
+            Errors keyed by row index, for rows with an out of range or infinite value
         """
-        try:
-            model = self.models['yield_rf']
-            
-            # Normalize features
-            normalized_features = {}
-            for feature, value in features.items():
-                if feature in self.feature_scalers:
-                    scaler = self.feature_scalers[feature]
-                    normalized_features[feature] = (value - scaler['mean']) / scaler['std']
-                else:
-                    normalized_features[feature] = value
-            
-            # Calculate prediction using weighted sum
-            prediction = model['base_yield']
-            total_weight = 0
-            
-            for feature, weight in model['feature_weights'].items():
-                if feature in normalized_features:
-                    prediction += normalized_features[feature] * weight
-                    total_weight += abs(weight)
-            
-            # Apply crop type factor
-            crop_factor = model['crop_factors'].get(crop_type.lower(), 1.0)
-            prediction *= crop_factor
-            
-            # Ensure non-negative prediction
-            prediction = max(0, prediction)
-            
-            # Calculate confidence based on feature completeness
-            feature_completeness = len([f for f in model['feature_weights'].keys() 
-                                      if f in features]) / len(model['feature_weights'])
-            confidence = min(0.95, 0.6 + feature_completeness * 0.35)
-            
-            # Calculate uncertainty bounds
-            uncertainty_factor = 1 - confidence
-            lower_bound = prediction * (1 - uncertainty_factor * 0.2)
-            upper_bound = prediction * (1 + uncertainty_factor * 0.2)
-            
-            # Feature importance for this prediction
-            feature_importance = {}
-            for feature, weight in model['feature_weights'].items():
-                if feature in normalized_features:
-                    contribution = abs(normalized_features[feature] * weight)
-                    feature_importance[feature] = contribution / total_weight if total_weight > 0 else 0
-            
-            return {
-                'predicted_yield': round(prediction, 2),
-                'confidence': round(confidence, 3),
-                'uncertainty': {
-                    'lower_bound': round(lower_bound, 2),
-                    'upper_bound': round(upper_bound, 2),
-                    'std_deviation': round(prediction * uncertainty_factor * 0.1, 2)
-                },
-                'feature_importance': feature_importance,
-                'model_info': {
-                    'model_type': 'random_forest_simulation',
-                    'crop_type': crop_type,
-                    'base_yield': model['base_yield'],
-                    'crop_factor': crop_factor
-                }
-            }
+        key = tuple(names)
+        bounds = self._bounds.get(key)
+        if bounds is None:
+            specs = [self.fields.get(name, self.extra) for name in names]
+            specs = [spec if isinstance(spec, Number) else Number(nullable=True) for spec in specs]
+            bounds = (np.array([spec.minimum for spec in specs]), np.array([spec.maximum for spec in specs]),
+                      [spec.message for spec in specs])
+            self._bounds[key] = bounds
+        
+        minimum, maximum, messages = bounds
+        with np.errstate(invalid='ignore'):
+            bad = (X < minimum) | (X > maximum) | np.isinf(X)
+        return mask_row_errors(bad, names, messages)
+
+
+def mask_row_errors(bad: np.ndarray, fields: List[str], messages: List[str]) -> Dict[int, List[Dict[str, Any]]]:
+    """Errors keyed by row for the True entries of a rows x columns mask"""
+    row_errors: Dict[int, List[Dict[str, Any]]] = {}
+    if bad.any():
+        for row, column in zip(*(index.tolist() for index in np.nonzero(bad))):
+            row_errors.setdefault(row, []).append({'field': fields[column], 'message': messages[column]})
+    return row_errors
+
+
+def coerce_numeric(values, field: str, column_names: Optional[List[str]] = None
+                   ) -> Tuple[np.ndarray, Dict[int, List[Dict[str, Any]]]]:
+    """
+    Convert a batch input to a float64 array, reporting entries that are not numbers
+    
+    Numeric input (including NumPy arrays from columnar requests) converts
+    without a per-element loop. Otherwise None becomes NaN (missing) and any
+    other non-number becomes NaN and is reported against its row.
+    
+    Args:
+        values: 1-D or 2-D array-like, rows along the first axis
+        field: Field name used in errors
+        column_names: Names used in errors for the columns of a 2-D input
+        
+    Returns:
+        The float array and errors keyed by row index
+    """
+    try:
+        array = np.asarray(values)
+        if array.dtype.kind in 'biuf':
+            return array.astype(np.float64, copy=False), {}
+        objects = np.asarray(values, dtype=object)
+    except ValueError:
+        raise ValidationError.for_field(field, f"{field} must be a rectangular array of numbers")
+    
+    flat = objects.reshape(-1)
+    columns = int(np.prod(objects.shape[1:])) if objects.ndim > 1 else 1
+    result = np.empty(flat.shape[0], dtype=np.float64)
+    row_errors: Dict[int, List[Dict[str, Any]]] = {}
+    for i, value in enumerate(flat.tolist()):
+        if value is None:
+            result[i] = np.nan
+        elif (type(value) is float or type(value) is int
+              or (isinstance(value, numbers.Real) and not isinstance(value, bool))):
+            result[i] = value
+        else:
+            result[i] = np.nan
+            name = column_names[i % columns] if column_names is not None and len(column_names) == columns else field
+            row_errors.setdefault(i // columns, []).append({'field': name, 'message': 'must be a number'})
+    return result.reshape(objects.shape), row_errors
+
+
+def merge_row_errors(*parts: Dict[int, List[Dict[str, Any]]]) -> Dict[int, List[Dict[str, Any]]]:
+    """Combine errors keyed by row from several checks"""
+    merged: Dict[int, List[Dict[str, Any]]] = {}
+    for part in parts:
+        for row, errors in part.items():
+            merged.setdefault(row, []).extend(errors)
+    return merged
+
+
+def rejected_entry(errors: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """The per-row result standing in for a batch row that failed validation"""
+    return {
+        'success': False,
+        'status': 422,
+        'error': str(ValidationError(errors)),
+        'errors': errors
+    }
+
+
+def row_error_list(row_errors: Dict[int, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Flatten errors keyed by row into a list of {'row', 'field', 'message'} in row order"""
+    return [dict(error, row=row) for row in sorted(row_errors) for error in row_errors[row]]
+
+
+def batch_feature_columns(features):
+    """
+    Check the shape of batch yield features before any value is coerced
+    
+    Args:
+        features: A mapping of feature name -> list of values, a list of
+            per-field feature mappings (as predict_yield takes), or a list of
+            rows described by feature_names
             
-        except Exception as e:
-            raise Exception(f"Yield prediction failed: {str(e)}")
+    Returns:
+        The features, with a list of mappings turned into columns
+        
+    Raises:
+        ValidationError: 400 for any other shape
+    """
+    if isinstance(features, dict):
+        for name, column in features.items():
+            # Columnar requests carry NumPy arrays; checked by ndim so lists never import NumPy
+            if not isinstance(column, (list, tuple)) and getattr(column, 'ndim', None) != 1:
+                raise ValidationError.for_field(f"features.{name}", f"features.{name} must be a list of values")
+        return features
+    if not isinstance(features, (list, tuple)):
+        raise ValidationError.for_field('features', "features must be an object of columns or a list of rows")
     
-    def analyze_stress_patterns(self, satellite_data: List[Dict]) -> Dict[str, Any]:
+    mappings = [isinstance(row, dict) for row in features]
+    if not any(mappings):
+        return features
+    if not all(mappings):
+        raise ValidationError.for_field('features', "features rows must all be objects or all be lists")
+    names = list(dict.fromkeys(name for row in features for name in row))
+    return {name: [row.get(name) for row in features] for name in names}
+
+
+# Physically plausible ranges for the yield model inputs. Unknown features
+# (e.g. of a scikit-learn artifact) only have to be finite numbers. None and
+# NaN mark a missing feature.
+YIELD_FEATURE_SCHEMA = Schema({
+    'weather_temp': Number(-60, 60, nullable=True),
+    'weather_rainfall': Number(0, 20000, nullable=True),
+    'weather_humidity': Number(0, 100, nullable=True),
+    'weather_gdd': Number(0, 10000, nullable=True),
+    'soil_ph': Number(0, 14, nullable=True),
+    'soil_om': Number(0, 100, nullable=True),
+    'soil_n': Number(0, 10000, nullable=True),
+    'soil_p': Number(0, 10000, nullable=True),
+    'satellite_ndvi': Number(-1, 1, nullable=True),
+    'satellite_evi': Number(-1, 1, nullable=True),
+    'field_area': Number(0, 1000000, nullable=True),
+    'planting_doy': Number(1, 366, nullable=True)
+}, extra=Number(nullable=True))
+
+# One satellite observation for stress analysis; the date is only a label
+SATELLITE_OBSERVATION_SCHEMA = Schema({
+    'ndvi': Number(-1, 1, nullable=True),
+    'evi': Number(-1, 1, nullable=True)
+})
+
+WEATHER_DAY_SCHEMA = Schema({
+    'temperature': Number(-60, 60),
+    'humidity': Number(0, 100),
+    'precipitation': Number(0, 2000)
+})
+
+FIELD_DATA_SCHEMA = Schema({
+    'soil_moisture': Number(0, 1),
+    'field_capacity': Number(0, 1),
+    'wilting_point': Number(0, 1),
+    'area': Number(0, 1000000),
+    'crop_stage': Text(),
+    'crop_type': Text(),
+    'weather_forecast': Records(WEATHER_DAY_SCHEMA)
+})
+
+# Request level schemas of the single-record actions
+YIELD_REQUEST_SCHEMA = Schema({
+    'features': YIELD_FEATURE_SCHEMA,
+    'crop_type': Text()
+})
+
+STRESS_REQUEST_SCHEMA = Schema({
+    'satellite_data': Records(SATELLITE_OBSERVATION_SCHEMA)
+})
+
+# A StressState.to_dict round-tripped by the client
+STRESS_STATE_SCHEMA = Schema({
+    'count': Number(0, math.inf),
+    'mean': Number(-1, 1),
+    'm2': Number(0, math.inf),
+    'sum_xy': Number(),
+    'min': Number(-1, 1, nullable=True),
+    'max': Number(-1, 1, nullable=True),
+    'first_date': Text(nullable=True),
+    'last_date': Text(nullable=True)
+})
+
+IRRIGATION_REQUEST_SCHEMA = Schema({
+    'field_data': FIELD_DATA_SCHEMA
+})
+
+SCHEDULE_REQUEST_SCHEMA = Schema({
+    'fields': Records(FIELD_DATA_SCHEMA),
+    'weather_forecast': Records(WEATHER_DAY_SCHEMA),
+    'pump_capacity': Number(0, math.inf, nullable=True)
+})
+
+# Feature store observations, where a missing value is simply not stored
+STORED_WEATHER_SCHEMA = Schema({
+    'date': IsoDate(required=True),
+    'temperature': Number(-60, 60, nullable=True),
+    'temp_min': Number(-60, 60, nullable=True),
+    'temp_max': Number(-60, 60, nullable=True),
+    'humidity': Number(0, 100, nullable=True),
+    'precipitation': Number(0, 2000, nullable=True)
+})
+
+STORED_SATELLITE_SCHEMA = Schema({
+    'date': IsoDate(required=True),
+    'ndvi': Number(-1, 1, nullable=True),
+    'evi': Number(-1, 1, nullable=True)
+})
+
+
+class YieldModel:
+    """
+    Shared behaviour of the array-backed yield models
+    
+    Subclasses set ARTIFACT_TYPE, implement score() and build themselves from
+    artifact arrays in _from_arrays(); artifacts are dispatched on their
+    artifact_type so MLInference can load any of them from one path.
+    """
+    
+    ARTIFACT_TYPE = ''
+    
+    @classmethod
+    def from_artifact(cls, path: str, verify_checksum: bool = True) -> 'YieldModel':
         """
-        Analyze crop stress patterns from satellite time series data
+        Load a compiled model artifact through memory-mapped arrays
         
         Args:
-            satellite_data: List of satellite observations with NDVI, date, etc.
+            path: Artifact file written by to_artifact
+            verify_checksum: Validate the payload checksum before use
             
         Returns:
-            Dictionary containing stress analysis results
-        """
-        try:
-            if not satellite_data:
-                raise ValueError("No satellite data provided")
-            
-            # Extract NDVI values and dates
-            ndvi_values = []
-            dates = []
-            
-            for obs in satellite_data:
-                if 'ndvi' in obs and 'date' in obs:
-                    ndvi_values.append(obs['ndvi'])
-                    dates.append(obs['date'])
-            
-            if len(ndvi_values) < 3:
-                raise ValueError("At least 3 observations required for stress analysis")
-            
-            ndvi_array = np.array(ndvi_values)
-            
-            # Calculate stress indicators
-            mean_ndvi = np.mean(ndvi_array)
-            std_ndvi = np.std(ndvi_array)
-            min_ndvi = np.min(ndvi_array)
-            max_ndvi = np.max(ndvi_array)
-            
-            # Trend analysis (simple linear regression)
-            x = np.arange(len(ndvi_array))
-            slope = np.polyfit(x, ndvi_array, 1)[0]
-            
-            # Stress level classification
-            if mean_ndvi > 0.7:
-                stress_level = 'low'
-            elif mean_ndvi > 0.5:
-                stress_level = 'moderate'
-            elif mean_ndvi > 0.3:
-                stress_level = 'high'
-            else:
-                stress_level = 'severe'
-            
-            # Anomaly detection (values beyond 2 standard deviations)
-            anomalies = []
-            threshold = 2 * std_ndvi
-            for i, (value, date) in enumerate(zip(ndvi_values, dates)):
-                if abs(value - mean_ndvi) > threshold:
-                    anomalies.append({
-                        'date': date,
-                        'ndvi': value,
-                        'deviation': abs(value - mean_ndvi),
-                        'type': 'low' if value < mean_ndvi else 'high'
-                    })
-            
-            # Trend classification
-            if slope > 0.01:
-                trend = 'improving'
-            elif slope < -0.01:
-                trend = 'declining'
-            else:
-                trend = 'stable'
-            
-            # Variability analysis
-            coefficient_of_variation = std_ndvi / mean_ndvi if mean_ndvi > 0 else 0
-            
-            return {
-                'stress_level': stress_level,
-                'confidence': min(0.95, 0.7 + (1 - coefficient_of_variation) * 0.25),
-                'statistics': {
-                    'mean_ndvi': round(mean_ndvi, 3),
-                    'std_ndvi': round(std_ndvi, 3),
-                    'min_ndvi': round(min_ndvi, 3),
-                    'max_ndvi': round(max_ndvi, 3),
-                    'coefficient_of_variation': round(coefficient_of_variation, 3)
-                },
-                'trend': {
-                    'direction': trend,
-                    'slope': round(slope, 4),
-                    'significance': 'high' if abs(slope) > 0.02 else 'moderate' if abs(slope) > 0.005 else 'low'
-                },
-                'anomalies': anomalies,
-                'recommendations': self._generate_stress_recommendations(stress_level, trend, anomalies),
-                'analysis_info': {
-                    'observations': len(ndvi_values),
-                    'date_range': f"{dates[0]} to {dates[-1]}",
-                    'method': 'statistical_analysis'
-                }
-            }
-            
-        except Exception as e:
-            raise Exception(f"Stress pattern analysis failed: {str(e)}")
-    
-    def optimize_irrigation(self, field_data: Dict[str, Any]) -> Dict[str, Any]:
+            Yield model whose parameter arrays are views of the mapped file
         """
-        Optimize irrigation scheduling based on field conditions
+        metadata, arrays = read_model_artifact(path, verify_checksum)
         
-        Args:
-            field_data: Dictionary containing field conditions and constraints
+        model_class = {model.ARTIFACT_TYPE: model for model in (CompiledYieldModel, TreeEnsembleYieldModel)
+                       }.get(metadata.get('artifact_type'))
+        if model_class is None or not issubclass(model_class, cls):
+            raise ValueError(f"Not a yield model artifact: {path}")
+        return model_class._from_arrays(metadata, arrays)
+    
+    @staticmethod
+    def _check_arrays(arrays: Dict[str, np.ndarray], required: Dict[str, str]):
+        for name, kind in required.items():
+            if name not in arrays:
+                raise ValueError(f"Model artifact is missing array '{name}'")
+            if arrays[name].dtype.kind != kind or arrays[name].ndim != 1:
+                raise ValueError(f"Model artifact array '{name}' has an invalid type or shape")
+    
+    def score(self, X: np.ndarray, crop_types) -> Dict[str, np.ndarray]:
+        raise NotImplementedError
+    
+    def crop_factor_array(self, crop_types) -> np.ndarray:
+        """Map crop type names to crop factors, unknown crops default to 1.0"""
+        if isinstance(crop_types, str):
+            crop_types = [crop_types]
+        
+        lookup = dict(zip(self.crop_names, self.crop_factors.tolist()))
+        unique, inverse = np.unique(np.asarray(crop_types, dtype=str), return_inverse=True)
+        factors = np.array([lookup.get(crop.lower(), 1.0) for crop in unique], dtype=np.float64)
+        return factors[inverse.reshape(-1)]
+    
+    def features_to_matrix(self, features, feature_names: Optional[List[str]] = None,
+                           n_rows: Optional[int] = None) -> np.ndarray:
+        """
+        Build an (n_rows, n_model_features) matrix in model feature order
+        
+        Args:
+            features: Either a dict of feature name -> column of values, or a
+                2-D array-like whose columns are described by feature_names
+            feature_names: Column names when features is a 2-D array-like
+            n_rows: Row count to use when no column is usable to infer it
             
         Returns:
-            Dictionary containing irrigation optimization results
+            Float matrix with NaN marking missing values
         """
-        try:
-            # Extract field parameters
-            soil_moisture = field_data.get('soil_moisture', 0.3)
-            crop_stage = field_data.get('crop_stage', 'vegetative')
-            weather_forecast = field_data.get('weather_forecast', [])
-            field_capacity = field_data.get('field_capacity', 0.4)
-            wilting_point = field_data.get('wilting_point', 0.15)
+        if isinstance(features, dict):
+            columns = {name: np.asarray(values, dtype=np.float64).reshape(-1)
+                       for name, values in features.items() if name in self.feature_index}
+        else:
+            matrix = np.asarray(features, dtype=np.float64)
+            if matrix.ndim != 2:
+                raise ValidationError.for_field('features', "Feature matrix must be two dimensional")
+            if feature_names is None or len(feature_names) != matrix.shape[1]:
+                raise ValidationError.for_field('feature_names',
+                                                "feature_names must describe every feature matrix column")
+            columns = {name: matrix[:, i] for i, name in enumerate(feature_names)}
+        
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) > 1:
+            raise ValidationError.for_field('features', "All feature columns must have the same length")
+        if lengths:
+            n_rows = lengths.pop()
+        elif n_rows is None:
+            n_rows = 0
+        
+        X = np.full((n_rows, len(self.feature_names)), np.nan)
+        for name, column in columns.items():
+            if name in self.feature_index:
+                X[:, self.feature_index[name]] = column
+        return X
+
+
+class CompiledYieldModel(YieldModel):
+    """
+    Array-backed form of the linear yield model used by the vectorized scoring paths
+    """
+    
+    ARTIFACT_TYPE = 'yield_linear'
+    
+    def __init__(self, feature_names: List[str], means, stds, weights,
+                 base_yield: float, crop_names: List[str], crop_factors,
+                 metadata: Optional[Dict[str, str]] = None):
+        self.metadata = dict(metadata or {})
+        self.model_type = self.metadata.get('model_type', 'random_forest_simulation')
+        self.feature_names = tuple(feature_names)
+        self.feature_index = {name: i for i, name in enumerate(self.feature_names)}
+        self.means = np.asarray(means, dtype=np.float64)
+        self.stds = np.asarray(stds, dtype=np.float64)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.abs_weights = np.abs(self.weights)
+        self.base_yield = float(base_yield)
+        self.crop_names = tuple(crop_names)
+        self.crop_factors = np.asarray(crop_factors, dtype=np.float64)
+    
+    @classmethod
+    def from_dicts(cls, model: Dict[str, Any], feature_scalers: Dict[str, Dict[str, float]]) -> 'CompiledYieldModel':
+        """Compile the dict based model definition into contiguous arrays"""
+        feature_names = list(model['feature_weights'].keys())
+        
+        # Features without a scaler are scored on their raw value, as in predict_yield
+        means = [feature_scalers.get(f, {}).get('mean', 0.0) for f in feature_names]
+        stds = [feature_scalers.get(f, {}).get('std', 1.0) for f in feature_names]
+        weights = [model['feature_weights'][f] for f in feature_names]
+        
+        return cls(
+            feature_names, means, stds, weights,
+            model['base_yield'],
+            list(model['crop_factors'].keys()),
+            list(model['crop_factors'].values()),
+            {'model_type': 'random_forest_simulation', 'n_estimators': str(model.get('n_estimators', 0))}
+        )
+    
+    @classmethod
+    def _from_arrays(cls, metadata: Dict[str, str], arrays: Dict[str, np.ndarray]) -> 'CompiledYieldModel':
+        cls._check_arrays(arrays, {
+            'feature_names': 'U', 'means': 'f', 'stds': 'f', 'weights': 'f',
+            'crop_names': 'U', 'crop_factors': 'f'
+        })
+        
+        n_features = len(arrays['feature_names'])
+        for name in ('means', 'stds', 'weights'):
+            if len(arrays[name]) != n_features:
+                raise ValueError(f"Model artifact array '{name}' does not match the feature count")
+        if len(arrays['crop_factors']) != len(arrays['crop_names']):
+            raise ValueError("Model artifact crop factors do not match the crop names")
+        if not np.all(np.isfinite(arrays['stds'])) or np.any(arrays['stds'] <= 0):
+            raise ValueError("Model artifact scaler std values must be positive")
+        if 'base_yield' not in metadata:
+            raise ValueError("Model artifact is missing base_yield")
+        
+        return cls(
+            arrays['feature_names'].tolist(), arrays['means'], arrays['stds'], arrays['weights'],
+            float(metadata['base_yield']), arrays['crop_names'].tolist(), arrays['crop_factors'],
+            metadata
+        )
+    
+    def to_artifact(self, path: str, model_version: str):
+        """Write this model as a compiled, memory-mappable artifact"""
+        metadata = dict(self.metadata)
+        metadata.update({
+            'artifact_type': self.ARTIFACT_TYPE,
+            'model_type': self.model_type,
+            'model_version': model_version,
+            'base_yield': repr(self.base_yield),
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime())
+        })
+        
+        write_model_artifact(path, metadata, {
+            'feature_names': np.array(self.feature_names, dtype=str),
+            'means': self.means,
+            'stds': self.stds,
+            'weights': self.weights,
+            'crop_names': np.array(self.crop_names, dtype=str),
+            'crop_factors': self.crop_factors
+        })
+    
+    def score(self, X: np.ndarray, crop_types) -> Dict[str, np.ndarray]:
+        """Score a feature matrix in model order, NaN entries are treated as missing"""
+        present = ~np.isnan(X)
+        
+        normalized = (X - self.means) / self.stds
+        contributions = np.where(present, normalized * self.weights, 0.0)
+        abs_weights = np.where(present, self.abs_weights, 0.0)
+        
+        # Accumulate column by column in model feature order so the floating point
+        # result is identical to the original per-feature sum in predict_yield
+        prediction = np.full(X.shape[0], self.base_yield)
+        total_weight = np.zeros(X.shape[0])
+        for j in range(X.shape[1]):
+            prediction += contributions[:, j]
+            total_weight += abs_weights[:, j]
+        
+        crop_factor = self.crop_factor_array(crop_types)
+        prediction = np.maximum(prediction * crop_factor, 0)
+        
+        feature_completeness = present.sum(axis=1) / X.shape[1]
+        confidence = np.minimum(0.95, 0.6 + feature_completeness * 0.35)
+        
+        uncertainty_factor = 1 - confidence
+        
+        safe_total = np.where(total_weight > 0, total_weight, 1.0)
+        importance = np.where(total_weight[:, None] > 0, np.abs(contributions) / safe_total[:, None], 0.0)
+        
+        return {
+            'predicted_yield': prediction,
+            'confidence': confidence,
+            'lower_bound': prediction * (1 - uncertainty_factor * 0.2),
+            'upper_bound': prediction * (1 + uncertainty_factor * 0.2),
+            'std_deviation': prediction * uncertainty_factor * 0.1,
+            'crop_factor': crop_factor,
+            'feature_importance': importance,
+            'present': present
+        }
+
+
+class TreeEnsembleYieldModel(YieldModel):
+    """
+    Trained tree ensemble (random forest) yield model over flattened node arrays
+    
+    Every tree's nodes are stored back to back in contiguous arrays: split
+    feature, threshold, left/right child (global node indices, leaves point to
+    themselves) and leaf value. A batch is traversed for all trees at once, one
+    tree level per step, so scoring is max_depth array operations per block of
+    rows. The prediction is the mean of the per-tree predictions and the
+    uncertainty comes from their spread.
+    """
+    
+    ARTIFACT_TYPE = 'yield_tree_ensemble'
+    
+    # Per-tree prediction quantiles reported as the prediction interval
+    INTERVAL_QUANTILES = (0.05, 0.95)
+    
+    # Rows traversed together, bounding the rows x trees working arrays
+    SCORE_BLOCK_ROWS = 4096
+    
+    NODE_ARRAYS = ('node_feature', 'node_threshold', 'node_left', 'node_right', 'node_value')
+    
+    def __init__(self, feature_names: List[str], impute_values, feature_importances,
+                 node_feature, node_threshold, node_left, node_right, node_value, tree_roots,
+                 max_depth: int, base_yield: float, crop_names: List[str], crop_factors,
+                 metadata: Optional[Dict[str, str]] = None):
+        self.metadata = dict(metadata or {})
+        self.model_type = self.metadata.get('model_type', 'random_forest')
+        self.feature_names = tuple(feature_names)
+        self.feature_index = {name: i for i, name in enumerate(self.feature_names)}
+        self.impute_values = np.asarray(impute_values, dtype=np.float64)
+        self.feature_importances = np.asarray(feature_importances, dtype=np.float64)
+        self.node_feature = np.asarray(node_feature, dtype=np.int32)
+        self.node_threshold = np.asarray(node_threshold, dtype=np.float64)
+        self.node_left = np.asarray(node_left, dtype=np.int32)
+        self.node_right = np.asarray(node_right, dtype=np.int32)
+        self.node_value = np.asarray(node_value, dtype=np.float64)
+        self.tree_roots = np.asarray(tree_roots, dtype=np.int32)
+        self.max_depth = int(max_depth)
+        self.base_yield = float(base_yield)
+        self.crop_names = tuple(crop_names)
+        self.crop_factors = np.asarray(crop_factors, dtype=np.float64)
+        
+        # Leaves test feature 0 and land on themselves whichever way they go. The
+        # children are interleaved so one gather at 2 * node + went_right steps down
+        self._split_feature = np.maximum(self.node_feature, 0).astype(np.intp)
+        self._children = np.column_stack([self.node_left, self.node_right]).astype(np.intp).ravel()
+    
+    @property
+    def n_trees(self) -> int:
+        return len(self.tree_roots)
+    
+    @classmethod
+    def from_sklearn(cls, estimator, feature_names: Optional[List[str]] = None,
+                     impute_values: Optional[Dict[str, float]] = None,
+                     crop_factors: Optional[Dict[str, float]] = None) -> 'TreeEnsembleYieldModel':
+        """
+        Flatten a fitted scikit-learn forest regressor
+        
+        Args:
+            estimator: Fitted RandomForestRegressor or ExtraTreesRegressor with
+                a single output
+            feature_names: Training column order, defaults to the estimator's
+                feature_names_in_
+            impute_values: Value used for a missing feature, 0.0 when not given
+            crop_factors: Crop type multipliers applied after the forest
             
-            # Calculate available water
-            available_water = max(0, soil_moisture - wilting_point)
-            max_available = field_capacity - wilting_point
-            water_stress_level = available_water / max_available if max_available > 0 else 0
+        Returns:
+            TreeEnsembleYieldModel that predicts what the estimator predicts
+        """
+        trees = getattr(estimator, 'estimators_', None)
+        if not isinstance(trees, list) or not trees or not all(hasattr(tree, 'tree_') for tree in trees):
+            raise ValueError("Expected a fitted forest regressor with a list of decision trees")
+        
+        if feature_names is None:
+            if not hasattr(estimator, 'feature_names_in_'):
+                raise ValueError("feature_names are required when the estimator was fitted without them")
+            feature_names = list(estimator.feature_names_in_)
+        if len(feature_names) != estimator.n_features_in_:
+            raise ValueError("feature_names must have one entry per estimator feature")
+        
+        node_feature, node_threshold, node_left, node_right, node_value = [], [], [], [], []
+        roots = []
+        offset = 0
+        for tree in trees:
+            t = tree.tree_
+            if t.value.shape[1] != 1:
+                raise ValueError("Only single-output forests are supported")
             
-            # Crop water requirements by stage
-            water_requirements = {
-                'germination': 0.3,
-                'emergence': 0.4,
-                'vegetative': 0.6,
-                'flowering': 0.8,
-                'fruiting': 0.7,
-                'maturity': 0.4
-            }
+            node_ids = np.arange(t.node_count, dtype=np.int64)
+            leaf = t.children_left < 0
+            roots.append(offset)
+            node_feature.append(np.where(leaf, -1, t.feature))
+            node_threshold.append(np.where(leaf, 0.0, t.threshold))
+            node_left.append(np.where(leaf, node_ids, t.children_left) + offset)
+            node_right.append(np.where(leaf, node_ids, t.children_right) + offset)
+            node_value.append(t.value[:, 0, 0])
+            offset += t.node_count
+        
+        impute_values = impute_values or {}
+        crop_factors = crop_factors or {}
+        root_values = np.array([values[0] for values in node_value])
+        
+        return cls(
+            feature_names,
+            [impute_values.get(name, 0.0) for name in feature_names],
+            estimator.feature_importances_,
+            np.concatenate(node_feature), np.concatenate(node_threshold),
+            np.concatenate(node_left), np.concatenate(node_right), np.concatenate(node_value),
+            roots, max(tree.tree_.max_depth for tree in trees),
+            float(root_values.mean()),
+            list(crop_factors.keys()), list(crop_factors.values()),
+            {'model_type': 'random_forest', 'n_estimators': str(len(trees)),
+             'source': type(estimator).__name__}
+        )
+    
+    @classmethod
+    def _from_arrays(cls, metadata: Dict[str, str], arrays: Dict[str, np.ndarray]) -> 'TreeEnsembleYieldModel':
+        cls._check_arrays(arrays, {
+            'feature_names': 'U', 'impute_values': 'f', 'feature_importances': 'f',
+            'node_feature': 'i', 'node_threshold': 'f', 'node_left': 'i', 'node_right': 'i',
+            'node_value': 'f', 'tree_roots': 'i', 'crop_names': 'U', 'crop_factors': 'f'
+        })
+        
+        n_features = len(arrays['feature_names'])
+        for name in ('impute_values', 'feature_importances'):
+            if len(arrays[name]) != n_features:
+                raise ValueError(f"Model artifact array '{name}' does not match the feature count")
+        
+        n_nodes = len(arrays['node_feature'])
+        for name in cls.NODE_ARRAYS:
+            if len(arrays[name]) != n_nodes:
+                raise ValueError(f"Model artifact array '{name}' does not match the node count")
+        for name in ('node_left', 'node_right', 'tree_roots'):
+            if len(arrays[name]) and (arrays[name].min() < 0 or arrays[name].max() >= n_nodes):
+                raise ValueError(f"Model artifact array '{name}' points outside the node arrays")
+        if n_nodes and (arrays['node_feature'].min() < -1 or arrays['node_feature'].max() >= n_features):
+            raise ValueError("Model artifact splits on an unknown feature")
+        if len(arrays['tree_roots']) == 0:
+            raise ValueError("Model artifact holds no trees")
+        if len(arrays['crop_factors']) != len(arrays['crop_names']):
+            raise ValueError("Model artifact crop factors do not match the crop names")
+        for name in ('base_yield', 'max_depth'):
+            if name not in metadata:
+                raise ValueError(f"Model artifact is missing {name}")
+        
+        return cls(
+            arrays['feature_names'].tolist(), arrays['impute_values'], arrays['feature_importances'],
+            arrays['node_feature'], arrays['node_threshold'], arrays['node_left'], arrays['node_right'],
+            arrays['node_value'], arrays['tree_roots'], int(metadata['max_depth']),
+            float(metadata['base_yield']), arrays['crop_names'].tolist(), arrays['crop_factors'],
+            metadata
+        )
+    
+    def to_artifact(self, path: str, model_version: str):
+        """Write this model as a compiled, memory-mappable artifact"""
+        metadata = dict(self.metadata)
+        metadata.update({
+            'artifact_type': self.ARTIFACT_TYPE,
+            'model_type': self.model_type,
+            'model_version': model_version,
+            'base_yield': repr(self.base_yield),
+            'max_depth': str(self.max_depth),
+            'n_estimators': str(self.n_trees),
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime())
+        })
+        
+        write_model_artifact(path, metadata, {
+            'feature_names': np.array(self.feature_names, dtype=str),
+            'impute_values': self.impute_values,
+            'feature_importances': self.feature_importances,
+            'node_feature': self.node_feature,
+            'node_threshold': self.node_threshold,
+            'node_left': self.node_left,
+            'node_right': self.node_right,
+            'node_value': self.node_value,
+            'tree_roots': self.tree_roots,
+            'crop_names': np.array(self.crop_names, dtype=str),
+            'crop_factors': self.crop_factors
+        })
+    
+    def tree_predictions(self, X: np.ndarray) -> np.ndarray:
+        """
+        Leaf value of every tree for every row
+        
+        Missing (NaN) features take their impute value. Inputs are rounded to
+        float32 before the threshold tests, as scikit-learn does, so leaves
+        match the trained estimator exactly.
+        
+        Returns:
+            rows x trees matrix of per-tree predictions
+        """
+        X = np.where(np.isnan(X), self.impute_values, X).astype(np.float32).astype(np.float64)
+        n_rows = X.shape[0]
+        predictions = np.empty((n_rows, self.n_trees))
+        
+        for start in range(0, n_rows, self.SCORE_BLOCK_ROWS):
+            block = X[start:start + self.SCORE_BLOCK_ROWS]
+            values = block.ravel()
+            row_offsets = (np.arange(block.shape[0], dtype=np.intp) * X.shape[1])[:, None]
+            nodes = np.broadcast_to(self.tree_roots.astype(np.intp), (block.shape[0], self.n_trees))
             
-            base_requirement = water_requirements.get(crop_stage, 0.6)
+            # One tree level per step, for every row and tree at once
+            for _ in range(self.max_depth):
+                split_values = np.take(values, row_offsets + np.take(self._split_feature, nodes))
+                went_right = split_values > np.take(self.node_threshold, nodes)
+                nodes = np.take(self._children, nodes * 2 + went_right)
             
-            # Weather-based adjustments
-            expected_rainfall = 0
-            avg_temp = 25
-            avg_humidity = 60
+            predictions[start:start + block.shape[0]] = np.take(self.node_value, nodes)
+        
+        return predictions
+    
+    def score(self, X: np.ndarray, crop_types) -> Dict[str, np.ndarray]:
+        """Score a feature matrix in model order, NaN entries are treated as missing"""
+        present = ~np.isnan(X)
+        per_tree = self.tree_predictions(X)
+        
+        # Sum tree by tree in estimator order, then divide, as the forest's predict does
+        total = np.zeros(X.shape[0])
+        for t in range(self.n_trees):
+            total += per_tree[:, t]
+        
+        crop_factor = self.crop_factor_array(crop_types)
+        prediction = np.maximum(total / self.n_trees * crop_factor, 0)
+        per_tree *= crop_factor[:, None]
+        lower, upper = np.quantile(per_tree, self.INTERVAL_QUANTILES, axis=1)
+        
+        feature_completeness = present.sum(axis=1) / X.shape[1]
+        confidence = np.minimum(0.95, 0.6 + feature_completeness * 0.35)
+        
+        # The forest's impurity importances, renormalized over the features supplied
+        importance = np.where(present, self.feature_importances, 0.0)
+        importance_total = importance.sum(axis=1, keepdims=True)
+        importance = np.divide(importance, importance_total, out=np.zeros_like(importance),
+                               where=importance_total > 0)
+        
+        return {
+            'predicted_yield': prediction,
+            'confidence': confidence,
+            'lower_bound': np.maximum(lower, 0),
+            'upper_bound': np.maximum(upper, 0),
+            'std_deviation': per_tree.std(axis=1),
+            'crop_factor': crop_factor,
+            'feature_importance': importance,
+            'present': present
+        }
+
+
+class StressState:
+    """
+    Running NDVI sufficient statistics for one field
+    
+    Holds the observation count, Welford mean and sum of squared deviations,
+    the index-weighted sum used for the least-squares slope, min/max and the
+    observed date range. Each new observation updates it in O(1), so a new
+    satellite pass never requires rescanning the season.
+    """
+    
+    __slots__ = ('count', 'mean', 'm2', 'sum_xy', 'min', 'max', 'first_date', 'last_date')
+    
+    _PACKED = struct.Struct('<Qddddd')
+    
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0, sum_xy: float = 0.0,
+                 min: float = float('inf'), max: float = float('-inf'),
+                 first_date: Optional[str] = None, last_date: Optional[str] = None):
+        self.count = int(count)
+        self.mean = float(mean)
+        self.m2 = float(m2)
+        self.sum_xy = float(sum_xy)
+        self.min = float(min)
+        self.max = float(max)
+        self.first_date = first_date
+        self.last_date = last_date
+    
+    def add(self, ndvi: float, date: Optional[str] = None):
+        """Fold one observation into the running statistics"""
+        ndvi = float(ndvi)
+        x = self.count
+        
+        self.count += 1
+        delta = ndvi - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (ndvi - self.mean)
+        self.sum_xy += x * ndvi
+        self.min = min(self.min, ndvi)
+        self.max = max(self.max, ndvi)
+        
+        if self.first_date is None:
+            self.first_date = date
+        self.last_date = date
+    
+    @property
+    def std(self) -> float:
+        return (self.m2 / self.count) ** 0.5 if self.count else 0.0
+    
+    @property
+    def slope(self) -> float:
+        """Least-squares slope over observation index, as np.polyfit(arange(n), y, 1)"""
+        n = self.count
+        if n < 2:
+            return 0.0
+        sum_x = n * (n - 1) / 2
+        sxx = (n - 1) * n * (2 * n - 1) / 6 - sum_x * sum_x / n
+        return (self.sum_xy - sum_x * self.mean) / sxx
+    
+    def is_anomaly(self, ndvi: float) -> bool:
+        """Whether a value lies beyond 2 standard deviations of the running mean"""
+        return abs(float(ndvi) - self.mean) > 2 * self.std
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'm2': self.m2,
+            'sum_xy': self.sum_xy,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+            'first_date': self.first_date,
+            'last_date': self.last_date
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> 'StressState':
+        if not data:
+            return cls()
+        
+        state = cls(
+            data.get('count', 0), data.get('mean', 0.0), data.get('m2', 0.0), data.get('sum_xy', 0.0),
+            first_date=data.get('first_date'), last_date=data.get('last_date')
+        )
+        if data.get('min') is not None:
+            state.min = float(data['min'])
+        if data.get('max') is not None:
+            state.max = float(data['max'])
+        if state.count < 0 or state.m2 < 0:
+            raise ValueError("Invalid stress state")
+        return state
+    
+    def to_bytes(self) -> bytes:
+        """Compact binary form for storage alongside each field"""
+        dates = '\n'.join([self.first_date or '', self.last_date or '']).encode('utf-8')
+        return self._PACKED.pack(self.count, self.mean, self.m2, self.sum_xy, self.min, self.max) + dates
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'StressState':
+        count, mean, m2, sum_xy, min_ndvi, max_ndvi = cls._PACKED.unpack_from(data, 0)
+        first_date, _, last_date = data[cls._PACKED.size:].decode('utf-8').partition('\n')
+        return cls(count, mean, m2, sum_xy, min_ndvi, max_ndvi, first_date or None, last_date or None)
+
+
+class MLInference:
+    """
+    Machine Learning inference handler for agricultural predictions
+    """
+    
+    STRESS_LEVELS = ('low', 'moderate', 'high', 'severe')
+    TREND_DIRECTIONS = ('improving', 'declining', 'stable')
+    TREND_SIGNIFICANCE = ('high', 'moderate', 'low')
+    
+    # Crop water requirements by stage
+    WATER_REQUIREMENTS = {
+        'germination': 0.3,
+        'emergence': 0.4,
+        'vegetative': 0.6,
+        'flowering': 0.8,
+        'fruiting': 0.7,
+        'maturity': 0.4
+    }
+    
+    # Soil water balance parameters for season scheduling. Volumetric moisture is
+    # converted to mm over a 1 m root zone, as in optimize_irrigation
+    ROOT_ZONE_DEPTH_MM = 1000.0
+    REFERENCE_ET_MM = 5.0
+    RAIN_LOOKAHEAD_DAYS = 3
+    
+    # Decision labels of optimize_irrigation, indexed by the codes of irrigation sweeps
+    URGENCY_LEVELS = ('low', 'moderate', 'high', 'critical')
+    IRRIGATION_TIMINGS = ('monitor', 'within_3_days', 'within_24h', 'immediate', 'delay_for_rain')
+    
+    def __init__(self, model_version: str = DEFAULT_MODEL_VERSION, model_path: Optional[str] = None):
+        self.model_version = model_version
+        self.model_path = model_path if model_path is not None else self._resolve_model_path(model_version)
+        self.models = {}
+        self.feature_scalers = {}
+        self.crop_encoders = {}
+        self.load_models()
+    
+    @staticmethod
+    def _resolve_model_path(model_version: str) -> Optional[str]:
+        """
+        Locate the compiled artifact for a model version
+        
+        Returns:
+            The artifact path, or None for the default or builtin version when no
+            artifact was deployed (the in-code definition is used)
             
-            if weather_forecast:
-                expected_rainfall = sum(day.get('precipitation', 0) for day in weather_forecast[:7])
-                temperatures = [day.get('temperature', 25) for day in weather_forecast[:7]]
-                humidities = [day.get('humidity', 60) for day in weather_forecast[:7]]
-                avg_temp = np.mean(temperatures)
-                avg_humidity = np.mean(humidities)
+        Raises:
+            ModelNotFoundError: Any other version has no artifact, so it is never
+                served by the builtin model under its name
+        """
+        if MODEL_ARTIFACT_DIR:
+            path = os.path.join(MODEL_ARTIFACT_DIR, f"{model_version}{MODEL_ARTIFACT_SUFFIX}")
+            if os.path.exists(path):
+                return path
+        if model_version in (DEFAULT_MODEL_VERSION, BUILTIN_MODEL_VERSION):
+            return None
+        raise ModelNotFoundError(model_version)
+    
+    def load_models(self):
+        """Load pre-trained models and scalers"""
+        if self.model_path:
+            self.load_model_artifact(self.model_path)
+        else:
+            self.load_builtin_models()
+    
+    def load_model_artifact(self, path: str):
+        """Load the yield model from a compiled, memory-mapped artifact"""
+        self.yield_model = YieldModel.from_artifact(path)
+        
+        artifact_version = self.yield_model.metadata.get('model_version')
+        if artifact_version != self.model_version:
+            raise ValueError(f"Model artifact {path} holds version {artifact_version}, "
+                             f"expected {self.model_version}")
+    
+    def load_builtin_models(self):
+        """Load the in-code model definition"""
+        # Simulate loading pre-trained models
+        # In production, these would be loaded from cloud storage
+        
+        # Yield prediction model weights (Random Forest simulation)
+        self.models['yield_rf'] = {
+            'n_estimators': 100,
+            'feature_weights': {
+                'weather_temp': 0.15,
+                'weather_rainfall': 0.25, 
+                'weather_humidity': 0.08,
+                'weather_gdd': 0.20,
+                'soil_ph': 0.10,
+                'soil_om': 0.12,
+                'soil_n': 0.18,
+                'soil_p': 0.08,
+                'satellite_ndvi': 0.30,
+                'satellite_evi': 0.15,
+                'field_area': 0.05,
+                'planting_doy': 0.08
+            },
+            'base_yield': 8.5,
+            'crop_factors': {
+                'corn': 1.0,
+                'soybean': 0.7,
+                'wheat': 0.9,
+                'rice': 1.1
+            }
+        }
+        
+        # Feature scalers (mean and std for normalization)
+        self.feature_scalers = {
+            'weather_temp': {'mean': 20.0, 'std': 8.0},
+            'weather_rainfall': {'mean': 500.0, 'std': 200.0},
+            'weather_humidity': {'mean': 65.0, 'std': 15.0},
+            'weather_gdd': {'mean': 1500.0, 'std': 400.0},
+            'soil_ph': {'mean': 6.8, 'std': 0.8},
+            'soil_om': {'mean': 3.0, 'std': 1.5},
+            'soil_n': {'mean': 30.0, 'std': 15.0},
+            'soil_p': {'mean': 25.0, 'std': 10.0},
+            'satellite_ndvi': {'mean': 0.7, 'std': 0.2},
+            'satellite_evi': {'mean': 0.5, 'std': 0.15},
+            'field_area': {'mean': 100.0, 'std': 50.0},
+            'planting_doy': {'mean': 120.0, 'std': 30.0}
+        }
+        
+        # Precompute mean/std/weight arrays for batch scoring
+        self.yield_model = CompiledYieldModel.from_dicts(self.models['yield_rf'], self.feature_scalers)
+    
+    def predict_yield(self, features: Dict[str, float], crop_type: str = 'corn') -> Dict[str, Any]:
+        """
+        Predict crop yield using Random Forest simulation
+        
+        Args:
+            features: Dictionary of feature values
+            crop_type: Type of crop being predicted
             
-            # Calculate irrigation need
-            evapotranspiration_factor = 1.0
-            if avg_temp > 30:
-                evapotranspiration_factor += 0.2
-            elif avg_temp < 15:
-                evapotranspiration_factor -= 0.2
+        Returns:
+            Dictionary containing prediction results
+        """
+        try:
+            # A single row through the array-backed scorer, which works the same
+            # whether the model came from the in-code definition or an artifact
+            X = self.yield_model.features_to_matrix({f: [v] for f, v in features.items()}, n_rows=1)
+            scores = self._score_yield_matrix(X, [crop_type])
+            return self._render_yield_rows(scores, [crop_type])[0]
             
-            if avg_humidity > 80:
-                evapotranspiration_factor -= 0.1
-            elif avg_humidity < 40:
-                evapotranspiration_factor += 0.1
+        except Exception as e:
+            raise Exception(f"Yield prediction failed: {str(e)}")
+    
+    def predict_yield_batch(self, features, crop_types='corn', feature_names: Optional[List[str]] = None,
+                            output: str = 'rows',
+                            row_errors: Optional[Dict[int, List[Dict[str, Any]]]] = None) -> Dict[str, Any]:
+        """
+        Predict crop yield for many fields in a single vectorized pass
+        
+        Args:
+            features: Columnar features, either a dict of feature name -> list of
+                values or a 2-D matrix described by feature_names. Missing values
+                (None/NaN) are masked out exactly as absent keys are in predict_yield
+            crop_types: A single crop type for every row or one crop type per row
+            output: 'rows' for one predict_yield style dict per row, or
+                'columnar' for one array per output field
+            feature_names: Column names when features is a 2-D matrix
+            row_errors: Rows a caller already rejected, for features it has
+                validated itself; None validates here
+                
+        Returns:
+            Dictionary containing one prediction per row, in input order. Rows
+            failing validation are not scored: they get a 422 error entry in
+            'rows' output, and NaN values plus an 'errors' entry in 'columnar'
+            output.
+        """
+        try:
+            model = self.yield_model
+            if row_errors is None:
+                X, row_errors = self._validated_yield_matrix(features, feature_names)
+            else:
+                X = model.features_to_matrix(features, feature_names)
+            n_rows = X.shape[0]
             
-            adjusted_requirement = base_requirement * evapotranspiration_factor
+            if isinstance(crop_types, str):
+                crop_types = [crop_types] * n_rows
+            elif len(crop_types) != n_rows:
+                raise ValidationError.for_field('crop_types', "crop_types must be a single value or one value per row")
             
-            # Irrigation scheduling
-            if water_stress_level < 0.3:
-                urgency = 'critical'
-                recommended_amount = (field_capacity - soil_moisture) * 1000  # mm
-                timing = 'immediate'
-            elif water_stress_level < 0.5:
-                urgency = 'high'
-                recommended_amount = (field_capacity - soil_moisture) * 800
-                timing = 'within_24h'
-            elif water_stress_level < 0.7:
-                urgency = 'moderate'
-                recommended_amount = adjusted_requirement * 600
-                timing = 'within_3_days'
+            if output not in ('rows', 'columnar'):
+                raise ValidationError.for_field('output', f"Unknown output format: {output}")
+            
+            scored_crop_types = crop_types
+            if row_errors:
+                keep = np.setdiff1d(np.arange(n_rows), np.fromiter(row_errors, dtype=np.int64))
+                scored_crop_types = [crop_types[i] for i in keep.tolist()]
+                scores = self._score_yield_matrix(X[keep], scored_crop_types)
             else:
-                urgency = 'low'
-                recommended_amount = 0
-                timing = 'monitor'
+                scores = self._score_yield_matrix(X, crop_types)
             
-            # Adjust for expected rainfall
-            if expected_rainfall > recommended_amount * 0.8:
-                recommended_amount = 0
-                timing = 'delay_for_rain'
-                urgency = 'low'
-            elif expected_rainfall > 0:
-                recommended_amount = max(0, recommended_amount - expected_rainfall)
+            batch_info = {
+                'rows': n_rows,
+                'rejected': len(row_errors),
+                'model_type': model.model_type,
+                'features': list(model.feature_names)
+            }
             
-            # Efficiency optimization
-            efficiency_tips = []
-            if urgency in ['critical', 'high']:
-                efficiency_tips.append('Apply during early morning or evening to reduce evaporation')
-            if avg_temp > 30:
-                efficiency_tips.append('Consider mulching to retain soil moisture')
-            if expected_rainfall > 10:
-                efficiency_tips.append('Delay irrigation until after expected rainfall')
+            if output == 'columnar':
+                if row_errors:
+                    scores = _scatter_rows(scores, keep, n_rows)
+                return {
+                    'columns': self._yield_columns(scores, crop_types),
+                    'errors': row_error_list(row_errors),
+                    'batch_info': batch_info
+                }
+            
+            predictions = self._render_yield_rows(scores, scored_crop_types)
+            if row_errors:
+                rendered = iter(predictions)
+                predictions = [rejected_entry(row_errors[i]) if i in row_errors else next(rendered)
+                               for i in range(n_rows)]
+            
+            return {
+                'predictions': predictions,
+                'batch_info': batch_info
+            }
+            
+        except ValidationError:
+            raise
+        except Exception as e:
+            raise Exception(f"Batch yield prediction failed: {str(e)}")
+    
+    def _validated_yield_matrix(self, features, feature_names: Optional[List[str]] = None
+                                ) -> Tuple[np.ndarray, Dict[int, List[Dict[str, Any]]]]:
+        """Coerce batch features into a model-order matrix and find the rows failing validation"""
+        if isinstance(features, dict):
+            columns = {}
+            type_errors = []
+            for name, values in features.items():
+                columns[name], errors = coerce_numeric(values, name)
+                if errors:
+                    type_errors.append(errors)
+        else:
+            columns, errors = coerce_numeric(features, 'features', feature_names)
+            type_errors = [errors] if errors else []
+        
+        X = self.yield_model.features_to_matrix(columns, feature_names)
+        range_errors = YIELD_FEATURE_SCHEMA.check_matrix(X, self.yield_model.feature_names)
+        if not type_errors:
+            return X, range_errors
+        return X, merge_row_errors(*type_errors, range_errors)
+    
+    def _score_yield_matrix(self, X: np.ndarray, crop_types) -> Dict[str, np.ndarray]:
+        """Score a feature matrix in model order, NaN entries are treated as missing"""
+        return self.yield_model.score(X, crop_types)
+    
+    def _render_yield_rows(self, scores: Dict[str, np.ndarray], crop_types: List[str]) -> List[Dict[str, Any]]:
+        """Render batch scores as the per-row dicts returned by predict_yield"""
+        feature_names = self.yield_model.feature_names
+        model_type = self.yield_model.model_type
+        base_yield = self.yield_model.base_yield
+        
+        predicted = round_array(scores['predicted_yield'], 2).tolist()
+        confidence = round_array(scores['confidence'], 3).tolist()
+        lower = round_array(scores['lower_bound'], 2).tolist()
+        upper = round_array(scores['upper_bound'], 2).tolist()
+        std = round_array(scores['std_deviation'], 2).tolist()
+        crop_factor = scores['crop_factor'].tolist()
+        importance = scores['feature_importance'].tolist()
+        present = scores['present'].tolist()
+        
+        rows = []
+        for i in range(len(predicted)):
+            rows.append({
+                'predicted_yield': predicted[i],
+                'confidence': confidence[i],
+                'uncertainty': {
+                    'lower_bound': lower[i],
+                    'upper_bound': upper[i],
+                    'std_deviation': std[i]
+                },
+                'feature_importance': {
+                    feature: importance[i][j]
+                    for j, feature in enumerate(feature_names) if present[i][j]
+                },
+                'model_info': {
+                    'model_type': model_type,
+                    'crop_type': crop_types[i],
+                    'base_yield': base_yield,
+                    'crop_factor': crop_factor[i]
+                }
+            })
+        return rows
+    
+    def _yield_columns(self, scores: Dict[str, np.ndarray], crop_types: List[str]) -> Dict[str, Any]:
+        """
+        Batch scores as arrays, rounded with the same round_array as _render_yield_rows
+        
+        feature_importance is a rows x features matrix in batch_info feature
+        order, with NaN (null in JSON) where a feature was missing.
+        """
+        return {
+            'predicted_yield': round_array(scores['predicted_yield'], 2),
+            'confidence': round_array(scores['confidence'], 3),
+            'lower_bound': round_array(scores['lower_bound'], 2),
+            'upper_bound': round_array(scores['upper_bound'], 2),
+            'std_deviation': round_array(scores['std_deviation'], 2),
+            'crop_factor': scores['crop_factor'],
+            'crop_type': list(crop_types),
+            'feature_importance': np.where(scores['present'], scores['feature_importance'], np.nan)
+        }
+    
+    def analyze_stress_patterns(self, satellite_data: List[Dict]) -> Dict[str, Any]:
+        """
+        Analyze crop stress patterns from satellite time series data
+        
+        Args:
+            satellite_data: List of satellite observations with NDVI, date, etc.
+            
+        Returns:
+            Dictionary containing stress analysis results
+        """
+        try:
+            if not satellite_data:
+                raise ValidationError.for_field('satellite_data', "No satellite data provided")
+            
+            # Extract NDVI values and dates
+            ndvi_values = []
+            dates = []
+            
+            for obs in satellite_data:
+                ndvi = obs.get('ndvi')
+                # Null and NaN readings are missing observations and don't count towards the minimum
+                if ndvi is None or 'date' not in obs or (isinstance(ndvi, numbers.Real) and not math.isfinite(ndvi)):
+                    continue
+                ndvi_values.append(ndvi)
+                dates.append(obs['date'])
+            
+            if len(ndvi_values) < 3:
+                raise ValidationError.for_field('satellite_data',
+                                                "At least 3 observations required for stress analysis", status=422)
+            
+            # A single-row run of the batch engine keeps both paths on the same thresholds
+            ndvi_matrix = np.array([ndvi_values], dtype=np.float64)
+            stats = self._stress_statistics(ndvi_matrix)
+            return self._render_stress_results(ndvi_matrix, stats, dates)[0]
+            
+        except ValidationError:
+            raise
+        except Exception as e:
+            raise Exception(f"Stress pattern analysis failed: {str(e)}")
+    
+    def analyze_stress_batch(self, ndvi_matrix, dates: Optional[List[str]] = None,
+                             field_ids: Optional[List[Any]] = None, output: str = 'rows',
+                             row_errors: Optional[Dict[int, List[Dict[str, Any]]]] = None) -> Dict[str, Any]:
+        """
+        Analyze stress patterns for many fields over a shared date axis
+        
+        Args:
+            ndvi_matrix: fields x dates NDVI values, NaN/None for missing observations
+            dates: Date label for each column
+            field_ids: Identifier for each row
+            output: 'rows' for one analyze_stress_patterns style entry per field,
+                or 'columnar' for one array per statistic
+            row_errors: Rows a caller already rejected (and blanked to NaN) after
+                validating the matrix itself; None validates here
+                
+        Returns:
+            Dictionary containing one result per field, in input order. Fields
+            with fewer than 3 observations, or failing validation (422), get an
+            error entry instead of failing the whole batch.
+        """
+        try:
+            if row_errors is None:
+                Y, row_errors = self._validated_ndvi_matrix(ndvi_matrix)
+            else:
+                Y = np.asarray(ndvi_matrix, dtype=np.float64)
+            
+            n_fields, n_dates = Y.shape
+            if dates is None:
+                dates = list(range(n_dates))
+            elif len(dates) != n_dates:
+                raise ValidationError.for_field('dates', "dates must have one entry per NDVI matrix column")
+            if field_ids is None:
+                field_ids = list(range(n_fields))
+            elif len(field_ids) != n_fields:
+                raise ValidationError.for_field('field_ids', "field_ids must have one entry per NDVI matrix row")
+            
+            if output not in ('rows', 'columnar'):
+                raise ValidationError.for_field('output', f"Unknown output format: {output}")
+            
+            stats = self._stress_statistics(Y)
+            batch_info = {
+                'fields': n_fields,
+                'dates': n_dates,
+                'analyzed': int(np.count_nonzero(stats['analyzable'])),
+                'rejected': len(row_errors)
+            }
+            
+            if output == 'columnar':
+                return {
+                    'columns': self._stress_columns(Y, stats, field_ids),
+                    'errors': row_error_list(row_errors),
+                    'batch_info': batch_info
+                }
+            
+            results = self._render_stress_results(Y, stats, dates)
+            
+            fields = []
+            for i, (field_id, result) in enumerate(zip(field_ids, results)):
+                if i in row_errors:
+                    fields.append(dict(field_id=field_id, **rejected_entry(row_errors[i])))
+                elif result is None:
+                    fields.append({
+                        'field_id': field_id,
+                        'success': False,
+                        'error': "At least 3 observations required for stress analysis"
+                    })
+                else:
+                    fields.append({'field_id': field_id, 'success': True, 'data': result})
+            
+            return {
+                'fields': fields,
+                'batch_info': batch_info
+            }
+            
+        except ValidationError:
+            raise
+        except Exception as e:
+            raise Exception(f"Batch stress analysis failed: {str(e)}")
+    
+    def _validated_ndvi_matrix(self, ndvi_matrix) -> Tuple[np.ndarray, Dict[int, List[Dict[str, Any]]]]:
+        """Coerce a fields x dates NDVI matrix, blanking (NaN) the rows failing validation"""
+        Y, type_errors = coerce_numeric(ndvi_matrix, 'ndvi_matrix')
+        if Y.ndim != 2:
+            raise ValidationError.for_field('ndvi_matrix', "NDVI matrix must be two dimensional (fields x dates)")
+        
+        spec = SATELLITE_OBSERVATION_SCHEMA.fields['ndvi']
+        n_dates = Y.shape[1]
+        range_errors = mask_row_errors(spec.out_of_range(Y), [f"ndvi_matrix[{j}]" for j in range(n_dates)],
+                                       [spec.message] * n_dates)
+        row_errors = merge_row_errors(type_errors, range_errors) if type_errors else range_errors
+        
+        if row_errors:
+            # Never write into the caller's (possibly read-only columnar) buffer
+            Y = Y.copy()
+            Y[np.fromiter(row_errors, dtype=np.int64)] = np.nan
+        return Y, row_errors
+    
+    def _stress_statistics(self, Y: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Compute stress indicators for every row of a fields x dates NDVI matrix
+        
+        NaN entries are ignored. Each field's trend is the closed-form least
+        squares slope over its observation index, as np.polyfit computes it on
+        the compacted series.
+        """
+        valid = ~np.isnan(Y)
+        count = valid.sum(axis=1)
+        n_fields = Y.shape[0]
+        
+        mean = np.zeros(n_fields)
+        std = np.zeros(n_fields)
+        slope = np.zeros(n_fields)
+        
+        # Move each field's observations to the front, then reduce fields with the
+        # same observation count together. Reducing the compacted rows gives
+        # bit-identical mean/std to analyze_stress_patterns on one series
+        order = np.argsort(~valid, axis=1, kind='stable')
+        compact = np.take_along_axis(Y, order, axis=1)
+        for n in np.unique(count[count > 0]).tolist():
+            rows = np.nonzero(count == n)[0]
+            block = compact[rows, :n]
+            mean[rows] = block.mean(axis=1)
+            std[rows] = block.std(axis=1)
+            
+            if n > 1:
+                x_centered = np.arange(n) - (n - 1) / 2
+                slope[rows] = (block - mean[rows, None]) @ x_centered / (x_centered @ x_centered)
+        
+        min_ndvi = np.where(valid, Y, np.inf).min(axis=1, initial=np.inf)
+        max_ndvi = np.where(valid, Y, -np.inf).max(axis=1, initial=-np.inf)
+        
+        stats = self._stress_indicators(count, mean, std, min_ndvi, max_ndvi, slope)
+        stats['valid'] = valid
+        # Anomalies are values beyond 2 standard deviations of the field mean
+        stats['anomalies'] = valid & (np.abs(Y - mean[:, None]) > 2 * std[:, None])
+        return stats
+    
+    def _stress_indicators(self, count: np.ndarray, mean: np.ndarray, std: np.ndarray,
+                           min_ndvi: np.ndarray, max_ndvi: np.ndarray, slope: np.ndarray) -> Dict[str, np.ndarray]:
+        """Derive stress, trend and variability indicators from per-field statistics"""
+        coefficient_of_variation = np.divide(std, mean, out=np.zeros_like(std), where=mean > 0)
+        abs_slope = np.abs(slope)
+        
+        return {
+            'count': count,
+            'analyzable': count >= 3,
+            'mean': mean,
+            'std': std,
+            'min': min_ndvi,
+            'max': max_ndvi,
+            'slope': slope,
+            'coefficient_of_variation': coefficient_of_variation,
+            'confidence': np.minimum(0.95, 0.7 + (1 - coefficient_of_variation) * 0.25),
+            'stress_code': np.select([mean > 0.7, mean > 0.5, mean > 0.3], [0, 1, 2], 3),
+            'trend_code': np.select([slope > 0.01, slope < -0.01], [0, 1], 2),
+            'significance_code': np.select([abs_slope > 0.02, abs_slope > 0.005], [0, 1], 2)
+        }
+    
+    def _render_stress_results(self, Y: np.ndarray, stats: Dict[str, np.ndarray], dates: List[Any],
+                               date_ranges: Optional[List[str]] = None) -> List[Optional[Dict[str, Any]]]:
+        """Render stress statistics as the per-field dicts returned by analyze_stress_patterns"""
+        mean = np.round(stats['mean'], 3).tolist()
+        std = np.round(stats['std'], 3).tolist()
+        min_ndvi = np.round(stats['min'], 3).tolist()
+        max_ndvi = np.round(stats['max'], 3).tolist()
+        cv = np.round(stats['coefficient_of_variation'], 3).tolist()
+        slope = np.round(stats['slope'], 4).tolist()
+        confidence = stats['confidence'].tolist()
+        stress_code = stats['stress_code'].tolist()
+        trend_code = stats['trend_code'].tolist()
+        significance_code = stats['significance_code'].tolist()
+        count = stats['count'].tolist()
+        analyzable = stats['analyzable'].tolist()
+        
+        # First and last observed date of every field
+        if date_ranges is None:
+            valid = stats['valid']
+            first = valid.argmax(axis=1).tolist()
+            last = (valid.shape[1] - 1 - valid[:, ::-1].argmax(axis=1)).tolist()
+            date_ranges = [f"{dates[first[i]]} to {dates[last[i]]}" if analyzable[i] else None
+                           for i in range(len(first))]
+        
+        anomaly_rows, anomaly_cols = np.nonzero(stats['anomalies'])
+        anomaly_values = Y[anomaly_rows, anomaly_cols]
+        anomaly_deviation = np.abs(anomaly_values - stats['mean'][anomaly_rows])
+        anomaly_low = anomaly_values < stats['mean'][anomaly_rows]
+        
+        anomalies_by_field = [[] for _ in range(Y.shape[0])]
+        for row, col, value, deviation, low in zip(anomaly_rows.tolist(), anomaly_cols.tolist(),
+                                                   anomaly_values.tolist(), anomaly_deviation.tolist(),
+                                                   anomaly_low.tolist()):
+            anomalies_by_field[row].append({
+                'date': dates[col],
+                'ndvi': value,
+                'deviation': deviation,
+                'type': 'low' if low else 'high'
+            })
+        
+        results = []
+        for i in range(Y.shape[0]):
+            if not analyzable[i]:
+                results.append(None)
+                continue
+            
+            stress_level = self.STRESS_LEVELS[stress_code[i]]
+            trend = self.TREND_DIRECTIONS[trend_code[i]]
+            anomalies = anomalies_by_field[i]
+            
+            results.append({
+                'stress_level': stress_level,
+                'confidence': confidence[i],
+                'statistics': {
+                    'mean_ndvi': mean[i],
+                    'std_ndvi': std[i],
+                    'min_ndvi': min_ndvi[i],
+                    'max_ndvi': max_ndvi[i],
+                    'coefficient_of_variation': cv[i]
+                },
+                'trend': {
+                    'direction': trend,
+                    'slope': slope[i],
+                    'significance': self.TREND_SIGNIFICANCE[significance_code[i]]
+                },
+                'anomalies': anomalies,
+                'recommendations': self._generate_stress_recommendations(stress_level, trend, anomalies),
+                'analysis_info': {
+                    'observations': count[i],
+                    'date_range': date_ranges[i],
+                    'method': 'statistical_analysis'
+                }
+            })
+        
+        return results
+    
+    def _stress_columns(self, Y: np.ndarray, stats: Dict[str, np.ndarray], field_ids: List[Any]) -> Dict[str, Any]:
+        """
+        Stress statistics as arrays, rounded like _render_stress_results
+        
+        Fields that could not be analyzed hold NaN/null. Anomalies are listed as
+        parallel field_index/date_index/ndvi/deviation arrays, and the text
+        recommendations are left to the per-row output.
+        """
+        analyzable = stats['analyzable']
+        
+        def masked(values, decimals=None):
+            values = np.round(values, decimals) if decimals is not None else values.astype(np.float64)
+            return np.where(analyzable, values, np.nan)
+        
+        def labels(table, codes):
+            return [table[code] if ok else None for code, ok in zip(codes.tolist(), analyzable.tolist())]
+        
+        anomaly_rows, anomaly_cols = np.nonzero(stats['anomalies'])
+        anomaly_values = Y[anomaly_rows, anomaly_cols]
+        
+        return {
+            'field_id': list(field_ids),
+            'success': analyzable,
+            'stress_level': labels(self.STRESS_LEVELS, stats['stress_code']),
+            'confidence': masked(stats['confidence']),
+            'mean_ndvi': masked(stats['mean'], 3),
+            'std_ndvi': masked(stats['std'], 3),
+            'min_ndvi': masked(stats['min'], 3),
+            'max_ndvi': masked(stats['max'], 3),
+            'coefficient_of_variation': masked(stats['coefficient_of_variation'], 3),
+            'trend_direction': labels(self.TREND_DIRECTIONS, stats['trend_code']),
+            'trend_slope': masked(stats['slope'], 4),
+            'trend_significance': labels(self.TREND_SIGNIFICANCE, stats['significance_code']),
+            'observations': stats['count'],
+            'anomalies': {
+                'field_index': anomaly_rows,
+                'date_index': anomaly_cols,
+                'ndvi': anomaly_values,
+                'deviation': np.abs(anomaly_values - stats['mean'][anomaly_rows])
+            }
+        }
+    
+    def analyze_stress_raster(self, ndvi_stack, dates: Optional[List[Any]] = None, zones=None,
+                              tile_rows: Optional[int] = None, output_dir: Optional[str] = None,
+                              output: str = 'grids') -> Dict[str, Any]:
+        """
+        Per-pixel stress analysis of a time x height x width NDVI stack
+        
+        Every pixel is treated as one field's series and scored with the same
+        statistics and thresholds as analyze_stress_patterns. The stack is read
+        in tiles of whole rows, so a memory-mapped stack is never loaded at once
+        and peak memory is bounded by the tile size.
+        
+        Args:
+            ndvi_stack: (time, height, width) array or memmap, NaN for missing
+            dates: Date label for each time step
+            zones: Optional (height, width) array of non-negative zone labels
+                (e.g. management zones); the whole raster is zone 0 when omitted
+            tile_rows: Raster rows per tile, sized from RASTER_TILE_PIXELS by default
+            output_dir: Write the grids as .npy files here (memory-mapped) instead
+                of holding them in memory
+            output: 'grids' for the grids and zone summaries, or 'columnar' for
+                the columnar batch layout (grids as columns, zones in batch_info)
+                
+        Returns:
+            Dictionary containing the per-pixel grids, per-zone summaries and
+            raster_info. Grids hold stress_code and trend_code (-1 where a pixel
+            has fewer than 3 observations), mean_ndvi and trend_slope (NaN there)
+            and anomaly_count.
+        """
+        try:
+            try:
+                stack = ndvi_stack if isinstance(ndvi_stack, np.ndarray) else np.asarray(ndvi_stack, dtype=np.float64)
+            except (TypeError, ValueError):
+                raise ValidationError.for_field('ndvi_stack', "NDVI stack must be a rectangular array of numbers")
+            if stack.dtype.kind not in 'biuf':
+                raise ValidationError.for_field('ndvi_stack', "NDVI stack must be a rectangular array of numbers")
+            if stack.ndim != 3:
+                raise ValidationError.for_field('ndvi_stack',
+                                                "NDVI stack must be three dimensional (time x height x width)")
+            if output not in ('grids', 'columnar'):
+                raise ValidationError.for_field('output', f"Unknown output format: {output}")
+            
+            n_dates, height, width = stack.shape
+            if dates is not None and (not isinstance(dates, (list, tuple, np.ndarray)) or len(dates) != n_dates):
+                raise ValidationError.for_field('dates', "dates must have one entry per NDVI stack time step")
+            
+            if zones is None:
+                zones = np.zeros((height, width), dtype=np.int64)
+            else:
+                try:
+                    zones = np.asarray(zones)
+                except ValueError:
+                    # Ragged nested lists
+                    zones = np.empty(0)
+                if zones.shape != (height, width) or zones.dtype.kind not in 'iu':
+                    raise ValidationError.for_field('zones',
+                                                    "zones must be an integer array matching the stack height and width")
+                if zones.size and zones.min() < 0:
+                    raise ValidationError.for_field('zones', "zone labels must be non-negative", status=422)
+            n_zones = int(zones.max()) + 1 if zones.size else 1
+            
+            if tile_rows is None:
+                tile_rows = max(1, RASTER_TILE_PIXELS // max(width, 1))
+            if not isinstance(tile_rows, numbers.Integral) or tile_rows < 1:
+                raise ValidationError.for_field('tile_rows', "tile_rows must be an integer of at least 1")
+            
+            grid_types = {
+                'stress_code': np.int8,
+                'trend_code': np.int8,
+                'mean_ndvi': np.float32,
+                'trend_slope': np.float32,
+                'anomaly_count': np.uint16
+            }
+            if output_dir:
+                os.makedirs(output_dir, exist_ok=True)
+                grids = {name: np.lib.format.open_memmap(os.path.join(output_dir, f"{name}.npy"), mode='w+',
+                                                         dtype=dtype, shape=(height, width))
+                         for name, dtype in grid_types.items()}
+            else:
+                grids = {name: np.empty((height, width), dtype=dtype) for name, dtype in grid_types.items()}
+            
+            # Per-zone accumulators, filled tile by tile with bincount
+            zone_pixels = np.zeros(n_zones, dtype=np.int64)
+            zone_analyzed = np.zeros(n_zones, dtype=np.int64)
+            zone_levels = np.zeros((len(self.STRESS_LEVELS), n_zones), dtype=np.int64)
+            zone_ndvi = np.zeros(n_zones)
+            zone_slope = np.zeros(n_zones)
+            zone_anomalous = np.zeros(n_zones, dtype=np.int64)
+            
+            for top in range(0, height, tile_rows):
+                bottom = min(top + tile_rows, height)
+                # time x rows x width -> pixels x time, one pixel per row
+                Y = np.asarray(stack[:, top:bottom, :], dtype=np.float64).reshape(n_dates, -1).T
+                stats = self._stress_statistics(np.ascontiguousarray(Y))
+                
+                analyzable = stats['analyzable']
+                shape = (bottom - top, width)
+                anomaly_count = stats['anomalies'].sum(axis=1)
+                grids['stress_code'][top:bottom] = np.where(analyzable, stats['stress_code'], -1).reshape(shape)
+                grids['trend_code'][top:bottom] = np.where(analyzable, stats['trend_code'], -1).reshape(shape)
+                grids['mean_ndvi'][top:bottom] = np.where(analyzable, stats['mean'], np.nan).reshape(shape)
+                grids['trend_slope'][top:bottom] = np.where(analyzable, stats['slope'], np.nan).reshape(shape)
+                grids['anomaly_count'][top:bottom] = anomaly_count.reshape(shape)
+                
+                labels = zones[top:bottom].reshape(-1)
+                analyzed_labels = labels[analyzable]
+                zone_pixels += np.bincount(labels, minlength=n_zones)
+                zone_analyzed += np.bincount(analyzed_labels, minlength=n_zones)
+                zone_ndvi += np.bincount(analyzed_labels, weights=stats['mean'][analyzable], minlength=n_zones)
+                zone_slope += np.bincount(analyzed_labels, weights=stats['slope'][analyzable], minlength=n_zones)
+                zone_anomalous += np.bincount(labels[analyzable & (anomaly_count > 0)], minlength=n_zones)
+                for level in range(len(self.STRESS_LEVELS)):
+                    zone_levels[level] += np.bincount(analyzed_labels[stats['stress_code'][analyzable] == level],
+                                                      minlength=n_zones)
+            
+            zone_summaries = []
+            for zone in np.nonzero(zone_pixels)[0].tolist():
+                analyzed = int(zone_analyzed[zone])
+                summary = {
+                    'zone': zone,
+                    'pixels': int(zone_pixels[zone]),
+                    'analyzed_pixels': analyzed,
+                    'stress_distribution': None,
+                    'dominant_stress_level': None,
+                    'mean_ndvi': None,
+                    'mean_trend_slope': None,
+                    'anomalous_pixels': int(zone_anomalous[zone])
+                }
+                if analyzed:
+                    levels = zone_levels[:, zone]
+                    summary.update({
+                        'stress_distribution': {level: round(int(levels[i]) / analyzed, 4)
+                                                for i, level in enumerate(self.STRESS_LEVELS)},
+                        'dominant_stress_level': self.STRESS_LEVELS[int(levels.argmax())],
+                        'mean_ndvi': round(float(zone_ndvi[zone]) / analyzed, 3),
+                        'mean_trend_slope': round(float(zone_slope[zone]) / analyzed, 4)
+                    })
+                zone_summaries.append(summary)
+            
+            raster_info = {
+                'dates': n_dates,
+                'height': height,
+                'width': width,
+                'tile_rows': tile_rows,
+                'analyzed_pixels': int(zone_analyzed.sum()),
+                'date_range': f"{dates[0]} to {dates[-1]}" if dates is not None and n_dates else None,
+                'stress_levels': list(self.STRESS_LEVELS),
+                'trend_directions': list(self.TREND_DIRECTIONS),
+                'output_dir': output_dir,
+                'method': 'statistical_analysis'
+            }
+            
+            if output_dir:
+                for grid in grids.values():
+                    grid.flush()
+            
+            if output == 'columnar':
+                return {'columns': grids, 'batch_info': dict(raster_info, zones=zone_summaries)}
+            
+            return {
+                'grids': grids,
+                'zones': zone_summaries,
+                'raster_info': raster_info
+            }
+            
+        except ValidationError:
+            raise
+        except Exception as e:
+            raise Exception(f"Raster stress analysis failed: {str(e)}")
+    
+    def analyze_stress_stream(self, lines: Iterable[Optional[bytes]]) -> Iterator[Dict[str, Any]]:
+        """
+        Analyze newline-delimited JSON field records one at a time
+        
+        Each line is an object with ``satellite_data`` and an optional
+        ``field_id``. Results are yielded as soon as each field is analyzed, and
+        a bad line produces an error record instead of failing the stream. Lines
+        failing validation (e.g. fewer than 3 non-null NDVI readings) also list
+        the per-field ``errors``.
+        
+        Args:
+            lines: Raw lines without their newline. None marks a line that was
+                dropped for exceeding MAX_STREAM_LINE_BYTES
+                
+        Returns:
+            Iterator of per-field result records in input order
+        """
+        for line_number, line in enumerate(lines, start=1):
+            if line is not None and not line.strip():
+                continue
+            
+            record = {'line': line_number, 'field_id': None}
+            try:
+                if line is None:
+                    raise ValueError(f"Line exceeds {MAX_STREAM_LINE_BYTES} bytes")
+                
+                item = json.loads(line)
+                if not isinstance(item, dict):
+                    raise ValueError("Each line must be a JSON object")
+                
+                record['field_id'] = item.get('field_id')
+                # Each line is checked like an analyze_stress request body
+                STRESS_REQUEST_SCHEMA.validate(item)
+                record['data'] = self.analyze_stress_patterns(item.get('satellite_data', []))
+                record['success'] = True
+            except ValidationError as e:
+                record['success'] = False
+                record['error'] = str(e)
+                record['errors'] = e.errors
+            except Exception as e:
+                record['success'] = False
+                record['error'] = str(e)
+            
+            yield record
+    
+    def update_stress_state(self, state: Optional[Dict[str, Any]], satellite_data: List[Dict]) -> Dict[str, Any]:
+        """
+        Fold new satellite observations into a field's running stress state
+        
+        Statistics, trend and stress level match a full analyze_stress_patterns
+        run over the whole history (up to floating point rounding). Anomalies
+        are evaluated for the new observations only, against the updated
+        mean/std, since past observations are not retained.
+        
+        Args:
+            state: Previously returned state dict, or None for a new field
+            satellite_data: New observations in date order
+            
+        Returns:
+            Dictionary with the updated state and the stress analysis result
+            (None until at least 3 observations have been seen)
+        """
+        try:
+            stress_state = StressState.from_dict(state)
+            
+            new_values = []
+            new_dates = []
+            ignored = 0
+            for obs in satellite_data:
+                # A pass without an NDVI reading (e.g. clouded out) adds nothing
+                if obs.get('ndvi') is None or 'date' not in obs:
+                    continue
+                # Passes already folded into the state (or arriving out of order) would
+                # double count and shift the trend index, so they are skipped
+                if stress_state.last_date is not None and str(obs['date']) <= str(stress_state.last_date):
+                    ignored += 1
+                    continue
+                stress_state.add(obs['ndvi'], obs['date'])
+                new_values.append(obs['ndvi'])
+                new_dates.append(obs['date'])
+            
+            result = None
+            if stress_state.count >= 3:
+                stats = self._stress_indicators(
+                    np.array([stress_state.count]), np.array([stress_state.mean]),
+                    np.array([stress_state.std]), np.array([stress_state.min]),
+                    np.array([stress_state.max]), np.array([stress_state.slope])
+                )
+                
+                Y = np.array([new_values], dtype=np.float64).reshape(1, -1)
+                stats['anomalies'] = np.abs(Y - stress_state.mean) > 2 * stress_state.std
+                
+                date_range = f"{stress_state.first_date} to {stress_state.last_date}"
+                result = self._render_stress_results(Y, stats, new_dates, [date_range])[0]
+                result['analysis_info']['method'] = 'incremental_statistics'
+            
+            return {
+                'state': stress_state.to_dict(),
+                'result': result,
+                'update_info': {
+                    'new_observations': len(new_values),
+                    'ignored_observations': ignored
+                }
+            }
+            
+        except Exception as e:
+            raise Exception(f"Incremental stress analysis failed: {str(e)}")
+    
+    def optimize_irrigation(self, field_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Optimize irrigation scheduling based on field conditions
+        
+        Args:
+            field_data: Dictionary containing field conditions and constraints
+            
+        Returns:
+            Dictionary containing irrigation optimization results
+        """
+        try:
+            # Extract field parameters
+            soil_moisture = field_data.get('soil_moisture', 0.3)
+            crop_stage = field_data.get('crop_stage', 'vegetative')
+            weather_forecast = field_data.get('weather_forecast', [])
+            field_capacity = field_data.get('field_capacity', 0.4)
+            wilting_point = field_data.get('wilting_point', 0.15)
+            
+            # Calculate available water
+            available_water = max(0, soil_moisture - wilting_point)
+            max_available = field_capacity - wilting_point
+            water_stress_level = available_water / max_available if max_available > 0 else 0
+            
+            base_requirement = self.WATER_REQUIREMENTS.get(crop_stage, 0.6)
+            
+            # Weather-based adjustments
+            expected_rainfall = 0
+            avg_temp = 25
+            avg_humidity = 60
+            
+            if weather_forecast:
+                expected_rainfall = sum(day.get('precipitation', 0) for day in weather_forecast[:7])
+                temperatures = [day.get('temperature', 25) for day in weather_forecast[:7]]
+                humidities = [day.get('humidity', 60) for day in weather_forecast[:7]]
+                avg_temp = np.mean(temperatures)
+                avg_humidity = np.mean(humidities)
+            
+            # Calculate irrigation need
+            evapotranspiration_factor = float(self._evapotranspiration_factor(avg_temp, avg_humidity))
+            
+            adjusted_requirement = base_requirement * evapotranspiration_factor
+            
+            # Irrigation scheduling
+            if water_stress_level < 0.3:
+                urgency = 'critical'
+                recommended_amount = (field_capacity - soil_moisture) * 1000  # mm
+                timing = 'immediate'
+            elif water_stress_level < 0.5:
+                urgency = 'high'
+                recommended_amount = (field_capacity - soil_moisture) * 800
+                timing = 'within_24h'
+            elif water_stress_level < 0.7:
+                urgency = 'moderate'
+                recommended_amount = adjusted_requirement * 600
+                timing = 'within_3_days'
+            else:
+                urgency = 'low'
+                recommended_amount = 0
+                timing = 'monitor'
+            
+            # Adjust for expected rainfall
+            if expected_rainfall > recommended_amount * 0.8:
+                recommended_amount = 0
+                timing = 'delay_for_rain'
+                urgency = 'low'
+            elif expected_rainfall > 0:
+                recommended_amount = max(0, recommended_amount - expected_rainfall)
+            
+            # Efficiency optimization
+            efficiency_tips = []
+            if urgency in ['critical', 'high']:
+                efficiency_tips.append('Apply during early morning or evening to reduce evaporation')
+            if avg_temp > 30:
+                efficiency_tips.append('Consider mulching to retain soil moisture')
+            if expected_rainfall > 10:
+                efficiency_tips.append('Delay irrigation until after expected rainfall')
+            
+            return {
+                'irrigation_needed': recommended_amount > 0,
+                'recommended_amount': round(recommended_amount, 1),
+                'urgency': urgency,
+                'timing': timing,
+                'water_stress_level': round(water_stress_level, 2),
+                'current_conditions': {
+                    'soil_moisture': soil_moisture,
+                    'available_water_percent': round(water_stress_level * 100, 1),
+                    'crop_stage': crop_stage
+                },
+                'weather_factors': {
+                    'expected_rainfall_7d': round(expected_rainfall, 1),
+                    'avg_temperature': round(avg_temp, 1),
+                    'avg_humidity': round(avg_humidity, 1),
+                    'evapotranspiration_factor': round(evapotranspiration_factor, 2)
+                },
+                'efficiency_tips': efficiency_tips,
+                'optimization_info': {
+                    'base_requirement': base_requirement,
+                    'adjusted_requirement': round(adjusted_requirement, 2),
+                    'method': 'water_balance_model'
+                }
+            }
+            
+        except Exception as e:
+            raise Exception(f"Irrigation optimization failed: {str(e)}")
+    
+    def optimize_irrigation_batch(self, fields: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Run optimize_irrigation for many fields
+        
+        Args:
+            fields: field_data dicts as accepted by optimize_irrigation, each
+                with an optional field_id
+                
+        Returns:
+            Dictionary containing one result per field, in input order. A field
+            that fails validation (422) or cannot be optimized gets an error
+            entry instead of failing the whole batch.
+        """
+        results = []
+        optimized = 0
+        rejected = 0
+        for i, field_data in enumerate(fields):
+            field_id = field_data.get('field_id', i) if isinstance(field_data, dict) else i
+            errors = FIELD_DATA_SCHEMA.errors(field_data)
+            if errors:
+                results.append(dict(field_id=field_id, **rejected_entry(errors)))
+                rejected += 1
+                continue
+            try:
+                results.append({'field_id': field_id, 'success': True,
+                                'data': self.optimize_irrigation(field_data)})
+                optimized += 1
+            except Exception as e:
+                results.append({'field_id': field_id, 'success': False, 'error': str(e)})
+        
+        return {
+            'fields': results,
+            'batch_info': {
+                'fields': len(fields),
+                'optimized': optimized,
+                'rejected': rejected
+            }
+        }
+    
+    def schedule_irrigation(self, fields: List[Dict[str, Any]], weather_forecast: List[Dict[str, Any]],
+                            pump_capacity: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Plan irrigation day by day for a whole farm over a multi-week forecast
+        
+        Runs a daily soil water balance for every field at once: each day the
+        fields below the 'high' stress threshold of optimize_irrigation are
+        scheduled (unless the next few days' rain covers the need), the shared
+        pump capacity is allocated to the most stressed fields first, and soil
+        moisture is advanced by rain, irrigation and stage/weather adjusted
+        crop water use.
+        
+        Args:
+            fields: Field dicts with field_id, soil_moisture, field_capacity,
+                wilting_point, crop_stage and area (ha, default 1)
+            weather_forecast: Daily forecast with temperature, humidity,
+                precipitation (mm) and an optional date
+            pump_capacity: Total water the farm can apply per day in m3, or
+                None for unlimited
+                
+        Returns:
+            Dictionary containing the per-field plan and daily totals
+        """
+        try:
+            if not fields:
+                raise ValidationError.for_field('fields', "No fields provided")
+            if not weather_forecast:
+                raise ValidationError.for_field('weather_forecast',
+                                                "A weather forecast is required for irrigation scheduling")
+            
+            depth = self.ROOT_ZONE_DEPTH_MM
+            n_fields = len(fields)
+            n_days = len(weather_forecast)
+            
+            field_ids = [field.get('field_id', i) for i, field in enumerate(fields)]
+            soil_moisture = np.array([field.get('soil_moisture', 0.3) for field in fields], dtype=np.float64)
+            field_capacity = np.array([field.get('field_capacity', 0.4) for field in fields], dtype=np.float64)
+            wilting_point = np.array([field.get('wilting_point', 0.15) for field in fields], dtype=np.float64)
+            area = np.array([field.get('area', 1.0) for field in fields], dtype=np.float64)
+            base_requirement = np.array([self.WATER_REQUIREMENTS.get(field.get('crop_stage', 'vegetative'), 0.6)
+                                         for field in fields], dtype=np.float64)
+            
+            temperature = np.array([day.get('temperature', 25) for day in weather_forecast], dtype=np.float64)
+            humidity = np.array([day.get('humidity', 60) for day in weather_forecast], dtype=np.float64)
+            rainfall = np.array([day.get('precipitation', 0) for day in weather_forecast], dtype=np.float64)
+            dates = [day.get('date', i) for i, day in enumerate(weather_forecast)]
+            
+            # Daily crop water use (mm) for every field and day
+            et_factor = self._evapotranspiration_factor(temperature, humidity)
+            crop_water_use = base_requirement[None, :] * et_factor[:, None] * self.REFERENCE_ET_MM
+            
+            # Rain expected today and over the next few days
+            cumulative_rain = np.concatenate([[0.0], np.cumsum(rainfall)])
+            window_end = np.minimum(np.arange(n_days) + self.RAIN_LOOKAHEAD_DAYS, n_days)
+            upcoming_rain = cumulative_rain[window_end] - cumulative_rain[:n_days]
+            
+            storage = soil_moisture * depth
+            capacity_mm = field_capacity * depth
+            wilting_mm = wilting_point * depth
+            max_available = capacity_mm - wilting_mm
+            
+            plan = np.zeros((n_days, n_fields))
+            urgency = np.zeros((n_days, n_fields), dtype=np.int8)
+            deferred = np.zeros((n_days, n_fields), dtype=bool)
+            min_stress = np.full(n_fields, np.inf)
+            
+            for day in range(n_days):
+                stress = np.divide(np.maximum(storage - wilting_mm, 0), max_available,
+                                   out=np.zeros(n_fields), where=max_available > 0)
+                min_stress = np.minimum(min_stress, stress)
+                
+                deficit = np.maximum(capacity_mm - storage, 0)
+                critical = stress < 0.3
+                high = ~critical & (stress < 0.5)
+                need = np.where(critical, deficit, np.where(high, deficit * 0.8, 0.0))
+                
+                # Wait for rain that covers most of the need, otherwise top up the difference
+                rain_covers = upcoming_rain[day] > need * 0.8
+                need = np.where(rain_covers, 0.0, np.maximum(0, need - upcoming_rain[day]))
+                
+                if pump_capacity is not None:
+                    volume = need * area * 10.0  # mm over ha -> m3
+                    order = np.argsort(stress, kind='stable')
+                    before = np.cumsum(volume[order]) - volume[order]
+                    granted = np.empty(n_fields)
+                    granted[order] = np.clip(pump_capacity - before, 0, volume[order])
+                    # A zero-area field needs no pump volume, so its need is never capped
+                    granted_mm = np.divide(granted, area * 10.0, out=need.copy(), where=area > 0)
+                    deferred[day] = granted_mm < need - 1e-9
+                    need = granted_mm
+                
+                plan[day] = need
+                urgency[day] = np.where(need > 0, np.where(critical, 2, 1), 0)
+                
+                storage = np.minimum(storage + rainfall[day] + need - crop_water_use[day], capacity_mm)
+                storage = np.maximum(storage, 0)
+            
+            return self._render_irrigation_schedule(
+                field_ids, dates, plan, urgency, deferred, area, storage / depth, min_stress, pump_capacity
+            )
+            
+        except ValidationError:
+            raise
+        except Exception as e:
+            raise Exception(f"Irrigation scheduling failed: {str(e)}")
+    
+    def _render_irrigation_schedule(self, field_ids: List[Any], dates: List[Any], plan: np.ndarray,
+                                    urgency: np.ndarray, deferred: np.ndarray, area: np.ndarray,
+                                    final_moisture: np.ndarray, min_stress: np.ndarray,
+                                    pump_capacity: Optional[float]) -> Dict[str, Any]:
+        """Render the day x field plan matrices as per-field events and daily totals"""
+        urgency_names = ('none', 'high', 'critical')
+        
+        events = [[] for _ in field_ids]
+        days, columns = np.nonzero(plan > 0)
+        for day, column, amount, level in zip(days.tolist(), columns.tolist(),
+                                              np.round(plan[days, columns], 1).tolist(),
+                                              urgency[days, columns].tolist()):
+            events[column].append({
+                'day': day,
+                'date': dates[day],
+                'amount_mm': amount,
+                'urgency': urgency_names[level]
+            })
+        
+        total_mm = np.round(plan.sum(axis=0), 1).tolist()
+        deferred_days = deferred.sum(axis=0).tolist()
+        final_moisture = np.round(final_moisture, 3).tolist()
+        min_stress = np.round(min_stress, 2).tolist()
+        
+        field_plans = []
+        for i, field_id in enumerate(field_ids):
+            field_plans.append({
+                'field_id': field_id,
+                'irrigation_events': events[i],
+                'total_irrigation_mm': total_mm[i],
+                'deferred_days': deferred_days[i],
+                'min_water_stress_level': min_stress[i],
+                'final_soil_moisture': final_moisture[i]
+            })
+        
+        daily_volume = plan @ (area * 10.0)
+        daily_totals = []
+        for day, volume, irrigated, waiting in zip(range(len(dates)), np.round(daily_volume, 1).tolist(),
+                                                   (plan > 0).sum(axis=1).tolist(), deferred.sum(axis=1).tolist()):
+            daily_totals.append({
+                'day': day,
+                'date': dates[day],
+                'irrigation_volume_m3': volume,
+                'fields_irrigated': irrigated,
+                'fields_deferred': waiting,
+                'pump_utilization': round(volume / pump_capacity, 3) if pump_capacity else None
+            })
+        
+        return {
+            'fields': field_plans,
+            'daily_totals': daily_totals,
+            'schedule_info': {
+                'fields': len(field_ids),
+                'days': len(dates),
+                'pump_capacity_m3': pump_capacity,
+                'total_volume_m3': round(float(daily_volume.sum()), 1),
+                'method': 'daily_water_balance'
+            }
+        }
+    
+    def sweep_scenarios(self, target: str, base: Dict[str, Any], perturbations: Dict[str, Dict[str, List[float]]],
+                        crop_type: str = 'corn', output: str = 'tensor') -> Dict[str, Any]:
+        """
+        Evaluate the full grid of what-if perturbations around one base input
+        
+        Every perturbation is one axis of the grid: {'scale': [...]} multiplies
+        the base value, {'offset': [...]} adds to it and {'values': [...]}
+        replaces it. 'irrigation_mm' {'values': [...]} adds water, to season
+        rainfall for a yield sweep and to soil moisture (up to field capacity)
+        for an irrigation sweep, after the other axes are applied. The whole
+        Cartesian product is scored in vectorized blocks of SWEEP_BLOCK_ROWS
+        scenarios.
+        
+        Args:
+            target: 'yield' to sweep predict_yield features, or 'irrigation' to
+                sweep optimize_irrigation inputs (soil_moisture, field_capacity,
+                wilting_point and the forecast's precipitation, temperature and
+                humidity, which apply to every forecast day)
+            base: predict_yield features or optimize_irrigation field_data
+            perturbations: Axis name -> perturbation, in grid axis order
+            crop_type: Crop of a yield sweep
+            output: 'tensor' for grid shaped outputs, or 'columnar' for the
+                columnar layout (outputs as columns, the rest in batch_info)
+                
+        Returns:
+            Dictionary containing the axes (mode, levels and resulting input
+            values), one output array per result field shaped like the grid,
+            per-axis sensitivity curves and sweep_info
+        """
+        try:
+            if target not in ('yield', 'irrigation'):
+                raise ValidationError.for_field('target', f"Unknown sweep target: {target}")
+            if output not in ('tensor', 'columnar'):
+                raise ValidationError.for_field('output', f"Unknown output format: {output}")
+            
+            if target == 'yield':
+                state = self._yield_sweep_state(base)
+                evaluate = lambda columns, n: self._sweep_yield_block(columns, n, crop_type)
+                primary = 'predicted_yield'
+            else:
+                state = self._irrigation_sweep_state(base)
+                evaluate = lambda columns, n: self._sweep_irrigation_block(columns, n, state['base_requirement'])
+                primary = 'recommended_amount'
+            
+            axes = self._sweep_axes(target, state, perturbations)
+            shape = tuple(len(axis['levels']) for axis in axes)
+            n_scenarios = int(np.prod(shape))
+            if n_scenarios > SWEEP_MAX_SCENARIOS:
+                raise ValidationError([{'field': 'perturbations',
+                                        'message': f"span {n_scenarios} scenarios, at most "
+                                                   f"{SWEEP_MAX_SCENARIOS} are allowed"}])
+            
+            # Irrigation adds water after every other axis has been applied
+            order = sorted(range(len(axes)), key=lambda a: axes[a]['name'] == 'irrigation_mm')
+            outputs = {}
+            for start in range(0, n_scenarios, SWEEP_BLOCK_ROWS):
+                stop = min(start + SWEEP_BLOCK_ROWS, n_scenarios)
+                level_index = np.unravel_index(np.arange(start, stop), shape)
+                
+                columns = {name: np.full(stop - start, value) for name, value in state['columns'].items()}
+                for a in order:
+                    axis = axes[a]
+                    levels = axis['_levels'][level_index[a]]
+                    column = columns[axis['input']]
+                    if axis['name'] == 'irrigation_mm':
+                        if target == 'irrigation':
+                            np.minimum(column + levels / self.ROOT_ZONE_DEPTH_MM, columns['field_capacity'],
+                                       out=column)
+                        else:
+                            column += levels
+                    elif axis['mode'] == 'values':
+                        column[:] = levels * axis['_days']
+                    elif axis['mode'] == 'scale':
+                        column *= levels
+                    else:
+                        column += levels * axis['_days']
+                
+                for name, values in evaluate(columns, stop - start).items():
+                    if name not in outputs:
+                        outputs[name] = np.empty(n_scenarios, dtype=values.dtype)
+                    outputs[name][start:stop] = values
+            
+            outputs = {name: values.reshape(shape) for name, values in outputs.items()}
+            sensitivity = self._sweep_sensitivity(axes, outputs[primary])
+            for axis in axes:
+                del axis['_levels'], axis['_days']
+            
+            sweep_info = {
+                'target': target,
+                'scenarios': n_scenarios,
+                'shape': list(shape),
+                'primary_output': primary,
+                'ranking': [curve['axis'] for curve in sorted(sensitivity, key=lambda c: -c['swing'])],
+                'method': 'vectorized_grid'
+            }
+            if target == 'yield':
+                sweep_info['crop_type'] = crop_type
+            else:
+                sweep_info['urgency_levels'] = list(self.URGENCY_LEVELS)
+                sweep_info['timings'] = list(self.IRRIGATION_TIMINGS)
+            
+            if output == 'columnar':
+                return {'columns': outputs, 'batch_info': dict(sweep_info, axes=axes, sensitivity=sensitivity)}
+            
+            return {
+                'axes': axes,
+                'outputs': outputs,
+                'sensitivity': sensitivity,
+                'sweep_info': sweep_info
+            }
+            
+        except ValidationError:
+            raise
+        except Exception as e:
+            raise Exception(f"Scenario sweep failed: {str(e)}")
+    
+    def _yield_sweep_state(self, features: Dict[str, Any]) -> Dict[str, Any]:
+        """Base model-order feature values of a yield sweep, NaN where missing"""
+        model = self.yield_model
+        row = model.features_to_matrix({f: [v] for f, v in features.items()}, n_rows=1)[0]
+        return {
+            'columns': dict(zip(model.feature_names, row.tolist())),
+            'specs': {name: YIELD_FEATURE_SCHEMA.fields.get(name, YIELD_FEATURE_SCHEMA.extra)
+                      for name in model.feature_names},
+            'days': 1
+        }
+    
+    def _irrigation_sweep_state(self, field_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Base inputs of an irrigation sweep, with the defaults of optimize_irrigation"""
+        forecast = field_data.get('weather_forecast', [])[:7]
+        columns = {
+            'soil_moisture': field_data.get('soil_moisture', 0.3),
+            'field_capacity': field_data.get('field_capacity', 0.4),
+            'wilting_point': field_data.get('wilting_point', 0.15),
+            # Forecast perturbations apply to every day, so they act on the
+            # 7-day rainfall total and the mean temperature and humidity
+            'precipitation': sum(day.get('precipitation', 0) for day in forecast),
+            'temperature': float(np.mean([day.get('temperature', 25) for day in forecast])) if forecast else 25,
+            'humidity': float(np.mean([day.get('humidity', 60) for day in forecast])) if forecast else 60
+        }
+        
+        specs = dict(FIELD_DATA_SCHEMA.fields)
+        specs.update(WEATHER_DAY_SCHEMA.fields)
+        specs['precipitation'] = Number(0, 2000 * max(len(forecast), 1))
+        return {
+            'columns': {name: float(value) for name, value in columns.items()},
+            'specs': specs,
+            'days': len(forecast),
+            'base_requirement': self.WATER_REQUIREMENTS.get(field_data.get('crop_stage', 'vegetative'), 0.6)
+        }
+    
+    def _sweep_axes(self, target: str, state: Dict[str, Any],
+                    perturbations: Dict[str, Dict[str, List[float]]]) -> List[Dict[str, Any]]:
+        """Validate the perturbations and describe each grid axis"""
+        if not isinstance(perturbations, dict) or not perturbations:
+            raise ValidationError.for_field('perturbations', "Perturbations are required for a scenario sweep")
+        
+        columns = state['columns']
+        forecast_inputs = ('precipitation', 'temperature', 'humidity')
+        level_spec = Number()
+        axes = []
+        errors = []
+        for name, spec in perturbations.items():
+            field = f"perturbations.{name}"
+            if name == 'irrigation_mm':
+                column = 'weather_rainfall' if target == 'yield' else 'soil_moisture'
+                modes = ('values',)
+            else:
+                column = name
+                modes = ('scale', 'offset', 'values')
+            
+            if column not in columns:
+                errors.append({'field': field, 'message': f"is not a {target} sweep input"})
+                continue
+            if not isinstance(spec, dict) or len(spec) != 1 or next(iter(spec)) not in modes:
+                errors.append({'field': field, 'message': f"must hold one list under {' or '.join(modes)}"})
+                continue
+            
+            mode, levels = next(iter(spec.items()))
+            if not isinstance(levels, list) or not levels:
+                errors.append({'field': f"{field}.{mode}", 'message': 'must be a non-empty list of numbers'})
+                continue
+            level_errors = [{'field': f"{field}.{mode}[{i}]", 'message': message}
+                            for i, message in enumerate(map(level_spec.check, levels)) if message is not None]
+            if level_errors:
+                errors.extend(level_errors)
+                continue
+            
+            if target == 'irrigation' and name in forecast_inputs and not state['days']:
+                errors.append({'field': field, 'message': 'needs a weather_forecast to perturb'})
+                continue
+            
+            base_value = columns[column]
+            levels_array = np.asarray(levels, dtype=np.float64)
+            days = state['days'] if target == 'irrigation' and name == 'precipitation' else 1
+            if name == 'irrigation_mm':
+                if levels_array.min() < 0:
+                    errors.append({'field': f"{field}.{mode}", 'message': 'must not be negative'})
+                    continue
+                if math.isnan(base_value):
+                    errors.append({'field': field, 'message': f"needs a base {column} to add to"})
+                    continue
+                if target == 'irrigation':
+                    effective = np.minimum(base_value + levels_array / self.ROOT_ZONE_DEPTH_MM,
+                                           columns['field_capacity'])
+                else:
+                    effective = base_value + levels_array
+                identity = 0.0
+            elif mode == 'values':
+                effective = levels_array * days
+                identity = base_value / days
+            elif math.isnan(base_value):
+                errors.append({'field': field, 'message': f"needs a base value to {mode}"})
+                continue
+            elif mode == 'scale':
+                effective = base_value * levels_array
+                identity = 1.0
+            else:
+                effective = base_value + levels_array * days
+                identity = 0.0
+            
+            spec_bounds = state['specs'].get(column)
+            if name != 'irrigation_mm' and isinstance(spec_bounds, Number):
+                for i, value in enumerate(effective.tolist()):
+                    if spec_bounds.check(value) is not None:
+                        errors.append({'field': f"{field}.{mode}[{i}]",
+                                       'message': f"takes {column} out of range, it {spec_bounds.message}"})
+            
+            matches = np.flatnonzero(levels_array == identity)
+            base_index = int(matches[0]) if matches.size else None
+            
+            axes.append({
+                'name': name,
+                'mode': mode,
+                'levels': levels,
+                'values': effective,
+                'base_index': base_index,
+                'input': column,
+                '_levels': levels_array,
+                '_days': days
+            })
+        
+        if errors:
+            raise ValidationError(errors)
+        return axes
+    
+    def _sweep_yield_block(self, columns: Dict[str, np.ndarray], n: int, crop_type: str) -> Dict[str, np.ndarray]:
+        X = np.column_stack([columns[name] for name in self.yield_model.feature_names])
+        scores = self._score_yield_matrix(X, [crop_type] * n)
+        return {
+            'predicted_yield': round_array(scores['predicted_yield'], 2),
+            'lower_bound': round_array(scores['lower_bound'], 2),
+            'upper_bound': round_array(scores['upper_bound'], 2),
+            'confidence': round_array(scores['confidence'], 3)
+        }
+    
+    def _sweep_irrigation_block(self, columns: Dict[str, np.ndarray], n: int,
+                                base_requirement: float) -> Dict[str, np.ndarray]:
+        """optimize_irrigation's decision rules, elementwise over scenarios"""
+        soil_moisture = columns['soil_moisture']
+        field_capacity = columns['field_capacity']
+        expected_rainfall = columns['precipitation']
+        
+        available_water = np.maximum(0, soil_moisture - columns['wilting_point'])
+        max_available = field_capacity - columns['wilting_point']
+        water_stress_level = np.where(max_available > 0,
+                                      available_water / np.where(max_available > 0, max_available, 1), 0)
+        
+        adjusted_requirement = base_requirement * self._evapotranspiration_factor(columns['temperature'],
+                                                                                  columns['humidity'])
+        
+        # Urgency codes index URGENCY_LEVELS, timing codes IRRIGATION_TIMINGS
+        urgency = np.select([water_stress_level < 0.3, water_stress_level < 0.5, water_stress_level < 0.7],
+                            [3, 2, 1], 0).astype(np.int8)
+        timing = urgency.copy()
+        amount = np.select([urgency == 3, urgency == 2, urgency == 1],
+                           [(field_capacity - soil_moisture) * 1000, (field_capacity - soil_moisture) * 800,
+                            adjusted_requirement * 600], 0.0)
+        
+        delay = expected_rainfall > amount * 0.8
+        amount = np.where(delay, 0.0, np.where(expected_rainfall > 0, np.maximum(0, amount - expected_rainfall),
+                                               amount))
+        urgency[delay] = 0
+        timing[delay] = 4
+        
+        return {
+            'recommended_amount': round_array(amount, 1),
+            'water_stress_level': round_array(water_stress_level, 2),
+            'urgency_code': urgency,
+            'timing_code': timing
+        }
+    
+    @staticmethod
+    def _sweep_sensitivity(axes: List[Dict[str, Any]], primary: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Per-axis curves of the primary output: mean, min and max over the other
+        axes at each level, and the curve with every other axis at its base
+        (unperturbed) level when each has one
+        """
+        curves = []
+        for a, axis in enumerate(axes):
+            others = tuple(i for i in range(len(axes)) if i != a)
+            mean = primary.mean(axis=others)
+            curve = {
+                'axis': axis['name'],
+                'mean': np.round(mean, 3),
+                'min': primary.min(axis=others),
+                'max': primary.max(axis=others),
+                'swing': round(float(mean.max() - mean.min()), 3),
+                'at_base': None
+            }
+            if all(axes[i]['base_index'] is not None for i in others):
+                index = tuple(slice(None) if i == a else axes[i]['base_index'] for i in range(len(axes)))
+                curve['at_base'] = primary[index]
+            curves.append(curve)
+        return curves
+    
+    @staticmethod
+    def _evapotranspiration_factor(avg_temp, avg_humidity):
+        """Evapotranspiration adjustment for temperature and humidity, elementwise over arrays"""
+        temp_adjustment = np.where(avg_temp > 30, 0.2, np.where(avg_temp < 15, -0.2, 0.0))
+        humidity_adjustment = np.where(avg_humidity > 80, -0.1, np.where(avg_humidity < 40, 0.1, 0.0))
+        return 1.0 + temp_adjustment + humidity_adjustment
+    
+    def _generate_stress_recommendations(self, stress_level: str, trend: str, anomalies: List) -> List[str]:
+        """Generate recommendations based on stress analysis"""
+        recommendations = []
+        
+        if stress_level == 'severe':
+            recommendations.append('Immediate irrigation required to prevent crop damage')
+            recommendations.append('Consider emergency nutrient application')
+            recommendations.append('Investigate potential pest or disease issues')
+        elif stress_level == 'high':
+            recommendations.append('Increase irrigation frequency')
+            recommendations.append('Monitor for pest and disease pressure')
+            recommendations.append('Consider stress-reducing treatments')
+        elif stress_level == 'moderate':
+            recommendations.append('Optimize irrigation timing')
+            recommendations.append('Monitor crop development closely')
+        
+        if trend == 'declining':
+            recommendations.append('Investigate causes of declining vegetation health')
+            recommendations.append('Consider soil testing for nutrient deficiencies')
+        elif trend == 'improving':
+            recommendations.append('Continue current management practices')
+        
+        if len(anomalies) > 2:
+            recommendations.append('High variability detected - investigate field uniformity')
+            recommendations.append('Consider precision management approaches')
+        
+        return recommendations
+
+
+def _scatter_rows(scores: Dict[str, np.ndarray], rows: np.ndarray, n_rows: int) -> Dict[str, np.ndarray]:
+    """Expand scores of a subset of rows to the full batch, NaN (False) for the rows left out"""
+    expanded = {}
+    for name, values in scores.items():
+        fill = False if values.dtype == bool else np.nan
+        full = np.full((n_rows,) + values.shape[1:], fill, dtype=values.dtype)
+        full[rows] = values
+        expanded[name] = full
+    return expanded
+
+
+def round_array(values: np.ndarray, decimals: int) -> np.ndarray:
+    """
+    Round like Python's round() on each element, without a per-element loop
+    
+    np.round scales by 10**decimals and rounds half to even, so a value whose
+    scaled form lands on (or within rounding error of) .5 can round the other
+    way from round(). Only those values are re-rounded with round().
+    """
+    values = np.asarray(values, dtype=np.float64)
+    scaled = values * 10.0 ** decimals
+    rounded = np.round(values, decimals)
+    with np.errstate(invalid='ignore'):
+        near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_half.any():
+        rounded[near_half] = [round(value, decimals) for value in values[near_half].tolist()]
+    return rounded
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded MLInference instances keyed by model version.
+    
+    Instances are built lazily on first use and then shared by every request
+    served from the same (warm) process. Reloading builds the replacement
+    before swapping it in, so in-flight requests keep using the old instance
+    and never observe a half-loaded model.
+    """
+    
+    def __init__(self, loader: Optional[Callable[[str], 'MLInference']] = None,
+                 default_version: str = DEFAULT_MODEL_VERSION):
+        self._loader = loader or (lambda version: MLInference(model_version=version))
+        self._default_version = default_version
+        self._models: Dict[str, MLInference] = {}
+        self._lock = threading.Lock()
+        self._reload_listeners: List[Callable[[Optional[str]], None]] = []
+    
+    def add_reload_listener(self, listener: Callable[[Optional[str]], None]):
+        """Call listener(version) whenever a model is reloaded, invalidated or re-routed"""
+        self._reload_listeners.append(listener)
+    
+    def _notify_reload(self, version: Optional[str]):
+        for listener in self._reload_listeners:
+            listener(version)
+    
+    @property
+    def default_version(self) -> str:
+        return self._default_version
+    
+    def get(self, version: Optional[str] = None) -> 'MLInference':
+        """Return the loaded model for a version, loading it on first use"""
+        version = version or self._default_version
+        
+        # Fast path for warm invocations: a dict lookup without taking the lock
+        model = self._models.get(version)
+        if model is not None:
+            return model
+        
+        with self._lock:
+            model = self._models.get(version)
+            if model is None:
+                model = self._loader(version)
+                self._models[version] = model
+            return model
+    
+    def reload(self, version: Optional[str] = None) -> 'MLInference':
+        """Load a fresh instance of a version and atomically swap it in"""
+        version = version or self._default_version
+        model = self._loader(version)
+        
+        with self._lock:
+            self._models[version] = model
+        self._notify_reload(version)
+        return model
+    
+    def invalidate(self, version: Optional[str] = None):
+        """Drop one cached version, or every version when none is given"""
+        with self._lock:
+            if version is None:
+                self._models.clear()
+            else:
+                self._models.pop(version, None)
+        self._notify_reload(version)
+    
+    def set_default_version(self, version: str, preload: bool = True):
+        """Route unversioned lookups to another model version"""
+        if preload:
+            self.get(version)
+        with self._lock:
+            self._default_version = version
+        self._notify_reload(version)
+    
+    def loaded_versions(self) -> List[str]:
+        """Versions currently held in memory"""
+        with self._lock:
+            return list(self._models.keys())
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache of action results with a time-to-live
+    
+    Keys are a SHA-256 of the canonical JSON of the request plus the model
+    version, so identical requests hit regardless of key order. Cached results
+    are shared between callers and must be treated as read-only.
+    """
+    
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def make_key(request_data: Dict, model_version: str) -> str:
+        canonical = json.dumps([model_version, request_data], sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (found, value), counting the lookup as a hit or miss"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+    
+    def put(self, key: str, value: Any):
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self, *_):
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+def _utc_timestamp() -> str:
+    """Current UTC time to the second, formatted as np.datetime64('now') renders it"""
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime())
+
+
+def _json_default(value):
+    """Encode the NumPy values the stdlib encoder does not understand"""
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind == 'f' and np.isnan(value).any():
+            # NaN marks a missing value in columnar output, which JSON spells null
+            return np.where(np.isnan(value), None, value).tolist()
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class JSONSerializer:
+    """Response encoder built on the stdlib json module"""
+    
+    name = 'json'
+    content_type = 'application/json'
+    
+    def dumps(self, payload: Any) -> bytes:
+        return json.dumps(payload, separators=(',', ':'), default=_json_default).encode()
+
+
+class OrjsonSerializer(JSONSerializer):
+    """
+    Response encoder backed by orjson
+    
+    NumPy scalars and float/int/bool arrays are written straight from their
+    buffers instead of being converted to Python objects first.
+    """
+    
+    name = 'orjson'
+    OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson is not None else 0
+    
+    def dumps(self, payload: Any) -> bytes:
+        return orjson.dumps(payload, default=_json_default, option=self.OPTIONS)
+
+
+def make_json_serializer(encoder: str = JSON_ENCODER) -> JSONSerializer:
+    """
+    Pick the response encoder
+    
+    Args:
+        encoder: 'auto' uses orjson when installed, 'orjson' requires it and
+            'json' forces the stdlib encoder
+    """
+    if encoder == 'json' or (encoder == 'auto' and orjson is None):
+        return JSONSerializer()
+    if encoder in ('auto', 'orjson'):
+        if orjson is None:
+            raise ValueError("ML_JSON_ENCODER=orjson requires the orjson package")
+        return OrjsonSerializer()
+    raise ValueError(f"Unknown JSON encoder: {encoder}")
+
+
+json_serializer = make_json_serializer()
+
+
+def _column_array(values) -> np.ndarray:
+    """Turn a result column into an array the container can store (None becomes '')"""
+    if isinstance(values, np.ndarray):
+        return values
+    array = np.asarray(['' if value is None else value for value in values])
+    return array.astype(str) if array.dtype.hasobject else array
+
+
+def decode_columnar_request(body) -> Dict[str, Any]:
+    """
+    Decode a binary columnar request into request data for run_action
+    
+    Metadata entries become string parameters (``action``, ``crop_type``, ...),
+    arrays named ``features.<name>`` become feature columns and any other array
+    (``ndvi_matrix``, ``dates``, ``field_ids``, ``crop_types``) is passed under
+    its own name. Arrays are read-only views into the body, no copy is made.
+    """
+    metadata, arrays = decode_array_container(body, COLUMNAR_MAGIC)
+    
+    request_data: Dict[str, Any] = dict(metadata)
+    features = {}
+    for name, array in arrays.items():
+        if name.startswith('features.'):
+            features[name[9:]] = array
+        else:
+            request_data[name] = array
+    if features:
+        request_data['features'] = features
+    return request_data
+
+
+def encode_columnar_response(result: Dict[str, Any]) -> bytes:
+    """
+    Encode a columnar batch result as a binary container
+    
+    Every column is stored as an array (nested groups such as anomalies as
+    ``anomalies.<name>``), batch_info travels as JSON metadata.
+    """
+    arrays = {}
+    for name, values in result['columns'].items():
+        if isinstance(values, dict):
+            for child, child_values in values.items():
+                arrays[f"{name}.{child}"] = _column_array(child_values)
+        else:
+            arrays[name] = _column_array(values)
+    
+    metadata = {
+        'success': 'true',
+        'timestamp': _utc_timestamp(),
+        'batch_info': json_serializer.dumps(result['batch_info']).decode()
+    }
+    if result.get('errors'):
+        metadata['errors'] = json_serializer.dumps(result['errors']).decode()
+    return encode_array_container(metadata, arrays, COLUMNAR_MAGIC)
+
+
+def parse_request_body(body, content_type: str = '', accept: str = '') -> Tuple[Dict[str, Any], bool]:
+    """
+    Parse a JSON or binary columnar request body
+    
+    A columnar Content-Type, or a JSON request whose Accept header asks for the
+    columnar format, selects columnar output for the batch action.
+    
+    Returns:
+        Request data for run_action, and whether the response should be columnar
+    """
+    binary = content_type.split(';')[0].strip().lower() == COLUMNAR_CONTENT_TYPE
+    try:
+        request_data = decode_columnar_request(body) if binary else json.loads(body)
+    except ValueError as e:
+        raise ValidationError.for_field('body', f"Malformed request body: {str(e)}")
+    if not isinstance(request_data, dict):
+        raise ValidationError.for_field('body', "The request body must be a JSON object")
+    
+    if not binary and COLUMNAR_CONTENT_TYPE not in accept.lower():
+        return request_data, False
+    
+    action = request_data.get('action', '')
+    if action not in COLUMNAR_ACTIONS:
+        raise ValidationError.for_field('action', f"Action '{action}' is not available in the columnar format")
+    request_data['output'] = 'columnar'
+    return request_data, True
+
+
+class Histogram:
+    """Fixed-bucket histogram in the Prometheus cumulative style"""
+    
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+    
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    Process-wide request metrics rendered in the Prometheus text format
+    
+    Updates take one lock and a bisect, so recording stays cheap on the hot path.
+    """
+    
+    LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+    
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histogram] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._help: Dict[str, Tuple[str, str]] = {}
+    
+    def observe(self, name: str, labels: Tuple[Tuple[str, str], ...], value: float,
+                buckets: Tuple[float, ...] = LATENCY_BUCKETS, help_text: str = ''):
+        key = (name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+                self._help.setdefault(name, ('histogram', help_text))
+            histogram.observe(value)
+    
+    def inc(self, name: str, labels: Tuple[Tuple[str, str], ...], amount: float = 1, help_text: str = ''):
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+            self._help.setdefault(name, ('counter', help_text))
+    
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+    
+    @staticmethod
+    def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: str = '') -> str:
+        parts = [f'{key}="{value}"' for key, value in labels]
+        if extra:
+            parts.append(extra)
+        return '{' + ','.join(parts) + '}' if parts else ''
+    
+    def render_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format"""
+        with self._lock:
+            histograms = sorted((key, (list(h.counts), h.sum, h.count, h.buckets))
+                                for key, h in self._histograms.items())
+            counters = sorted(self._counters.items())
+            help_entries = dict(self._help)
+        
+        lines = []
+        described = set()
+        
+        def describe(name):
+            if name not in described:
+                described.add(name)
+                metric_type, help_text = help_entries.get(name, ('untyped', ''))
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+        
+        for (name, labels), (counts, total, count, buckets) in histograms:
+            describe(name)
+            cumulative = 0
+            for bound, bucket_count in zip(buckets, counts):
+                cumulative += bucket_count
+                bucket_labels = self._format_labels(labels, f'le="{bound}"')
+                lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+            inf_labels = self._format_labels(labels, 'le="+Inf"')
+            lines.append(f"{name}_bucket{inf_labels} {count}")
+            lines.append(f"{name}_sum{self._format_labels(labels)} {total:.6f}")
+            lines.append(f"{name}_count{self._format_labels(labels)} {count}")
+        
+        for (name, labels), value in counters:
+            describe(name)
+            lines.append(f"{name}{self._format_labels(labels)} {value:g}")
+        
+        cache = result_cache
+        if cache is not None:
+            stats = cache.stats()
+            for key in ('hits', 'misses', 'evictions'):
+                lines.append(f"# TYPE ml_inference_result_cache_{key}_total counter")
+                lines.append(f"ml_inference_result_cache_{key}_total {stats[key]}")
+            lines.append("# TYPE ml_inference_result_cache_entries gauge")
+            lines.append(f"ml_inference_result_cache_entries {stats['entries']}")
+        
+        return '\n'.join(lines) + '\n'
+
+
+class StageTimer:
+    """
+    Per-request stage timings feeding the metrics registry and Server-Timing
+    """
+    
+    __slots__ = ('stages', 'request_bytes', 'response_bytes', '_last')
+    
+    enabled = True
+    
+    def __init__(self):
+        self.stages: List[Tuple[str, float]] = []
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self._last = time.perf_counter()
+    
+    def mark(self, stage: str):
+        """Close the current stage under the given name"""
+        now = time.perf_counter()
+        self.stages.append((stage, now - self._last))
+        self._last = now
+    
+    def server_timing(self) -> str:
+        return ', '.join(f"{stage};dur={duration * 1000:.3f}" for stage, duration in self.stages)
+    
+    def record(self, action: str, status: int):
+        action = action if isinstance(action, str) and action in KNOWN_ACTIONS else 'unknown'
+        for stage, duration in self.stages:
+            metrics.observe('ml_inference_stage_seconds', (('action', action), ('stage', stage)), duration,
+                            help_text='Time spent in each request stage')
+        metrics.observe('ml_inference_request_seconds', (('action', action),), sum(d for _, d in self.stages),
+                        help_text='Total request handling time')
+        metrics.observe('ml_inference_request_bytes', (('action', action),), self.request_bytes,
+                        MetricsRegistry.SIZE_BUCKETS, 'Request payload size')
+        metrics.observe('ml_inference_response_bytes', (('action', action),), self.response_bytes,
+                        MetricsRegistry.SIZE_BUCKETS, 'Response payload size')
+        metrics.inc('ml_inference_requests_total', (('action', action), ('status', str(status))),
+                    help_text='Requests handled by action and status')
+
+
+class _NullStageTimer:
+    """Stand-in used while metrics are disabled so the hot path does no timing work"""
+    
+    __slots__ = ()
+    
+    enabled = False
+    request_bytes = 0
+    response_bytes = 0
+    
+    def __setattr__(self, name, value):
+        pass
+    
+    def mark(self, stage: str):
+        pass
+    
+    def server_timing(self) -> str:
+        return ''
+    
+    def record(self, action: str, status: int):
+        pass
+
+
+_NULL_STAGE_TIMER = _NullStageTimer()
+
+metrics = MetricsRegistry()
+
+
+def start_stage_timer():
+    """Begin timing a request, or return a no-op timer when metrics are disabled"""
+    return StageTimer() if metrics.enabled else _NULL_STAGE_TIMER
+
+
+# Shared by Handler and handler() so warm invocations reuse loaded models
+model_registry = ModelRegistry()
+
+
+def warm_up(model_version: Optional[str] = None) -> MLInference:
+    """
+    Load a model version and run its scoring paths once
+    
+    NumPy, the model arrays and the NumPy code paths used by scoring are all
+    imported and initialised here, so the first real request pays none of it.
+    Nothing is written to the result cache or the metrics.
+    """
+    experiment = model_experiment
+    if model_version is None and experiment is not None:
+        for version in (experiment.candidate_version, experiment.shadow_version):
+            if version:
+                warm_up(version)
+    
+    ml_inference = model_registry.get(model_version)
+    feature_names = list(ml_inference.yield_model.feature_names)
+    ml_inference.predict_yield_batch(np.zeros((2, len(feature_names))), 'corn', feature_names)
+    ml_inference.analyze_stress_batch(np.array([[0.5, 0.6, 0.7, 0.6], [0.4, 0.3, 0.35, 0.3]]))
+    return ml_inference
+
+
+# Single-field actions whose results are memoized when the cache is enabled
+CACHEABLE_ACTIONS = frozenset({'predict_yield', 'analyze_stress', 'optimize_irrigation'})
+
+result_cache: Optional[ResultCache] = None
+
+
+def configure_result_cache(max_entries: int, ttl_seconds: float = RESULT_CACHE_TTL) -> Optional[ResultCache]:
+    """Enable (max_entries > 0) or disable the process-wide result cache"""
+    global result_cache
+    result_cache = ResultCache(max_entries, ttl_seconds) if max_entries > 0 else None
+    return result_cache
+
+
+def _clear_result_cache(version: Optional[str]):
+    # Reloaded weights may keep the same version string, so drop everything
+    if result_cache is not None:
+        result_cache.clear()
+
+
+model_registry.add_reload_listener(_clear_result_cache)
+configure_result_cache(RESULT_CACHE_SIZE)
+
+
+class _PendingPrediction:
+    """One caller's predict_yield request waiting in a MicroBatcher"""
+    
+    __slots__ = ('ml_inference', 'features', 'crop_type', 'enqueued', 'done', 'result', 'error', 'cancelled')
+    
+    def __init__(self, ml_inference: MLInference, features: Dict[str, float], crop_type: str):
+        self.ml_inference = ml_inference
+        self.features = features
+        self.crop_type = crop_type
+        self.enqueued = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        # Set when the caller gave up waiting and scored the request itself
+        self.cancelled = False
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent single-field predict_yield calls into vectorized batches
+    
+    Callers block while one collector thread gathers requests for at most
+    window seconds after the oldest one arrived, or until max_batch are
+    waiting, scores them together and hands each caller its own result. The
+    delay a request can see is bounded by the window plus one batch's scoring
+    time. Results are identical to predict_yield; if a batch cannot be
+    scored as a whole, its requests fall back to predict_yield one by one so a
+    bad request only fails itself. A caller whose batch has not been scored
+    SCORE_GRACE seconds after its window closed (the collector died or is
+    stuck), or that was released without a result, scores its own request
+    with predict_yield instead; a timed-out request still queued is then
+    dropped rather than scored.
+    """
+    
+    BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+    SCORE_GRACE = 1.0
+    
+    def __init__(self, window: float, max_batch: int = 64):
+        if window <= 0 or max_batch < 1:
+            raise ValueError("MicroBatcher needs a positive window and max_batch")
+        
+        self.window = window
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+    
+    def predict_yield(self, ml_inference: MLInference, features: Dict[str, float],
+                      crop_type: str = 'corn') -> Dict[str, Any]:
+        """Queue one prediction and wait for its batch to be scored"""
+        pending = _PendingPrediction(ml_inference, features, crop_type)
+        self._ensure_collector()
+        self._queue.put(pending)
+        if not pending.done.wait(self.window + self.SCORE_GRACE) or (pending.result is None
+                                                                      and pending.error is None):
+            # A stuck collector that recovers skips this request instead of scoring it twice
+            pending.cancelled = True
+            if metrics.enabled:
+                metrics.inc('ml_inference_microbatch_timeouts_total', (),
+                            help_text='predict_yield requests scored directly after their micro-batch timed out')
+            return ml_inference.predict_yield(features, crop_type)
+        
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+    
+    def _ensure_collector(self):
+        # Started on first use, so processes forked before that never inherit it,
+        # and restarted if it died
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            with self._lock:
+                if self._thread is thread:
+                    self._thread = threading.Thread(target=self._collect, name='ml-microbatch', daemon=True)
+                    self._thread.start()
+    
+    def _collect(self):
+        while True:
+            batch = [self._queue.get()]
+            # The window runs from the oldest request's arrival, so time spent
+            # queued behind the previous batch counts against it
+            deadline = batch[0].enqueued + self.window
+            
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            batch = [pending for pending in batch if not pending.cancelled]
+            if batch:
+                self._score(batch)
+    
+    def _score(self, batch: List[_PendingPrediction]):
+        try:
+            self._score_groups(batch)
+        except Exception:
+            # The collector keeps running; callers left without a result score their own
+            pass
+        finally:
+            for pending in batch:
+                pending.done.set()
+    
+    def _score_groups(self, batch: List[_PendingPrediction]):
+        started = time.perf_counter()
+        
+        groups: Dict[int, List[_PendingPrediction]] = {}
+        for pending in batch:
+            groups.setdefault(id(pending.ml_inference), []).append(pending)
+        
+        for group in groups.values():
+            ml_inference = group[0].ml_inference
+            try:
+                model = ml_inference.yield_model
+                X = np.full((len(group), len(model.feature_names)), np.nan)
+                for i, pending in enumerate(group):
+                    for name, value in pending.features.items():
+                        j = model.feature_index.get(name)
+                        if j is not None:
+                            X[i, j] = value
+                
+                crop_types = [pending.crop_type for pending in group]
+                rows = ml_inference._render_yield_rows(ml_inference._score_yield_matrix(X, crop_types), crop_types)
+                for pending, row in zip(group, rows):
+                    pending.result = row
+            except Exception:
+                for pending in group:
+                    try:
+                        pending.result = ml_inference.predict_yield(pending.features, pending.crop_type)
+                    except Exception as e:
+                        pending.error = e
+        
+        if metrics.enabled:
+            metrics.observe('ml_inference_microbatch_size', (), len(batch), self.BATCH_SIZE_BUCKETS,
+                            'predict_yield requests scored per micro-batch')
+            for pending in batch:
+                metrics.observe('ml_inference_microbatch_wait_seconds', (), started - pending.enqueued,
+                                help_text='Time a predict_yield request waited for its micro-batch')
+
+
+# Coalesces concurrent predict_yield calls when the micro-batch window is positive
+micro_batcher: Optional[MicroBatcher] = None
+
+
+def configure_micro_batcher(window_ms: float, max_batch: int = MICROBATCH_MAX_SIZE) -> Optional[MicroBatcher]:
+    """Enable (window_ms > 0) or disable micro-batching of predict_yield"""
+    global micro_batcher
+    micro_batcher = MicroBatcher(window_ms / 1000.0, max_batch) if window_ms > 0 else None
+    return micro_batcher
+
+
+configure_micro_batcher(MICROBATCH_WINDOW_MS)
+
+
+class FeatureStore:
+    """
+    SQLite store of daily weather and satellite observations per field
+    
+    Each daily row also holds running totals from the field's first
+    observation (GDD, rainfall, temperature, humidity, NDVI, NDVI squared and
+    EVI, each with its own count of non-null readings). Appending a day extends the totals by one row, and a
+    backfilled day only rewrites the rows after it. Any window aggregate, such
+    as season-to-date GDD or rainfall or a rolling mean, is then the difference
+    of two indexed rows, whatever the season length.
+    """
+    
+    # Base temperature for growing degree days (degrees C)
+    GDD_BASE_TEMP = 10.0
+    
+    WEATHER_COLUMNS = ('temperature', 'temp_min', 'temp_max', 'humidity', 'precipitation', 'gdd')
+    WEATHER_TOTALS = ('cum_gdd', 'cum_rain', 'cum_temp', 'cum_humidity',
+                      'cum_gdd_count', 'cum_rain_count', 'cum_temp_count', 'cum_humidity_count', 'cum_days')
+    SATELLITE_COLUMNS = ('ndvi', 'evi')
+    SATELLITE_TOTALS = ('cum_ndvi', 'cum_ndvi_sq', 'cum_evi', 'cum_ndvi_count', 'cum_evi_count')
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS weather_daily (
+            field_id TEXT NOT NULL, date TEXT NOT NULL,
+            temperature REAL, temp_min REAL, temp_max REAL, humidity REAL, precipitation REAL, gdd REAL,
+            cum_gdd REAL, cum_rain REAL, cum_temp REAL, cum_humidity REAL,
+            cum_gdd_count INTEGER, cum_rain_count INTEGER, cum_temp_count INTEGER, cum_humidity_count INTEGER,
+            cum_days INTEGER,
+            PRIMARY KEY (field_id, date)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS satellite_daily (
+            field_id TEXT NOT NULL, date TEXT NOT NULL,
+            ndvi REAL, evi REAL,
+            cum_ndvi REAL, cum_ndvi_sq REAL, cum_evi REAL, cum_ndvi_count INTEGER, cum_evi_count INTEGER,
+            PRIMARY KEY (field_id, date)
+        ) WITHOUT ROWID;
+    """
+    
+    def __init__(self, path: str = ':memory:'):
+        self.path = path
+        self._lock = threading.RLock()
+        self._connection = None
+        self._pid = None
+    
+    def _connect(self):
+        # Connections are opened per process, so forked workers never share one
+        if self._connection is None or self._pid != os.getpid():
+            import sqlite3
+            
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            if self.path != ':memory:':
+                connection.execute('PRAGMA journal_mode=WAL')
+            connection.executescript(self.SCHEMA)
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+    
+    def close(self):
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+    
+    def ingest(self, field_id: str, weather: Optional[List[Dict[str, Any]]] = None,
+               satellite: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Add or replace daily observations for one field
+        
+        Args:
+            field_id: Field the observations belong to
+            weather: Daily dicts with date (YYYY-MM-DD) and any of temperature,
+                temp_min, temp_max, humidity and precipitation (mm)
+            satellite: Dicts with date and any of ndvi and evi
+            
+        Returns:
+            Dictionary with the number of days written per table. Observations
+            failing validation are skipped and listed under 'errors'.
+        """
+        field_id = str(field_id)
+        errors = []
+        weather_rows = self._valid_rows(field_id, 'weather', weather, STORED_WEATHER_SCHEMA,
+                                        self._weather_row, errors)
+        satellite_rows = self._valid_rows(field_id, 'satellite', satellite, STORED_SATELLITE_SCHEMA,
+                                          self._satellite_row, errors)
+        
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                if weather_rows:
+                    connection.executemany(
+                        'INSERT OR REPLACE INTO weather_daily (field_id, date, temperature, temp_min, temp_max, '
+                        'humidity, precipitation, gdd) VALUES (?, ?, ?, ?, ?, ?, ?, ?)', weather_rows)
+                    self._update_totals(connection, 'weather_daily', field_id, min(row[1] for row in weather_rows))
+                if satellite_rows:
+                    connection.executemany(
+                        'INSERT OR REPLACE INTO satellite_daily (field_id, date, ndvi, evi) VALUES (?, ?, ?, ?)',
+                        satellite_rows)
+                    self._update_totals(connection, 'satellite_daily', field_id,
+                                        min(row[1] for row in satellite_rows))
+        
+        return {
+            'field_id': field_id,
+            'weather_days': len(weather_rows),
+            'satellite_days': len(satellite_rows),
+            'rejected': len(weather or []) + len(satellite or []) - len(weather_rows) - len(satellite_rows),
+            'errors': errors
+        }
+    
+    @staticmethod
+    def _valid_rows(field_id: str, name: str, observations, schema: Schema, make_row: Callable,
+                    errors: List[Dict[str, Any]]) -> List[Tuple]:
+        """Table rows for the observations passing schema, the others' problems go to errors"""
+        if observations is None:
+            return []
+        if not isinstance(observations, list):
+            raise ValidationError.for_field(name, f"{name} must be a list of observations")
+        
+        rows = []
+        for i, obs in enumerate(observations):
+            obs_errors = schema.errors(obs, f"{name}[{i}].")
+            if obs_errors:
+                errors.extend(obs_errors)
+            else:
+                rows.append(make_row(field_id, obs))
+        return rows
+    
+    @staticmethod
+    def _parse_date(value) -> str:
+        return date.fromisoformat(str(value)[:10]).isoformat()
+    
+    @staticmethod
+    def _optional_float(obs: Dict[str, Any], key: str) -> Optional[float]:
+        value = obs.get(key)
+        return None if value is None else float(value)
+    
+    def _weather_row(self, field_id: str, obs: Dict[str, Any]) -> Tuple:
+        temperature, temp_min, temp_max = (self._optional_float(obs, key)
+                                           for key in ('temperature', 'temp_min', 'temp_max'))
+        if temp_min is not None and temp_max is not None:
+            mean_temp = (temp_min + temp_max) / 2
+            temperature = mean_temp if temperature is None else temperature
+        else:
+            mean_temp = temperature
+        gdd = None if mean_temp is None else max(0.0, mean_temp - self.GDD_BASE_TEMP)
+        
+        return (field_id, self._parse_date(obs['date']), temperature, temp_min, temp_max,
+                self._optional_float(obs, 'humidity'), self._optional_float(obs, 'precipitation'), gdd)
+    
+    def _satellite_row(self, field_id: str, obs: Dict[str, Any]) -> Tuple:
+        return (field_id, self._parse_date(obs['date']),
+                self._optional_float(obs, 'ndvi'), self._optional_float(obs, 'evi'))
+    
+    def _update_totals(self, connection, table: str, field_id: str, since: str):
+        """Recompute running totals for a field from the earliest changed date onwards"""
+        weather = table == 'weather_daily'
+        values = self.WEATHER_COLUMNS if weather else self.SATELLITE_COLUMNS
+        totals_columns = self.WEATHER_TOTALS if weather else self.SATELLITE_TOTALS
+        
+        previous = connection.execute(
+            f"SELECT {', '.join(totals_columns)} FROM {table} WHERE field_id = ? AND date < ? "
+            f"ORDER BY date DESC LIMIT 1", (field_id, since)).fetchone()
+        totals = list(previous) if previous else [0.0] * len(totals_columns)
+        
+        updates = []
+        for row in connection.execute(
+                f"SELECT date, {', '.join(values)} FROM {table} WHERE field_id = ? AND date >= ? ORDER BY date",
+                (field_id, since)):
+            obs = dict(zip(values, row[1:]))
+            if weather:
+                # Missing readings are skipped so each mean divides by its own count
+                for i, column in enumerate(('gdd', 'precipitation', 'temperature', 'humidity')):
+                    if obs[column] is not None:
+                        totals[i] += obs[column]
+                        totals[i + 4] += 1
+                totals[8] += 1
+            else:
+                if obs['ndvi'] is not None:
+                    totals[0] += obs['ndvi']
+                    totals[1] += obs['ndvi'] * obs['ndvi']
+                    totals[3] += 1
+                if obs['evi'] is not None:
+                    totals[2] += obs['evi']
+                    totals[4] += 1
+            updates.append((*totals, field_id, row[0]))
+        
+        assignments = ', '.join(f"{column} = ?" for column in totals_columns)
+        connection.executemany(f"UPDATE {table} SET {assignments} WHERE field_id = ? AND date = ?", updates)
+    
+    def _window_totals(self, table: str, field_id: str, start: str, end: str) -> Dict[str, float]:
+        """Totals over [start, end] as the difference of two running-total rows"""
+        totals_columns = self.WEATHER_TOTALS if table == 'weather_daily' else self.SATELLITE_TOTALS
+        query = (f"SELECT {', '.join(totals_columns)} FROM {table} WHERE field_id = ? AND date {{}} ? "
+                 f"ORDER BY date DESC LIMIT 1")
+        
+        with self._lock:
+            connection = self._connect()
+            upper = connection.execute(query.format('<='), (field_id, end)).fetchone()
+            lower = connection.execute(query.format('<'), (field_id, start)).fetchone()
+        
+        upper = upper or (0.0,) * len(totals_columns)
+        lower = lower or (0.0,) * len(totals_columns)
+        return {column: hi - lo for column, hi, lo in zip(totals_columns, upper, lower)}
+    
+    def _season_bounds(self, as_of, season_start=None) -> Tuple[str, str]:
+        end = self._parse_date(as_of) if as_of else date.today().isoformat()
+        start = self._parse_date(season_start) if season_start else end[:4] + '-01-01'
+        return start, end
+    
+    def season_summary(self, field_id: str, as_of=None, season_start=None) -> Dict[str, Any]:
+        """
+        Season-to-date weather and satellite aggregates for one field
+        
+        Args:
+            field_id: Field to summarize
+            as_of: Last day included (YYYY-MM-DD), today when omitted
+            season_start: First day included, 1 January of as_of's year by default
+        """
+        start, end = self._season_bounds(as_of, season_start)
+        weather = self._window_totals('weather_daily', str(field_id), start, end)
+        satellite = self._window_totals('satellite_daily', str(field_id), start, end)
+        
+        days = weather['cum_days']
+        temp_count = weather['cum_temp_count']
+        humidity_count = weather['cum_humidity_count']
+        ndvi_count = satellite['cum_ndvi_count']
+        ndvi_mean = satellite['cum_ndvi'] / ndvi_count if ndvi_count else None
+        ndvi_variance = satellite['cum_ndvi_sq'] / ndvi_count - ndvi_mean ** 2 if ndvi_count else None
+        
+        return {
+            'field_id': str(field_id),
+            'season_start': start,
+            'as_of': end,
+            'weather_days': int(days),
+            'gdd': weather['cum_gdd'] if weather['cum_gdd_count'] else None,
+            'rainfall_mm': weather['cum_rain'] if weather['cum_rain_count'] else None,
+            'mean_temperature': weather['cum_temp'] / temp_count if temp_count else None,
+            'mean_humidity': weather['cum_humidity'] / humidity_count if humidity_count else None,
+            'ndvi_observations': int(ndvi_count),
+            'ndvi_mean': ndvi_mean,
+            'ndvi_std': max(0.0, ndvi_variance) ** 0.5 if ndvi_count else None,
+            'evi_mean': satellite['cum_evi'] / satellite['cum_evi_count'] if satellite['cum_evi_count'] else None
+        }
+    
+    def yield_features(self, field_id: str, as_of=None, season_start=None) -> Dict[str, float]:
+        """Season-to-date predict_yield features; features without observations are left out"""
+        summary = self.season_summary(field_id, as_of, season_start)
+        features = {
+            'weather_temp': summary['mean_temperature'],
+            'weather_rainfall': summary['rainfall_mm'],
+            'weather_humidity': summary['mean_humidity'],
+            'weather_gdd': summary['gdd'],
+            'satellite_ndvi': summary['ndvi_mean'],
+            'satellite_evi': summary['evi_mean']
+        }
+        return {name: value for name, value in features.items() if value is not None}
+    
+    def ndvi_series(self, field_id: str, as_of=None, season_start=None) -> List[Dict[str, Any]]:
+        """Season-to-date NDVI observations in analyze_stress_patterns form"""
+        start, end = self._season_bounds(as_of, season_start)
+        with self._lock:
+            rows = self._connect().execute(
+                'SELECT date, ndvi FROM satellite_daily WHERE field_id = ? AND date BETWEEN ? AND ? '
+                'AND ndvi IS NOT NULL ORDER BY date', (str(field_id), start, end)).fetchall()
+        return [{'date': day, 'ndvi': ndvi} for day, ndvi in rows]
+    
+    def weather_forecast(self, field_id: str, start=None, days: int = 7) -> List[Dict[str, Any]]:
+        """Stored daily weather from start onwards in optimize_irrigation form"""
+        first = self._parse_date(start) if start else date.today().isoformat()
+        last = (date.fromisoformat(first) + timedelta(days=days - 1)).isoformat()
+        with self._lock:
+            rows = self._connect().execute(
+                'SELECT date, temperature, humidity, precipitation FROM weather_daily '
+                'WHERE field_id = ? AND date BETWEEN ? AND ? ORDER BY date', (str(field_id), first, last)).fetchall()
+        
+        forecast = []
+        for day, temperature, humidity, precipitation in rows:
+            entry = {'date': day}
+            for key, value in (('temperature', temperature), ('humidity', humidity),
+                               ('precipitation', precipitation)):
+                if value is not None:
+                    entry[key] = value
+            forecast.append(entry)
+        return forecast
+    
+    def resolve_request(self, request_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Fill in stored inputs for a request that names a field_id
+        
+        predict_yield gets season-to-date features (explicit features win),
+        analyze_stress gets the season's NDVI series and optimize_irrigation the
+        stored weather from the request date onwards, each only when the request
+        does not carry that data itself; a scenario_sweep's base input resolves
+        like the action it perturbs. date and season_start default to today and
+        1 January.
+        """
+        action = request_data.get('action')
+        if action == 'scenario_sweep':
+            # A sweep's base input resolves like the single action it perturbs
+            action = 'optimize_irrigation' if request_data.get('target') == 'irrigation' else 'predict_yield'
+        field_data = request_data.get('field_data')
+        field_id = request_data.get('field_id')
+        if field_id is None and isinstance(field_data, dict):
+            field_id = field_data.get('field_id')
+        if field_id is None:
+            return request_data
+        
+        as_of = request_data.get('date')
+        season_start = request_data.get('season_start')
+        resolved = dict(request_data)
+        
+        if action == 'predict_yield':
+            features = self.yield_features(field_id, as_of, season_start)
+            features.update(request_data.get('features') or {})
+            resolved['features'] = features
+        elif action == 'analyze_stress' and not request_data.get('satellite_data'):
+            resolved['satellite_data'] = self.ndvi_series(field_id, as_of, season_start)
+        elif action == 'optimize_irrigation' and not (field_data or {}).get('weather_forecast'):
+            resolved['field_data'] = dict(field_data or {},
+                                          weather_forecast=self.weather_forecast(field_id, as_of))
+        return resolved
+
+
+# Local store of field observations, enabled by ML_FEATURE_STORE or 'serve --feature-store'
+feature_store: Optional[FeatureStore] = None
+
+
+def configure_feature_store(path: Optional[str]) -> Optional[FeatureStore]:
+    """Open the feature store at path (':memory:' for a process-local one), or disable it"""
+    global feature_store
+    if feature_store is not None:
+        feature_store.close()
+    feature_store = FeatureStore(path) if path else None
+    return feature_store
+
+
+configure_feature_store(FEATURE_STORE_PATH)
+
+
+class ModelExperiment:
+    """
+    A/B routing and shadow scoring of yield traffic across model versions
+    
+    A stable fraction of predict_yield and predict_yield_batch requests is
+    served by the candidate version instead of the control (the registry
+    default). Requests with a field_id always land in the same arm, others are
+    assigned at random. Each served predict_yield can also be scored by a
+    shadow version: the request only pays for a non-blocking put on a bounded
+    queue, and one background thread scores queued requests in vectorized
+    batches and appends the paired predictions to a fixed-width binary log
+    (see read_shadow_log). When the queue is full, shadow requests are dropped
+    and counted rather than slowing down the primary path, and batches that
+    fail to score are counted in shadow_failures.
+    """
+    
+    # Per request: time, request key, primary arm (0 control, 1 candidate),
+    # then the primary and the shadow predicted yield, lower and upper bound
+    RECORD = struct.Struct('<dQB3x6f')
+    RECORD_DTYPE = [('timestamp', '<f8'), ('request_key', '<u8'), ('arm', 'u1'), ('_pad', 'V3'),
+                    ('primary_yield', '<f4'), ('primary_lower', '<f4'), ('primary_upper', '<f4'),
+                    ('shadow_yield', '<f4'), ('shadow_lower', '<f4'), ('shadow_upper', '<f4')]
+    ARMS = ('control', 'candidate')
+    ROUTED_ACTIONS = frozenset({'predict_yield', 'predict_yield_batch'})
+    # Shadow requests are collected for up to this long so scoring runs on
+    # large vectorized batches instead of competing with requests row by row
+    SHADOW_BATCH_WINDOW = 0.2
+    MAX_SHADOW_BATCH = 2048
+    
+    def __init__(self, control_version: str, candidate_version: Optional[str] = None,
+                 traffic_fraction: float = 0.0, shadow_version: Optional[str] = None,
+                 shadow_log: Optional[str] = None, shadow_fraction: float = 1.0,
+                 queue_size: int = SHADOW_QUEUE_SIZE):
+        if not 0.0 <= traffic_fraction <= 1.0 or not 0.0 <= shadow_fraction <= 1.0:
+            raise ValueError("Experiment traffic and shadow fractions must be between 0 and 1")
+        if shadow_version and not shadow_log:
+            raise ValueError("A shadow version needs a shadow log path")
+        
+        self.control_version = control_version
+        self.candidate_version = candidate_version or None
+        self.traffic_fraction = traffic_fraction if self.candidate_version else 0.0
+        self.shadow_version = shadow_version or None
+        self.shadow_log = shadow_log
+        self.shadow_fraction = shadow_fraction
+        
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._log_file = None
+        self._log_pid = None
+        self.shadow_failures = 0
+        self.last_shadow_error: Optional[str] = None
+        self._header = {
+            'control_version': control_version,
+            'candidate_version': self.candidate_version,
+            'shadow_version': self.shadow_version,
+            'record_size': self.RECORD.size
+        }
+        
+        if self.shadow_version:
+            self._check_log_header()
+    
+    def _salted_fraction(self, key: str) -> float:
+        digest = hashlib.blake2b(f"{self.candidate_version}:{key}".encode(), digest_size=8).digest()
+        return struct.unpack('<Q', digest)[0] / 2.0 ** 64
+    
+    def route(self, request_data: Dict, ml_inference: MLInference) -> Tuple[MLInference, int]:
+        """Pick the model serving a request and the arm it belongs to"""
+        if not self.traffic_fraction:
+            return ml_inference, 0
+        
+        field_id = request_data.get('field_id')
+        draw = self._salted_fraction(str(field_id)) if field_id is not None else random.random()
+        if draw < self.traffic_fraction:
+            return model_registry.get(self.candidate_version), 1
+        return ml_inference, 0
+    
+    def shadow(self, request_data: Dict, arm: int):
+        """Queue a served predict_yield for shadow scoring without waiting on it"""
+        if self.shadow_fraction < 1.0 and random.random() >= self.shadow_fraction:
+            return
+        
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((time.time(), request_data.get('features', {}),
+                                    request_data.get('crop_type', 'corn'), arm))
+        except queue.Full:
+            if metrics.enabled:
+                metrics.inc('ml_inference_shadow_dropped_total', (),
+                            help_text='Shadow scoring requests dropped because the queue was full')
+    
+    def _ensure_worker(self):
+        # Started on first use, so processes forked before that never inherit it
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run_shadow, name='ml-shadow', daemon=True)
+                    self._thread.start()
+    
+    def _run_shadow(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.SHADOW_BATCH_WINDOW
+            while len(batch) < self.MAX_SHADOW_BATCH:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            try:
+                self._score_shadow(batch)
+            except Exception as e:
+                # The worker keeps running; failures only show up in the counters
+                self.shadow_failures += len(batch)
+                self.last_shadow_error = str(e)
+                if metrics.enabled:
+                    metrics.inc('ml_inference_shadow_failures_total', (), len(batch),
+                                help_text='Shadow scoring requests that failed and were not logged')
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    @staticmethod
+    def _score_version(version: str, batch: List[Tuple]) -> np.ndarray:
+        """Unrounded predicted yield, lower and upper bound of a version, one row per request"""
+        ml_inference = model_registry.get(version)
+        model = ml_inference.yield_model
+        
+        X = np.full((len(batch), len(model.feature_names)), np.nan)
+        for i, (_, features, _, _) in enumerate(batch):
+            for name, value in features.items():
+                j = model.feature_index.get(name)
+                if j is not None:
+                    X[i, j] = value
+        scores = ml_inference._score_yield_matrix(X, [crop_type for _, _, crop_type, _ in batch])
+        return np.column_stack([scores['predicted_yield'], scores['lower_bound'], scores['upper_bound']])
+    
+    def _score_shadow(self, batch: List[Tuple]):
+        shadow = self._score_version(self.shadow_version, batch).tolist()
+        
+        # The primary side is rescored here too: served results are rounded for
+        # display, and comparing them with raw shadow scores would show a
+        # difference even between identical models
+        arms = np.array([arm for _, _, _, arm in batch])
+        primary = np.empty((len(batch), 3))
+        for arm, version in enumerate((self.control_version, self.candidate_version)):
+            rows = np.flatnonzero(arms == arm)
+            if len(rows):
+                primary[rows] = self._score_version(version, [batch[i] for i in rows.tolist()])
+        primary = primary.tolist()
+        
+        records = []
+        for i, (timestamp, features, crop_type, arm) in enumerate(batch):
+            canonical = json.dumps([crop_type, features], sort_keys=True, separators=(',', ':'), default=str)
+            request_key = struct.unpack('<Q', hashlib.blake2b(canonical.encode(), digest_size=8).digest())[0]
+            records.append(self.RECORD.pack(timestamp, request_key, arm, *primary[i], *shadow[i]))
+        
+        # One append per batch keeps records whole when several processes share the log
+        log_file = self._open_log()
+        log_file.write(b''.join(records))
+        log_file.flush()
+        
+        if metrics.enabled:
+            metrics.inc('ml_inference_shadow_scored_total', (), len(batch),
+                        help_text='Requests scored by the shadow model and logged')
+    
+    def _encoded_header(self) -> bytes:
+        header = json.dumps(self._header, sort_keys=True).encode()
+        return SHADOW_LOG_MAGIC + struct.pack('<I', len(header)) + header
+    
+    def _check_log_header(self):
+        """Refuse to append to a log written for a different experiment"""
+        if not os.path.exists(self.shadow_log) or os.path.getsize(self.shadow_log) == 0:
+            return
+        header, _ = read_shadow_log(self.shadow_log, records=False)
+        if header != self._header:
+            raise ValueError(f"Shadow log {self.shadow_log} belongs to a different experiment: {header}")
+    
+    def _open_log(self):
+        if self._log_file is None or self._log_pid != os.getpid():
+            log_file = open(self.shadow_log, 'ab')
+            if log_file.tell() == 0:
+                log_file.write(self._encoded_header())
+            self._log_file = log_file
+            self._log_pid = os.getpid()
+        return self._log_file
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until queued shadow requests are logged, True when the queue drained"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+
+def read_shadow_log(path: str, records: bool = True) -> Tuple[Dict[str, Any], Optional[np.ndarray]]:
+    """
+    Read a shadow log written by ModelExperiment
+    
+    Args:
+        path: Log file path
+        records: Also load the records, otherwise only the header is read
+        
+    Returns:
+        The experiment header and the records as a NumPy structured array
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(SHADOW_LOG_MAGIC)) != SHADOW_LOG_MAGIC:
+            raise ValueError(f"{path} is not a shadow log")
+        header_length = struct.unpack('<I', f.read(4))[0]
+        header = json.loads(f.read(header_length))
+        if not records:
+            return header, None
+        
+        data = f.read()
+    
+    record_size = ModelExperiment.RECORD.size
+    # A record cut short by a crash mid-write is ignored
+    usable = len(data) - len(data) % record_size
+    return header, np.frombuffer(data[:usable], dtype=np.dtype(ModelExperiment.RECORD_DTYPE))
+
+
+def summarize_shadow_log(path: str) -> Dict[str, Any]:
+    """Compare primary and shadow predictions per arm for offline evaluation"""
+    header, records = read_shadow_log(path)
+    
+    arms = {}
+    for arm, name in enumerate(ModelExperiment.ARMS):
+        rows = records[records['arm'] == arm]
+        if len(rows) == 0:
+            continue
+        primary = rows['primary_yield'].astype(np.float64)
+        shadow = rows['shadow_yield'].astype(np.float64)
+        difference = shadow - primary
+        within = (shadow >= rows['primary_lower']) & (shadow <= rows['primary_upper'])
+        
+        arms[name] = {
+            'model_version': header['control_version'] if arm == 0 else header['candidate_version'],
+            'requests': int(len(rows)),
+            'mean_primary_yield': float(primary.mean()),
+            'mean_shadow_yield': float(shadow.mean()),
+            'mean_difference': float(difference.mean()),
+            'mean_absolute_difference': float(np.abs(difference).mean()),
+            'max_absolute_difference': float(np.abs(difference).max()),
+            'correlation': float(np.corrcoef(primary, shadow)[0, 1]) if len(rows) > 1 else None,
+            'shadow_within_primary_interval': float(within.mean())
+        }
+    
+    return {'experiment': header, 'arms': arms}
+
+
+# A/B and shadow experiment on yield traffic, enabled by ML_AB_CANDIDATE / ML_SHADOW_VERSION
+model_experiment: Optional[ModelExperiment] = None
+
+
+def configure_model_experiment(candidate_version: Optional[str] = None, traffic_fraction: float = 0.0,
+                               shadow_version: Optional[str] = None,
+                               shadow_log: Optional[str] = SHADOW_LOG_PATH,
+                               shadow_fraction: float = 1.0) -> Optional[ModelExperiment]:
+    """Start an experiment against the registry's default version, or stop it when neither version is set"""
+    global model_experiment
+    if not candidate_version and not shadow_version:
+        model_experiment = None
+    else:
+        # Fail at startup rather than on the first routed request
+        for version in (candidate_version, shadow_version):
+            if version:
+                MLInference._resolve_model_path(version)
+        model_experiment = ModelExperiment(model_registry.default_version, candidate_version, traffic_fraction,
+                                           shadow_version, shadow_log, shadow_fraction)
+    return model_experiment
+
+
+configure_model_experiment(AB_CANDIDATE_VERSION, AB_TRAFFIC_FRACTION, SHADOW_MODEL_VERSION, SHADOW_LOG_PATH,
+                           SHADOW_SAMPLE_FRACTION)
+
+
+# Every action run_action understands, used to bound metric label values
+KNOWN_ACTIONS = frozenset({
+    'predict_yield', 'predict_yield_batch', 'analyze_stress', 'analyze_stress_batch',
+    'analyze_stress_raster', 'analyze_stress_incremental', 'analyze_stress_stream', 'optimize_irrigation',
+    'optimize_irrigation_batch', 'schedule_irrigation', 'scenario_sweep', 'ingest_observations', 'metrics'
+})
+
+# Batch actions that can be exchanged in the binary columnar format
+COLUMNAR_ACTIONS = frozenset({
+    'predict_yield_batch', 'analyze_stress_batch', 'analyze_stress_raster', 'scenario_sweep'
+})
+
+# Actions worth offloading to a worker process when serving with a batch pool
+BATCH_ACTIONS = frozenset({
+    'predict_yield_batch', 'analyze_stress_batch', 'analyze_stress_raster', 'optimize_irrigation_batch',
+    'schedule_irrigation', 'scenario_sweep'
+})
+
+
+def check_request(request_data: Dict) -> Dict:
+    """
+    Resolve stored inputs and run the model-free checks of a request
+    
+    Unknown actions, missing inputs and payloads failing their schema raise
+    ValidationError here, before NumPy is imported or a model is loaded.
+    
+    Returns:
+        The request to pass to run_action with checked=True
+    """
+    action = request_data.get('action', '')
+    
+    # Requests naming a field pick up stored inputs before caching, so a cached
+    # result never outlives newly ingested observations
+    store = feature_store
+    if store is not None and (action in CACHEABLE_ACTIONS or action == 'scenario_sweep'):
+        request_data = store.resolve_request(request_data)
+    
+    if action == 'predict_yield':
+        if not request_data.get('features'):
+            raise ValidationError.for_field('features', "Features are required for yield prediction")
+        YIELD_REQUEST_SCHEMA.validate(request_data)
+        
+    elif action == 'predict_yield_batch':
+        features = request_data.get('features', {})
+        
+        if features is None or (isinstance(features, (dict, list)) and len(features) == 0):
+            raise ValidationError.for_field('features', "Features are required for batch yield prediction")
+        columns = batch_feature_columns(features)
+        if columns is not features:
+            request_data = dict(request_data, features=columns)
+            
+    elif action in ('analyze_stress', 'analyze_stress_incremental'):
+        if not request_data.get('satellite_data'):
+            kind = 'incremental stress analysis' if action == 'analyze_stress_incremental' else 'stress analysis'
+            raise ValidationError.for_field('satellite_data', f"Satellite data is required for {kind}")
+        STRESS_REQUEST_SCHEMA.validate(request_data)
+        if action == 'analyze_stress':
+            # Null and NaN readings are missing, as analyze_stress_patterns counts them
+            observed = sum(1 for obs in request_data['satellite_data']
+                           if 'date' in obs and isinstance(obs.get('ndvi'), numbers.Real) and math.isfinite(obs['ndvi']))
+            if observed < 3:
+                raise ValidationError.for_field('satellite_data',
+                                                "At least 3 observations required for stress analysis", status=422)
+        state = request_data.get('state')
+        if action == 'analyze_stress_incremental' and state is not None:
+            # The state is echoed back from an earlier response, so a bad one is a malformed request
+            STRESS_STATE_SCHEMA.validate(state, 'state', status=400)
+            
+    elif action == 'analyze_stress_batch':
+        ndvi_matrix = request_data.get('ndvi_matrix', [])
+        
+        if ndvi_matrix is None or len(ndvi_matrix) == 0:
+            raise ValidationError.for_field('ndvi_matrix', "NDVI matrix is required for batch stress analysis")
+            
+    elif action == 'ingest_observations':
+        if store is None:
+            raise ValidationError.for_field('action', "The feature store is disabled, set ML_FEATURE_STORE to enable it",
+                                            status=503)
+        if request_data.get('field_id') is None:
+            raise ValidationError.for_field('field_id', "field_id is required to ingest observations")
+            
+    elif action == 'analyze_stress_raster':
+        ndvi_stack = request_data.get('ndvi_stack', [])
+        
+        if ndvi_stack is None or len(ndvi_stack) == 0:
+            raise ValidationError.for_field('ndvi_stack', "NDVI stack is required for raster stress analysis")
+            
+    elif action == 'optimize_irrigation':
+        if not request_data.get('field_data'):
+            raise ValidationError.for_field('field_data', "Field data is required for irrigation optimization")
+        IRRIGATION_REQUEST_SCHEMA.validate(request_data)
+        
+    elif action == 'scenario_sweep':
+        if not request_data.get('perturbations'):
+            raise ValidationError.for_field('perturbations', "Perturbations are required for a scenario sweep")
+        if request_data.get('target', 'yield') == 'irrigation':
+            IRRIGATION_REQUEST_SCHEMA.validate(request_data)
+        else:
+            YIELD_REQUEST_SCHEMA.validate(request_data)
             
-            return {
-                'irrigation_needed': recommended_amount > 0,
-                'recommended_amount': round(recommended_amount, 1),
-                'urgency': urgency,
-                'timing': timing,
-                'water_stress_level': round(water_stress_level, 2),
-                'current_conditions': {
-                    'soil_moisture': soil_moisture,
-                    'available_water_percent': round(water_stress_level * 100, 1),
-                    'crop_stage': crop_stage
-                },
-                'weather_factors': {
-                    'expected_rainfall_7d': round(expected_rainfall, 1),
-                    'avg_temperature': round(avg_temp, 1),
-                    'avg_humidity': round(avg_humidity, 1),
-                    'evapotranspiration_factor': round(evapotranspiration_factor, 2)
-                },
-                'efficiency_tips': efficiency_tips,
-                'optimization_info': {
-                    'base_requirement': base_requirement,
-                    'adjusted_requirement': round(adjusted_requirement, 2),
-                    'method': 'water_balance_model'
-                }
-            }
+    elif action == 'optimize_irrigation_batch':
+        fields = request_data.get('fields', [])
+        
+        if not isinstance(fields, list) or not fields:
+            raise ValidationError.for_field('fields', "Fields are required for batch irrigation optimization")
             
-        except Exception as e:
-            raise Exception(f"Irrigation optimization failed: {str(e)}")
+    elif action == 'schedule_irrigation':
+        if not request_data.get('fields'):
+            raise ValidationError.for_field('fields', "Fields are required for irrigation scheduling")
+        if not request_data.get('weather_forecast'):
+            raise ValidationError.for_field('weather_forecast',
+                                            "A weather forecast is required for irrigation scheduling")
+        SCHEDULE_REQUEST_SCHEMA.validate(request_data)
+        
+    else:
+        raise ValidationError.for_field('action', f"Unknown action: {action}")
     
-    def _generate_stress_recommendations(self, stress_level: str, trend: str, anomalies: List) -> List[str]:
-        """Generate recommendations based on stress analysis"""
-        recommendations = []
+    return request_data
+
+
+def run_action(request_data: Dict, ml_inference: Optional[MLInference] = None, checked: bool = False) -> Dict:
+    """
+    Validate a JSON request and route it to the matching MLInference method
+    
+    Shared by Handler, handler() and the serving worker pool so every entry
+    point accepts the same actions with the same checks. The model is only
+    fetched once check_request has passed; callers that ran it themselves
+    (to time model loading separately) pass checked=True.
+    """
+    if not checked:
+        request_data = check_request(request_data)
+    ml_inference = ml_inference or model_registry.get()
+    action = request_data.get('action', '')
+    
+    experiment = model_experiment
+    arm = 0
+    if experiment is not None and action in ModelExperiment.ROUTED_ACTIONS:
+        ml_inference, arm = experiment.route(request_data, ml_inference)
+    
+    cache = result_cache
+    if cache is None or action not in CACHEABLE_ACTIONS:
+        result = _dispatch_action(ml_inference, action, request_data)
+    else:
+        key = cache.make_key(request_data, ml_inference.model_version)
+        found, result = cache.get(key)
+        if not found:
+            result = _dispatch_action(ml_inference, action, request_data)
+            cache.put(key, result)
+    
+    if experiment is not None and action in ModelExperiment.ROUTED_ACTIONS:
+        if metrics.enabled:
+            metrics.inc('ml_inference_experiment_requests_total', (('arm', ModelExperiment.ARMS[arm]),),
+                        help_text='Yield requests served per experiment arm')
+        if experiment.shadow_version and action == 'predict_yield':
+            experiment.shadow(request_data, arm)
+        # Shallow copy so cached results are never tagged with another request's arm
+        result = dict(result, experiment={'arm': ModelExperiment.ARMS[arm],
+                                          'model_version': ml_inference.model_version})
+    return result
+
+
+def _dispatch_action(ml_inference: MLInference, action: str, request_data: Dict) -> Dict:
+    """Run a request that passed check_request"""
+    if action == 'predict_yield':
+        features = request_data['features']
+        crop_type = request_data.get('crop_type', 'corn')
         
-        if stress_level == 'severe':
-            recommendations.append('Immediate irrigation required to prevent crop damage')
-            recommendations.append('Consider emergency nutrient application')
-            recommendations.append('Investigate potential pest or disease issues')
-        elif stress_level == 'high':
-            recommendations.append('Increase irrigation frequency')
-            recommendations.append('Monitor for pest and disease pressure')
-            recommendations.append('Consider stress-reducing treatments')
-        elif stress_level == 'moderate':
-            recommendations.append('Optimize irrigation timing')
-            recommendations.append('Monitor crop development closely')
+        batcher = micro_batcher
+        if batcher is not None:
+            return batcher.predict_yield(ml_inference, features, crop_type)
+        return ml_inference.predict_yield(features, crop_type)
         
-        if trend == 'declining':
-            recommendations.append('Investigate causes of declining vegetation health')
-            recommendations.append('Consider soil testing for nutrient deficiencies')
-        elif trend == 'improving':
-            recommendations.append('Continue current management practices')
+    elif action == 'predict_yield_batch':
+        crop_types = request_data.get('crop_types', request_data.get('crop_type', 'corn'))
         
-        if len(anomalies) > 2:
-            recommendations.append('High variability detected - investigate field uniformity')
-            recommendations.append('Consider precision management approaches')
+        return ml_inference.predict_yield_batch(request_data['features'], crop_types,
+                                                request_data.get('feature_names'), request_data.get('output', 'rows'))
+                                                
+    elif action == 'analyze_stress':
+        return ml_inference.analyze_stress_patterns(request_data['satellite_data'])
         
-        return recommendations
+    elif action == 'analyze_stress_batch':
+        return ml_inference.analyze_stress_batch(
+            request_data['ndvi_matrix'], request_data.get('dates'), request_data.get('field_ids'),
+            request_data.get('output', 'rows')
+        )
+        
+    elif action == 'ingest_observations':
+        return feature_store.ingest(request_data['field_id'], request_data.get('weather'), request_data.get('satellite'))
+        
+    elif action == 'analyze_stress_raster':
+        # Inline requests only; large stacks go through the raster-stress command
+        return ml_inference.analyze_stress_raster(
+            request_data['ndvi_stack'], request_data.get('dates'), request_data.get('zones'),
+            output=request_data.get('output', 'grids')
+        )
+        
+    elif action == 'analyze_stress_incremental':
+        return ml_inference.update_stress_state(request_data.get('state'), request_data['satellite_data'])
+        
+    elif action == 'optimize_irrigation':
+        return ml_inference.optimize_irrigation(request_data['field_data'])
+        
+    elif action == 'scenario_sweep':
+        target = request_data.get('target', 'yield')
+        base = request_data.get('field_data' if target == 'irrigation' else 'features') or {}
+        
+        return ml_inference.sweep_scenarios(target, base, request_data['perturbations'],
+                                            request_data.get('crop_type', 'corn'), request_data.get('output', 'tensor'))
+                                            
+    elif action == 'optimize_irrigation_batch':
+        return ml_inference.optimize_irrigation_batch(request_data['fields'])
+        
+    elif action == 'schedule_irrigation':
+        return ml_inference.schedule_irrigation(
+            request_data['fields'], request_data['weather_forecast'], request_data.get('pump_capacity')
+        )
+    
+    raise ValidationError.for_field('action', f"Unknown action: {action}")
 
 
 class Handler(BaseHTTPRequestHandler):
@@ -401,107 +4337,233 @@ class Handler(BaseHTTPRequestHandler):
     HTTP request handler for Vercel serverless function
     """
     
-    def __init__(self, *args, **kwargs):
-        self.ml_inference = MLInference()
-        super().__init__(*args, **kwargs)
+    ml_inference = None
     
     def do_POST(self):
         """Handle POST requests"""
+        timer = start_stage_timer()
+        
+        if self._is_ndjson_request():
+            self.handle_stress_stream(timer)
+            return
+        
+        action = ''
+        status = 200
         try:
             # Read request data
             content_length = int(self.headers['Content-Length'])
             post_data = self.rfile.read(content_length)
-            request_data = json.loads(post_data.decode('utf-8'))
+            timer.request_bytes = content_length
+            timer.mark('read')
             
-            # Get action from request
+            request_data, columnar = parse_request_body(post_data, self.headers.get('Content-Type') or '',
+                                                        self.headers.get('Accept') or '')
             action = request_data.get('action', '')
+            timer.mark('parse')
+            
+            request_data = check_request(request_data)
+            timer.mark('validate')
+            
+            self.ml_inference = model_registry.get()
+            timer.mark('model')
             
-            if action == 'predict_yield':
-                result = self.handle_yield_prediction(request_data)
-            elif action == 'analyze_stress':
-                result = self.handle_stress_analysis(request_data)
-            elif action == 'optimize_irrigation':
-                result = self.handle_irrigation_optimization(request_data)
+            executor = getattr(self.server, 'batch_executor', None)
+            if executor is not None and action in BATCH_ACTIONS:
+                # CPU-heavy batches run in the worker pool so this thread stays responsive, split
+                # into row chunks where the action allows
+                result = executor.run_action(request_data)
             else:
-                raise ValueError(f"Unknown action: {action}")
+                result = run_action(request_data, self.ml_inference, checked=True)
+            timer.mark('compute')
             
-            # Send successful response
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
-            self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-            self.end_headers()
+            if columnar:
+                self._send_body(200, encode_columnar_response(result), COLUMNAR_CONTENT_TYPE,
+                                cors_preflight=True, timer=timer)
+                timer.record(action, status)
+                return
             
+            # Send successful response
             response = {
                 'success': True,
                 'data': result,
-                'timestamp': np.datetime64('now').astype(str)
+                'timestamp': _utc_timestamp()
             }
             
-            self.wfile.write(json.dumps(response).encode())
+            self._send_json(200, response, cors_preflight=True, timer=timer)
+            
+        except ValidationError as e:
+            # The whole body was read before validation, so the connection stays usable
+            status = e.status
+            self._send_json(status, {
+                'success': False,
+                'error': str(e),
+                'errors': e.errors,
+                'timestamp': _utc_timestamp()
+            }, timer=timer)
             
         except Exception as e:
             # Send error response
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            
             error_response = {
                 'success': False,
                 'error': str(e),
                 'traceback': traceback.format_exc(),
-                'timestamp': np.datetime64('now').astype(str)
+                'timestamp': _utc_timestamp()
             }
             
-            self.wfile.write(json.dumps(error_response).encode())
+            # The body may not have been fully read, so never reuse this connection
+            self.close_connection = True
+            status = 500
+            self._send_json(500, error_response, timer=timer)
+        
+        timer.record(action, status)
     
-    def do_OPTIONS(self):
-        """Handle CORS preflight requests"""
+    def do_GET(self):
+        """Serve aggregated metrics at /metrics in the Prometheus text format"""
+        if urlparse(self.path).path.rstrip('/') != '/metrics' or not metrics.enabled:
+            self.close_connection = True
+            self._send_json(404, {'success': False, 'error': 'Not found'})
+            return
+        
+        body = metrics.render_prometheus().encode()
         self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Content-Type', PROMETHEUS_CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
         self.end_headers()
+        self.wfile.write(body)
     
-    def handle_yield_prediction(self, request_data: Dict) -> Dict:
-        """Handle yield prediction requests"""
-        features = request_data.get('features', {})
-        crop_type = request_data.get('crop_type', 'corn')
+    def _send_json(self, status: int, payload: Dict, cors_preflight: bool = False, timer=_NULL_STAGE_TIMER):
+        """Write a JSON response with an explicit length so keep-alive connections can be reused"""
+        self._send_body(status, json_serializer.dumps(payload), 'application/json', cors_preflight, timer)
+    
+    def _send_body(self, status: int, body: bytes, content_type: str, cors_preflight: bool = False,
+                   timer=_NULL_STAGE_TIMER):
+        timer.response_bytes = len(body)
+        timer.mark('serialize')
         
-        if not features:
-            raise ValueError("Features are required for yield prediction")
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        if cors_preflight:
+            self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+            self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Content-Length', str(len(body)))
+        if timer.enabled:
+            self.send_header('Server-Timing', timer.server_timing())
+        self.end_headers()
         
-        return self.ml_inference.predict_yield(features, crop_type)
+        self.wfile.write(body)
+        timer.mark('write')
     
-    def handle_stress_analysis(self, request_data: Dict) -> Dict:
-        """Handle stress analysis requests"""
-        satellite_data = request_data.get('satellite_data', [])
+    def _is_ndjson_request(self) -> bool:
+        content_type = (self.headers.get('Content-Type') or '').split(';')[0].strip().lower()
+        return content_type == NDJSON_CONTENT_TYPE
+    
+    def handle_stress_stream(self, timer=_NULL_STAGE_TIMER):
+        """
+        Handle analyze_stress_stream requests
         
-        if not satellite_data:
-            raise ValueError("Satellite data is required for stress analysis")
+        The NDJSON body is consumed incrementally and one result line is written
+        per field as soon as it is computed. Chunked uploads are supported, and
+        the response is chunked on HTTP/1.1 connections.
+        """
+        action = parse_qs(urlparse(self.path).query).get('action', ['analyze_stress_stream'])[0]
+        if action != 'analyze_stress_stream':
+            self.close_connection = True
+            self._send_json(400, {
+                'success': False,
+                'error': f"Unknown streaming action: {action}"
+            })
+            return
         
-        return self.ml_inference.analyze_stress_patterns(satellite_data)
-    
-    def handle_irrigation_optimization(self, request_data: Dict) -> Dict:
-        """Handle irrigation optimization requests"""
-        field_data = request_data.get('field_data', {})
+        self.ml_inference = model_registry.get()
+        timer.mark('model')
+        
+        chunked = self.request_version != 'HTTP/1.0' and self.protocol_version >= 'HTTP/1.1'
+        
+        self.send_response(200)
+        self.send_header('Content-Type', NDJSON_CONTENT_TYPE)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Cache-Control', 'no-cache')
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        else:
+            self.close_connection = True
+        self.end_headers()
+        
+        try:
+            lines = split_stream_lines(self._iter_body_blocks())
+            for record in self.ml_inference.analyze_stress_stream(lines):
+                self._write_stream_data(json_serializer.dumps(record) + b'\n', chunked)
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band and close
+            self._write_stream_data(json_serializer.dumps({'success': False, 'error': str(e)}) + b'\n', chunked)
+            self.close_connection = True
         
-        if not field_data:
-            raise ValueError("Field data is required for irrigation optimization")
+        if chunked:
+            self.wfile.write(b'0\r\n\r\n')
+        self.wfile.flush()
         
-        return self.ml_inference.optimize_irrigation(field_data)
+        timer.mark('stream')
+        timer.record('analyze_stress_stream', 200)
+    
+    def _iter_body_blocks(self) -> Iterator[bytes]:
+        """Yield the request body in bounded blocks, honouring chunked encoding"""
+        if 'chunked' in (self.headers.get('Transfer-Encoding') or '').lower():
+            while True:
+                size_line = self.rfile.readline(1024)
+                try:
+                    size = int(size_line.split(b';')[0].strip(), 16)
+                except ValueError:
+                    raise ValueError("Malformed chunked request body")
+                
+                if size == 0:
+                    # Skip optional trailers up to the terminating blank line
+                    while self.rfile.readline(1024).strip():
+                        pass
+                    return
+                
+                while size > 0:
+                    block = self.rfile.read(min(size, _STREAM_READ_SIZE))
+                    if not block:
+                        raise ValueError("Request body ended inside a chunk")
+                    size -= len(block)
+                    yield block
+                self.rfile.readline(1024)
+        else:
+            remaining = int(self.headers.get('Content-Length') or 0)
+            while remaining > 0:
+                block = self.rfile.read(min(remaining, _STREAM_READ_SIZE))
+                if not block:
+                    return
+                remaining -= len(block)
+                yield block
+    
+    def _write_stream_data(self, data: bytes, chunked: bool):
+        if chunked:
+            self.wfile.write(f"{len(data):X}\r\n".encode() + data + b'\r\n')
+        else:
+            self.wfile.write(data)
+        self.wfile.flush()
+    
+    def do_OPTIONS(self):
+        """Handle CORS preflight requests"""
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
 
 
 def handler(request, context):
     """
     Vercel serverless function entry point
     """
+    timer = start_stage_timer()
+    action = ''
+    
     try:
-        ml_inference = MLInference()
-        
-        # Parse request
+        # Preflight and method errors are answered before NumPy or a model is loaded
         if request.method == 'OPTIONS':
             return {
                 'statusCode': 200,
@@ -519,50 +4581,530 @@ def handler(request, context):
                 'body': json.dumps({'error': 'Method not allowed'})
             }
         
-        # Get request data
-        request_data = json.loads(request.body) if hasattr(request, 'body') else {}
-        action = request_data.get('action', '')
-        
-        # Route to appropriate handler
-        if action == 'predict_yield':
-            features = request_data.get('features', {})
-            crop_type = request_data.get('crop_type', 'corn')
-            result = ml_inference.predict_yield(features, crop_type)
-            
-        elif action == 'analyze_stress':
-            satellite_data = request_data.get('satellite_data', [])
-            result = ml_inference.analyze_stress_patterns(satellite_data)
+        headers = getattr(request, 'headers', None) or {}
+        content_type = (headers.get('Content-Type') or headers.get('content-type') or '').split(';')[0].strip()
+        if content_type.lower() == NDJSON_CONTENT_TYPE:
+            action = 'analyze_stress_stream'
+            body = getattr(request, 'body', b'') or b''
+            if isinstance(body, str):
+                body = body.encode('utf-8')
+            timer.request_bytes = len(body)
             
-        elif action == 'optimize_irrigation':
-            field_data = request_data.get('field_data', {})
-            result = ml_inference.optimize_irrigation(field_data)
+            ml_inference = model_registry.get()
+            timer.mark('model')
             
+            # Stages as Handler.handle_stress_stream records them; the body is returned whole here
+            records = ml_inference.analyze_stress_stream(split_stream_lines([body]))
+            body = b''.join(json_serializer.dumps(record) + b'\n' for record in records).decode()
+            timer.mark('stream')
+            return _timed_response(timer, action, 200, body, NDJSON_CONTENT_TYPE)
+        
+        # Get request data
+        body = getattr(request, 'body', None)
+        if body is None:
+            request_data, columnar = {}, False
         else:
-            raise ValueError(f"Unknown action: {action}")
+            if isinstance(body, str) and content_type.lower() == COLUMNAR_CONTENT_TYPE:
+                # Serverless runtimes hand binary bodies over base64 encoded
+                body = base64.b64decode(body)
+            timer.request_bytes = len(body)
+            request_data, columnar = parse_request_body(body, content_type,
+                                                        headers.get('Accept') or headers.get('accept') or '')
+        action = request_data.get('action', '')
+        timer.mark('parse')
         
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'success': True,
-                'data': result,
-                'timestamp': str(np.datetime64('now'))
-            })
-        }
+        if action == 'metrics':
+            if not metrics.enabled:
+                raise ValueError("Metrics are disabled, set ML_METRICS=1 to enable them")
+            return {
+                'statusCode': 200,
+                'headers': {
+                    'Content-Type': PROMETHEUS_CONTENT_TYPE,
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': metrics.render_prometheus()
+            }
+        
+        # Parse and validation failures are reported without loading NumPy or a model
+        request_data = check_request(request_data)
+        timer.mark('validate')
+        
+        ml_inference = model_registry.get()
+        timer.mark('model')
+        
+        result = run_action(request_data, ml_inference, checked=True)
+        timer.mark('compute')
+        
+        if columnar:
+            encoded = base64.b64encode(encode_columnar_response(result)).decode('ascii')
+            response = _timed_response(timer, action, 200, encoded, COLUMNAR_CONTENT_TYPE)
+            response['isBase64Encoded'] = True
+            return response
+        
+        body = json_serializer.dumps({
+            'success': True,
+            'data': result,
+            'timestamp': _utc_timestamp()
+        }).decode()
+        return _timed_response(timer, action, 200, body)
+        
+    except ValidationError as e:
+        body = json_serializer.dumps({
+            'success': False,
+            'error': str(e),
+            'errors': e.errors
+        }).decode()
+        return _timed_response(timer, action, e.status, body)
         
     except Exception as e:
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'success': False,
-                'error': str(e),
-                'traceback': traceback.format_exc()
-            })
-        }
\ No newline at end of file
+        body = json_serializer.dumps({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        }).decode()
+        return _timed_response(timer, action, 500, body)
+
+
+def _timed_response(timer, action: str, status: int, body: str,
+                    content_type: str = 'application/json') -> Dict[str, Any]:
+    """Build a handler() JSON response, attaching Server-Timing and recording metrics"""
+    timer.response_bytes = len(body)
+    timer.mark('serialize')
+    
+    headers = {
+        'Content-Type': content_type,
+        'Access-Control-Allow-Origin': '*'
+    }
+    if timer.enabled:
+        headers['Server-Timing'] = timer.server_timing()
+    
+    timer.record(action, status)
+    return {
+        'statusCode': status,
+        'headers': headers,
+        'body': body
+    }
+
+
+class ServingHandler(Handler):
+    """
+    Handler used by InferenceServer: HTTP/1.1 keep-alive with an idle timeout
+    """
+    
+    protocol_version = 'HTTP/1.1'
+    
+    def setup(self):
+        # Idle keep-alive connections give their worker thread back after this long
+        self.timeout = getattr(self.server, 'keepalive_timeout', None)
+        super().setup()
+
+
+def _warm_batch_worker(model_version: Optional[str] = None):
+    """Load the model once in each batch worker process"""
+    warm_up(model_version)
+
+
+def _run_parallel_chunk(model_version: Optional[str], method: str, args: Tuple) -> Dict[str, Any]:
+    """Score one chunk in a worker with that worker's already loaded model"""
+    return getattr(model_registry.get(model_version), method)(*args)
+
+
+class ParallelExecutor:
+    """
+    Split large batch jobs into row chunks and score them on every core
+    
+    Each worker process loads the model once through its own model registry
+    when the pool starts. Tasks carry only their chunk of input (as NumPy arrays
+    where possible) and the method name, never the MLInference instance, and
+    results are reassembled in input order. With workers=1, or a job no larger
+    than one chunk, everything runs in the calling process unless offload is
+    set, as InferenceServer sets it to keep its connection threads free.
+    """
+    
+    # batch_info entries that are per-chunk counts and add up across chunks
+    SUMMED_BATCH_INFO = ('rows', 'fields', 'analyzed', 'optimized', 'rejected')
+    
+    # Actions run_action splits into row chunks; other actions run whole in one task
+    CHUNKED_ACTIONS = frozenset({'predict_yield_batch', 'analyze_stress_batch', 'optimize_irrigation_batch'})
+    
+    def __init__(self, workers: int = PARALLEL_WORKERS, chunk_size: int = PARALLEL_CHUNK_SIZE,
+                 model_version: Optional[str] = None, mp_context=None, offload: bool = False):
+        """
+        Args:
+            workers: Worker processes, 0 for one per CPU and 1 for no pool
+            chunk_size: Rows (fields) per task
+            model_version: Model version every worker loads, default when None
+            mp_context: Optional multiprocessing context for the pool
+            offload: Never score in the calling process, even with one worker
+                or a single chunk
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.model_version = model_version
+        self.offload = offload
+        self._pool = None
+        if self.workers > 1 or offload:
+            from concurrent.futures import ProcessPoolExecutor
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=mp_context,
+                                             initializer=_warm_batch_worker, initargs=(model_version,))
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+    
+    def submit(self, fn: Callable, *args):
+        """Run fn(*args) in the pool, or in this process without one, and return its Future"""
+        if self._pool is not None:
+            return self._pool.submit(fn, *args)
+        
+        from concurrent.futures import Future
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    
+    def run_action(self, request_data: Dict) -> Dict[str, Any]:
+        """
+        Run a request that passed check_request
+        
+        Batches in CHUNKED_ACTIONS are split into row chunks across the pool.
+        Other actions, and batches a model experiment routes per request, are
+        handed to module-level run_action in a single task.
+        """
+        action = request_data.get('action', '')
+        experiment = model_experiment
+        if action not in self.CHUNKED_ACTIONS or (experiment is not None
+                                                  and action in ModelExperiment.ROUTED_ACTIONS):
+            return self.submit(run_action, request_data, None, True).result()
+        
+        if action == 'predict_yield_batch':
+            crop_types = request_data.get('crop_types', request_data.get('crop_type', 'corn'))
+            return self.predict_yield_batch(request_data['features'], crop_types, request_data.get('feature_names'),
+                                            request_data.get('output', 'rows'))
+        elif action == 'analyze_stress_batch':
+            return self.analyze_stress_batch(request_data['ndvi_matrix'], request_data.get('dates'),
+                                             request_data.get('field_ids'), request_data.get('output', 'rows'))
+        return self.optimize_irrigation_batch(request_data['fields'])
+    
+    def predict_yield_batch(self, features, crop_types='corn', feature_names: Optional[List[str]] = None,
+                            output: str = 'rows') -> Dict[str, Any]:
+        """predict_yield_batch over row chunks, same arguments and result"""
+        ml_inference = model_registry.get(self.model_version)
+        X, row_errors = ml_inference._validated_yield_matrix(features, feature_names)
+        names = list(ml_inference.yield_model.feature_names)
+        
+        n_rows = X.shape[0]
+        if isinstance(crop_types, str):
+            crop_types = [crop_types] * n_rows
+        elif len(crop_types) != n_rows:
+            raise ValidationError.for_field('crop_types', "crop_types must be a single value or one value per row")
+        crop_types = list(crop_types)
+        
+        return self._map('predict_yield_batch', n_rows,
+                         lambda start, stop: (X[start:stop], crop_types[start:stop], names, output,
+                                              self._chunk_row_errors(row_errors, start, stop)))
+    
+    def analyze_stress_batch(self, ndvi_matrix, dates: Optional[List[str]] = None,
+                             field_ids: Optional[List[Any]] = None, output: str = 'rows') -> Dict[str, Any]:
+        """analyze_stress_batch over field chunks, same arguments and result"""
+        Y, row_errors = model_registry.get(self.model_version)._validated_ndvi_matrix(ndvi_matrix)
+        
+        n_fields = Y.shape[0]
+        field_ids = list(range(n_fields)) if field_ids is None else list(field_ids)
+        if len(field_ids) != n_fields:
+            raise ValidationError.for_field('field_ids', "field_ids must have one entry per NDVI matrix row")
+        dates = list(dates) if dates is not None else None
+        
+        return self._map('analyze_stress_batch', n_fields,
+                         lambda start, stop: (Y[start:stop], dates, field_ids[start:stop], output,
+                                              self._chunk_row_errors(row_errors, start, stop)))
+    
+    def optimize_irrigation_batch(self, fields: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """optimize_irrigation_batch over field chunks, same arguments and result"""
+        # Give each field its global position as field_id before chunking
+        fields = [field if not isinstance(field, dict) or 'field_id' in field else dict(field, field_id=i)
+                  for i, field in enumerate(fields)]
+        return self._map('optimize_irrigation_batch', len(fields), lambda start, stop: (fields[start:stop],))
+    
+    @staticmethod
+    def _chunk_row_errors(row_errors: Dict[int, List[Dict[str, Any]]], start: int,
+                          stop: int) -> Dict[int, List[Dict[str, Any]]]:
+        """Rejected rows of one chunk, re-indexed from the chunk start"""
+        return {row - start: errors for row, errors in row_errors.items() if start <= row < stop}
+    
+    def _map(self, method: str, n_rows: int, chunk_args: Callable[[int, int], Tuple]) -> Dict[str, Any]:
+        bounds = [(start, min(start + self.chunk_size, n_rows)) for start in range(0, n_rows, self.chunk_size)]
+        
+        if self._pool is None or (len(bounds) <= 1 and not self.offload):
+            return _run_parallel_chunk(self.model_version, method, chunk_args(0, n_rows))
+        if len(bounds) <= 1:
+            return self.submit(_run_parallel_chunk, self.model_version, method, chunk_args(0, n_rows)).result()
+        
+        futures = [self.submit(_run_parallel_chunk, self.model_version, method, chunk_args(start, stop))
+                   for start, stop in bounds]
+        return self._merge([future.result() for future in futures], [start for start, _ in bounds])
+    
+    def _merge(self, parts: List[Dict[str, Any]], offsets: List[int]) -> Dict[str, Any]:
+        """Concatenate per-chunk results back into one result in input order"""
+        merged = {}
+        for key, value in parts[0].items():
+            if key == 'batch_info':
+                info = dict(value)
+                for name in self.SUMMED_BATCH_INFO:
+                    if name in info:
+                        info[name] = sum(part['batch_info'][name] for part in parts)
+                merged[key] = info
+            elif key == 'columns':
+                merged[key] = self._merge_columns([part['columns'] for part in parts], offsets)
+            elif key == 'errors':
+                # Row indices are relative to each chunk
+                merged[key] = [dict(error, row=error['row'] + offset)
+                               for part, offset in zip(parts, offsets) for error in part[key]]
+            else:
+                merged[key] = [item for part in parts for item in part[key]]
+        return merged
+    
+    @staticmethod
+    def _merge_columns(parts: List[Dict[str, Any]], offsets: List[int]) -> Dict[str, Any]:
+        columns = {}
+        for name, value in parts[0].items():
+            if isinstance(value, np.ndarray):
+                columns[name] = np.concatenate([part[name] for part in parts])
+            elif isinstance(value, dict):
+                # Anomaly groups index fields within their chunk
+                group = {child: np.concatenate([part[name][child] for part in parts]) for child in value}
+                if 'field_index' in group:
+                    group['field_index'] = np.concatenate([part[name]['field_index'] + offset
+                                                           for part, offset in zip(parts, offsets)])
+                columns[name] = group
+            else:
+                columns[name] = [item for part in parts for item in part[name]]
+        return columns
+
+
+class InferenceServer(HTTPServer):
+    """
+    Pooled HTTP server for running the inference handler outside Vercel
+    
+    Connections are served by a fixed pool of threads that share the process
+    model registry. Up to max_queue further connections wait for a thread;
+    beyond that new connections get an immediate 503 so overload never turns
+    into unbounded queueing. Batch actions are offloaded to a ParallelExecutor
+    pool, split into row chunks where the action allows, so large jobs do not
+    hold the GIL while other requests are served.
+    """
+    
+    allow_reuse_address = True
+    
+    def __init__(self, server_address: Tuple[str, int], threads: int = 16, batch_workers: int = 0,
+                 max_queue: int = 64, keepalive_timeout: float = 15.0, handler_class=ServingHandler):
+        self.keepalive_timeout = keepalive_timeout
+        self.request_queue_size = threads + max_queue
+        
+        # Start batch workers before the listening socket and connection threads
+        # exist, so forked workers inherit neither
+        from concurrent.futures import ThreadPoolExecutor
+        
+        self.batch_executor = None
+        if batch_workers > 0:
+            self.batch_executor = ParallelExecutor(batch_workers, offload=True)
+            self.batch_executor.submit(_warm_batch_worker).result()
+        
+        warm_up()
+        
+        self.connection_pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='ml-inference')
+        self.connection_slots = threading.BoundedSemaphore(threads + max_queue)
+        super().__init__(server_address, handler_class)
+    
+    def process_request(self, request, client_address):
+        if not self.connection_slots.acquire(blocking=False):
+            self._reject_busy(request)
+            return
+        
+        try:
+            self.connection_pool.submit(self._process_pooled, request, client_address)
+        except RuntimeError:
+            # Pool already shut down
+            self.connection_slots.release()
+            self.shutdown_request(request)
+    
+    def _process_pooled(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self.connection_slots.release()
+    
+    def _reject_busy(self, request):
+        body = json.dumps({'success': False, 'error': 'Server busy, retry later'}).encode()
+        try:
+            request.sendall(
+                b'HTTP/1.1 503 Service Unavailable\r\n'
+                b'Content-Type: application/json\r\n'
+                b'Retry-After: 1\r\n'
+                b'Connection: close\r\n'
+                + f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+            )
+        except OSError:
+            pass
+        self.shutdown_request(request)
+    
+    def server_close(self):
+        super().server_close()
+        self.connection_pool.shutdown(wait=False, cancel_futures=True)
+        if self.batch_executor is not None:
+            self.batch_executor.close()
+
+
+def serve(host: str = '0.0.0.0', port: int = 8000, threads: int = 16, batch_workers: int = 0,
+          max_queue: int = 64, keepalive_timeout: float = 15.0):
+    """Run the inference API as a long-lived server until interrupted"""
+    import signal
+    
+    server = InferenceServer((host, port), threads, batch_workers, max_queue, keepalive_timeout)
+    
+    def _stop(signum, frame):
+        raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM, _stop)
+    
+    print(f"Serving ML inference on http://{host}:{port} "
+          f"(threads={threads}, batch_workers={batch_workers}, max_queue={max_queue})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def export_model_artifact(path: str, model_version: Optional[str] = None, sklearn_path: Optional[str] = None):
+    """
+    Export a yield model as a compiled artifact
+    
+    Without sklearn_path the in-code model is exported. Otherwise the pickled,
+    fitted scikit-learn forest at sklearn_path is flattened into a tree ensemble
+    that imputes missing features with the in-code scaler means and applies the
+    in-code crop factors.
+    """
+    ml_inference = MLInference(model_version=model_version or DEFAULT_MODEL_VERSION, model_path='')
+    if sklearn_path is None:
+        ml_inference.yield_model.to_artifact(path, ml_inference.model_version)
+        return path
+    
+    import pickle
+    with open(sklearn_path, 'rb') as f:
+        estimator = pickle.load(f)
+    
+    builtin = ml_inference.yield_model
+    feature_names = list(getattr(estimator, 'feature_names_in_', builtin.feature_names))
+    model = TreeEnsembleYieldModel.from_sklearn(
+        estimator, feature_names,
+        impute_values={name: scaler['mean'] for name, scaler in ml_inference.feature_scalers.items()},
+        crop_factors=dict(zip(builtin.crop_names, builtin.crop_factors.tolist()))
+    )
+    model.to_artifact(path, ml_inference.model_version)
+    return path
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point for local tooling"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Crops.AI ML inference tools')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    export_parser = subparsers.add_parser('export-model', help='Write a yield model as a compiled artifact')
+    export_parser.add_argument('path', help='Output path, e.g. models/builtin-1.0.cropsmodel')
+    export_parser.add_argument('--version', default=DEFAULT_MODEL_VERSION, help='Model version to record')
+    export_parser.add_argument('--sklearn', metavar='PICKLE',
+                               help='Pickled, fitted scikit-learn forest to export instead of the in-code model')
+    
+    raster_parser = subparsers.add_parser('raster-stress', help='Per-pixel stress maps for an NDVI raster stack')
+    raster_parser.add_argument('stack', help='.npy file holding a (time, height, width) NDVI stack')
+    raster_parser.add_argument('out_dir', help='Directory receiving the per-pixel grids as .npy files')
+    raster_parser.add_argument('--zones', help='.npy file holding (height, width) integer zone labels')
+    raster_parser.add_argument('--dates', help='Comma separated date of each time step')
+    raster_parser.add_argument('--tile-rows', type=int, default=None, help='Raster rows processed per tile')
+    
+    cpu_count = os.cpu_count() or 1
+    serve_parser = subparsers.add_parser('serve', help='Run a pooled HTTP server with keep-alive')
+    serve_parser.add_argument('--host', default=os.environ.get('ML_SERVE_HOST', '0.0.0.0'))
+    serve_parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 8000)))
+    serve_parser.add_argument('--threads', type=int, default=min(32, cpu_count * 4),
+                              help='Connection worker threads')
+    serve_parser.add_argument('--batch-workers', type=int, default=max(0, cpu_count - 1),
+                              help='Worker processes for batch actions, 0 runs them in-thread')
+    serve_parser.add_argument('--max-queue', type=int, default=64,
+                              help='Connections allowed to wait for a thread before answering 503')
+    serve_parser.add_argument('--keepalive-timeout', type=float, default=15.0,
+                              help='Seconds an idle keep-alive connection holds a thread')
+    serve_parser.add_argument('--metrics', action='store_true', default=METRICS_ENABLED,
+                              help='Record per-stage timings and serve them at /metrics')
+    serve_parser.add_argument('--cache-size', type=int, default=RESULT_CACHE_SIZE,
+                              help='Result cache entries, 0 disables memoization')
+    serve_parser.add_argument('--cache-ttl', type=float, default=RESULT_CACHE_TTL,
+                              help='Seconds a cached result stays valid')
+    serve_parser.add_argument('--feature-store', default=FEATURE_STORE_PATH,
+                              help='SQLite file for stored field observations, empty disables it')
+    serve_parser.add_argument('--ab-candidate', default=AB_CANDIDATE_VERSION,
+                              help='Model version serving an A/B share of yield requests')
+    serve_parser.add_argument('--ab-fraction', type=float, default=AB_TRAFFIC_FRACTION,
+                              help='Fraction of yield requests routed to the A/B candidate')
+    serve_parser.add_argument('--shadow-version', default=SHADOW_MODEL_VERSION,
+                              help='Model version scoring predict_yield in the background for comparison')
+    serve_parser.add_argument('--shadow-log', default=SHADOW_LOG_PATH,
+                              help='Append-only binary log of paired primary and shadow predictions')
+    serve_parser.add_argument('--shadow-fraction', type=float, default=SHADOW_SAMPLE_FRACTION,
+                              help='Fraction of predict_yield requests shadow scored')
+    serve_parser.add_argument('--microbatch-window-ms', type=float, default=MICROBATCH_WINDOW_MS,
+                              help='Collect concurrent predict_yield calls for up to this long, 0 disables')
+    serve_parser.add_argument('--microbatch-max', type=int, default=MICROBATCH_MAX_SIZE,
+                              help='Largest micro-batch scored at once')
+    
+    shadow_parser = subparsers.add_parser('shadow-report', help='Summarize a shadow scoring log')
+    shadow_parser.add_argument('log', help='Shadow log written by serve --shadow-version')
+    
+    args = parser.parse_args(argv)
+    
+    if args.command == 'export-model':
+        export_model_artifact(args.path, args.version, args.sklearn)
+        print(f"Wrote model {args.version} to {args.path}")
+    elif args.command == 'raster-stress':
+        # Memory-mapped so only one tile of the stack is resident at a time
+        stack = np.load(args.stack, mmap_mode='r')
+        zones = np.load(args.zones, mmap_mode='r') if args.zones else None
+        dates = args.dates.split(',') if args.dates else None
+        result = model_registry.get().analyze_stress_raster(stack, dates, zones, args.tile_rows, args.out_dir)
+        print(json.dumps({'zones': result['zones'], 'raster_info': result['raster_info']}, indent=2))
+    elif args.command == 'shadow-report':
+        print(json.dumps(summarize_shadow_log(args.log), indent=2))
+    elif args.command == 'serve':
+        configure_result_cache(args.cache_size, args.cache_ttl)
+        configure_micro_batcher(args.microbatch_window_ms, args.microbatch_max)
+        configure_feature_store(args.feature_store)
+        configure_model_experiment(args.ab_candidate, args.ab_fraction, args.shadow_version, args.shadow_log,
+                                   args.shadow_fraction)
+        metrics.enabled = args.metrics
+        serve(args.host, args.port, args.threads, args.batch_workers, args.max_queue, args.keepalive_timeout)
+
+
+if WARM_UP_ON_IMPORT:
+    warm_up()
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+ML Inference Benchmark Suite
+Generates synthetic fields, NDVI time series and forecasts at configurable scale
+and measures throughput, latency percentiles and peak memory for each action of
+api/ml-inference.py in single and batch modes. Results are written as JSON so
+runs from different commits can be compared.
+
+Usage:
+    python3 scripts/ml-inference-benchmark.py --rows 1,1000,100000
+    python3 scripts/ml-inference-benchmark.py --compare performance-reports/ml-inference-baseline.json
+"""
+
+import argparse
+import gc
+import importlib.util
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+MODULE_PATH = os.path.join(SCRIPT_DIR, '..', 'api', 'ml-inference.py')
+PERFORMANCE_DIR = os.path.join(SCRIPT_DIR, '..', 'performance-reports')
+
+ALL_ACTIONS = ['predict_yield', 'analyze_stress', 'optimize_irrigation', 'http_roundtrip']
+NDVI_DATES = 24
+FORECAST_DAYS = 14
+
+
+def load_inference_module():
+    """Import api/ml-inference.py, whose file name is not a valid module name"""
+    spec = importlib.util.spec_from_file_location('ml_inference', MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['ml_inference'] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class SyntheticData:
+    """
+    Reproducible synthetic inputs for every benchmarked action
+    """
+    
+    CROPS = ['corn', 'soybean', 'wheat', 'rice']
+    STAGES = ['germination', 'emergence', 'vegetative', 'flowering', 'fruiting', 'maturity']
+    
+    def __init__(self, ml_inference, rows: int, seed: int):
+        rng = np.random.default_rng(seed)
+        model = ml_inference.yield_model
+        
+        self.rows = rows
+        self.feature_names = list(model.feature_names)
+        
+        # Yield features around each scaler's mean, 10% missing
+        features = rng.normal(model.means, model.stds * 1.5, size=(rows, len(self.feature_names)))
+        features[rng.random(features.shape) < 0.1] = np.nan
+        self.features = features
+        self.crop_types = rng.choice(self.CROPS, size=rows).tolist()
+        
+        # Seasonal NDVI curves with noise, 10% cloud-masked observations
+        season = np.sin(np.linspace(0.2, np.pi - 0.2, NDVI_DATES))
+        peak = rng.uniform(0.3, 0.9, size=(rows, 1))
+        ndvi = peak * season + rng.normal(0, 0.05, size=(rows, NDVI_DATES))
+        ndvi[rng.random(ndvi.shape) < 0.1] = np.nan
+        self.ndvi = ndvi
+        self.dates = [f"2024-{4 + i // 4:02d}-{1 + (i % 4) * 7:02d}" for i in range(NDVI_DATES)]
+        
+        self.fields = [
+            {
+                'field_id': f"field-{i}",
+                'soil_moisture': float(moisture),
+                'field_capacity': 0.4,
+                'wilting_point': 0.15,
+                'crop_stage': stage,
+                'area': float(area)
+            }
+            for i, (moisture, stage, area) in enumerate(zip(
+                rng.uniform(0.16, 0.4, rows).tolist(),
+                rng.choice(self.STAGES, size=rows).tolist(),
+                rng.uniform(5, 150, rows).tolist()
+            ))
+        ]
+        self.forecast = [
+            {
+                'date': f"2024-07-{day + 1:02d}",
+                'temperature': float(temp),
+                'humidity': float(humidity),
+                'precipitation': float(rain)
+            }
+            for day, (temp, humidity, rain) in enumerate(zip(
+                rng.uniform(12, 36, FORECAST_DAYS).tolist(),
+                rng.uniform(30, 90, FORECAST_DAYS).tolist(),
+                (rng.random(FORECAST_DAYS) < 0.25) * rng.uniform(2, 25, FORECAST_DAYS)
+            ))
+        ]
+    
+    def feature_row(self, i: int) -> Dict[str, float]:
+        return {name: float(value) for name, value in zip(self.feature_names, self.features[i])
+                if not np.isnan(value)}
+    
+    def feature_columns(self) -> Dict[str, List[Optional[float]]]:
+        columns = {}
+        for j, name in enumerate(self.feature_names):
+            column = self.features[:, j]
+            columns[name] = np.where(np.isnan(column), None, column).tolist()
+        return columns
+    
+    def satellite_series(self, i: int) -> List[Dict[str, Any]]:
+        return [{'ndvi': float(value), 'date': date}
+                for value, date in zip(self.ndvi[i], self.dates) if not np.isnan(value)]
+    
+    def field_data(self, i: int) -> Dict[str, Any]:
+        return dict(self.fields[i], weather_forecast=self.forecast)
+
+
+class FakeRequest:
+    """Minimal stand-in for the request object Vercel passes to handler()"""
+    
+    def __init__(self, body: str):
+        self.method = 'POST'
+        self.body = body
+        self.headers = {'Content-Type': 'application/json'}
+
+
+def summarize(latencies: List[float], rows_per_call: int, total_seconds: float) -> Dict[str, Any]:
+    samples = np.array(latencies) * 1000
+    calls = len(latencies)
+    return {
+        'calls': calls,
+        'rows_per_call': rows_per_call,
+        'total_seconds': round(total_seconds, 6),
+        'throughput_rows_per_s': round(calls * rows_per_call / total_seconds, 2) if total_seconds > 0 else None,
+        'latency_ms': {
+            'p50': round(float(np.percentile(samples, 50)), 4),
+            'p99': round(float(np.percentile(samples, 99)), 4),
+            'mean': round(float(samples.mean()), 4),
+            'min': round(float(samples.min()), 4),
+            'max': round(float(samples.max()), 4)
+        }
+    }
+
+
+def measure(calls: List[Callable[[], Any]], rows_per_call: int) -> Dict[str, Any]:
+    """
+    Time every call, then re-run the first one under tracemalloc for peak memory
+    
+    Memory is traced in a separate pass so tracing overhead never leaks into
+    the latency numbers.
+    """
+    calls[0]()  # warm-up
+    gc.collect()
+    
+    latencies = []
+    start = time.perf_counter()
+    for call in calls:
+        call_start = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - call_start)
+    total_seconds = time.perf_counter() - start
+    
+    gc.collect()
+    tracemalloc.start()
+    calls[0]()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    result = summarize(latencies, rows_per_call, total_seconds)
+    result['peak_memory_mb'] = round(peak / (1024 * 1024), 3)
+    return result
+
+
+def build_cases(module, ml_inference, data: SyntheticData, modes: List[str], actions: List[str],
+                single_limit: int, repeats: int) -> List[Tuple[str, str, int, List[Callable[[], Any]]]]:
+    """Return (action, mode, rows_per_call, calls) for every requested benchmark"""
+    cases = []
+    n_single = min(data.rows, single_limit)
+    
+    if 'predict_yield' in actions:
+        if 'single' in modes:
+            rows = [data.feature_row(i) for i in range(n_single)]
+            cases.append(('predict_yield', 'single', 1, [
+                (lambda row=row, crop=crop: ml_inference.predict_yield(row, crop))
+                for row, crop in zip(rows, data.crop_types)
+            ]))
+        if 'batch' in modes:
+            columns = data.feature_columns()
+            cases.append(('predict_yield', 'batch', data.rows, [
+                lambda: ml_inference.predict_yield_batch(columns, data.crop_types)
+            ] * repeats))
+    
+    if 'analyze_stress' in actions:
+        if 'single' in modes:
+            series = [data.satellite_series(i) for i in range(n_single)]
+            cases.append(('analyze_stress', 'single', 1, [
+                (lambda obs=obs: ml_inference.analyze_stress_patterns(obs)) for obs in series
+            ]))
+        if 'batch' in modes:
+            cases.append(('analyze_stress', 'batch', data.rows, [
+                lambda: ml_inference.analyze_stress_batch(data.ndvi, data.dates)
+            ] * repeats))
+    
+    if 'optimize_irrigation' in actions:
+        if 'single' in modes:
+            field_data = [data.field_data(i) for i in range(n_single)]
+            cases.append(('optimize_irrigation', 'single', 1, [
+                (lambda fd=fd: ml_inference.optimize_irrigation(fd)) for fd in field_data
+            ]))
+        if 'batch' in modes:
+            cases.append(('optimize_irrigation', 'batch', data.rows, [
+                lambda: ml_inference.schedule_irrigation(data.fields, data.forecast)
+            ] * repeats))
+    
+    if 'http_roundtrip' in actions:
+        # Full handler() path: request json.loads, inference, response json.dumps,
+        # plus the client decoding the response body
+        def roundtrip(body: str):
+            response = module.handler(FakeRequest(body), None)
+            return json.loads(response['body'])
+        
+        if 'single' in modes:
+            bodies = [json.dumps({'action': 'predict_yield', 'features': data.feature_row(i),
+                                  'crop_type': data.crop_types[i]}) for i in range(n_single)]
+            cases.append(('http_roundtrip', 'single', 1, [
+                (lambda body=body: roundtrip(body)) for body in bodies
+            ]))
+        if 'batch' in modes:
+            body = json.dumps({'action': 'predict_yield_batch', 'features': data.feature_columns(),
+                               'crop_types': data.crop_types})
+            cases.append(('http_roundtrip', 'batch', data.rows, [lambda: roundtrip(body)] * repeats))
+    
+    return cases
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SCRIPT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, threshold: float) -> List[Dict[str, Any]]:
+    """Compare throughput and p50 latency against a previous run"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    
+    previous = {(r['action'], r['mode'], r['rows']): r for r in baseline.get('results', [])}
+    comparisons = []
+    for result in results:
+        old = previous.get((result['action'], result['mode'], result['rows']))
+        if old is None or not old.get('throughput_rows_per_s') or not result.get('throughput_rows_per_s'):
+            continue
+        
+        throughput_change = result['throughput_rows_per_s'] / old['throughput_rows_per_s'] - 1
+        p50_change = (result['latency_ms']['p50'] / old['latency_ms']['p50'] - 1
+                      if old['latency_ms']['p50'] else 0.0)
+        comparisons.append({
+            'action': result['action'],
+            'mode': result['mode'],
+            'rows': result['rows'],
+            'throughput_change_pct': round(throughput_change * 100, 2),
+            'p50_change_pct': round(p50_change * 100, 2),
+            'regression': throughput_change < -threshold
+        })
+    return comparisons
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Benchmark api/ml-inference.py actions')
+    parser.add_argument('--rows', default='1,1000,100000',
+                        help='Comma separated dataset sizes (1 to 1000000)')
+    parser.add_argument('--actions', default=','.join(ALL_ACTIONS),
+                        help=f"Comma separated subset of {','.join(ALL_ACTIONS)}")
+    parser.add_argument('--modes', default='single,batch', help='single, batch or both')
+    parser.add_argument('--repeats', type=int, default=5, help='Timed runs per batch case')
+    parser.add_argument('--single-limit', type=int, default=2000,
+                        help='Maximum single-row calls timed per dataset size')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Result file (default performance-reports/ml-inference-benchmark-<date>.json)')
+    parser.add_argument('--compare', help='Previous result file to compare against')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='Throughput drop in percent reported as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='Exit with status 1 when a regression is found')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    sizes = [int(size) for size in args.rows.split(',') if size]
+    actions = [action for action in args.actions.split(',') if action]
+    modes = [mode for mode in args.modes.split(',') if mode]
+    
+    for size in sizes:
+        if not 1 <= size <= 1_000_000:
+            raise SystemExit(f"Row count must be between 1 and 1000000: {size}")
+    unknown = set(actions) - set(ALL_ACTIONS)
+    if unknown:
+        raise SystemExit(f"Unknown actions: {', '.join(sorted(unknown))}")
+    
+    module = load_inference_module()
+    ml_inference = module.model_registry.get()
+    
+    print('⚡ Starting ML inference benchmark...\n')
+    results = []
+    for size in sizes:
+        data = SyntheticData(ml_inference, size, args.seed)
+        for action, mode, rows_per_call, calls in build_cases(module, ml_inference, data, modes, actions,
+                                                              args.single_limit, args.repeats):
+            result = {'action': action, 'mode': mode, 'rows': size}
+            result.update(measure(calls, rows_per_call))
+            results.append(result)
+            print(f"  {action:<20} {mode:<6} rows={size:<8} "
+                  f"{result['throughput_rows_per_s']:>14,.0f} rows/s  "
+                  f"p50={result['latency_ms']['p50']:.3f}ms  p99={result['latency_ms']['p99']:.3f}ms  "
+                  f"peak={result['peak_memory_mb']:.1f}MB")
+    
+    report = {
+        'metadata': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'seed': args.seed,
+            'repeats': args.repeats,
+            'single_limit': args.single_limit
+        },
+        'results': results
+    }
+    
+    exit_code = 0
+    if args.compare:
+        report['comparison'] = compare(results, args.compare, args.threshold / 100)
+        print('\n📊 Comparison with', args.compare)
+        for row in report['comparison']:
+            marker = '❌' if row['regression'] else '✅'
+            print(f"  {marker} {row['action']:<20} {row['mode']:<6} rows={row['rows']:<8} "
+                  f"throughput {row['throughput_change_pct']:+.1f}%  p50 {row['p50_change_pct']:+.1f}%")
+        if args.fail_on_regression and any(row['regression'] for row in report['comparison']):
+            exit_code = 1
+    
+    output = args.output or os.path.join(
+        PERFORMANCE_DIR, f"ml-inference-benchmark-{time.strftime('%Y-%m-%d')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Results written to {output}")
+    
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())